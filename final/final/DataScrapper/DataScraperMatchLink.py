@@ -1,25 +1,33 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-from selenium import webdriver
-from bs4 import BeautifulSoup
 import pickle
 import os
-import time
+from DataScrapper.DataScrapperDriverPool import get_pool
+from DataScrapper.DataScrapperWaits import wait_for_element, MATCH_LIST_SELECTOR
+from DataScrapper.DataScrapperSnapshot import get_snapshot
+from DataScrapper.DataScrapperHttp import fetch_html
+from DataScrapper.DataScrapperParse import parse_html
+from tracing import timed
 
 # Base URL for IPL matches
 url = "https://www.iplt20.com/matches/results/2025#:~:text=View%20all%20IPL%202025%20match%20results%20with%20detailed,Stay%20updated%20with%20every%20match%20outcome%20on%20IPLT20."
 
+@timed("scrape.match_links")
 def get_match_link():
     match_link = []
-    driver = webdriver.Chrome()  # Or any driver you're using
     try:
-        driver.get(url)  # Replace with your target URL
-        # Wait for the dynamic content to load
-        time.sleep(3)
+        # Plain HTTP when the served HTML already lists the matches
+        page = fetch_html(url, MATCH_LIST_SELECTOR)
+        if page is not None:
+            soup = page.soup
+        else:
+            with get_pool().driver() as driver:
+                driver.get(url)
+                # Wait for the dynamic content to render
+                wait_for_element(driver, MATCH_LIST_SELECTOR, label="get_match_link")
 
-        html = driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
+                html = driver.page_source
+            soup = parse_html(html)
         ul = soup.find('ul', id='team_archive')
 
         if not ul:
@@ -55,8 +63,6 @@ def get_match_link():
         if os.path.exists("match_links.pkl"):
             return load_match_links()
         return []
-    finally:
-        driver.quit()
 
 def save_match_links(links):
     """Save match links to pickle file for persistence"""
@@ -82,29 +88,12 @@ def load_match_links():
 def get_match_status(match_url):
     """Check if a match is live or completed"""
     try:
-        driver = webdriver.Chrome()
-        driver.get(match_url)
-        time.sleep(2)
-        
-        html = driver.page_source
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # Look for live indicators
-        live_indicators = [
-            soup.find("div", {"class": "liveIndicator"}),
-            soup.find("span", text="LIVE"),
-            soup.find("div", text="Match in progress")
-        ]
-        
-        # Check if any live indicators were found
-        is_live = any(indicator is not None for indicator in live_indicators)
-        
-        return "live" if is_live else "completed"
+        # The snapshot is shared with commentary and ingestion for this match
+        snapshot = get_snapshot(match_url)
+        return "live" if snapshot.is_live else "completed"
     except Exception as e:
         print(f"Error checking match status: {e}")
         return "unknown"
-    finally:
-        driver.quit()
 
 # If run directly, test the functions
 if __name__ == "__main__":
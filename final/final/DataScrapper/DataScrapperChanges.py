@@ -0,0 +1,143 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+from tracing import span, incr
+from DataScrapper.DataScrapperSnapshot import clean_page_text
+from DataScrapper.DataScrapperParse import MATCH_REGION_CLASS
+
+# Pages remembered at once; the least recently ingested is dropped first
+MAX_TRACKED_PAGES = int(os.getenv("CHANGE_TRACKER_MAX_PAGES", "64"))
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def page_sections(soup) -> List[str]:
+    """
+    Cleaned text of each match region of the parsed page (header, scorecard,
+    commentary, ...), in page order. Regions nested in another region belong
+    to it. Whether or not the parse was strained, the sections are the same
+    regions, rather than whatever wrapper the body happens to start with;
+    a page with no recognised region falls back to the body's top-level
+    blocks.
+    """
+    regions, seen = [], set()
+    for tag in soup.find_all(attrs={"class": MATCH_REGION_CLASS}):
+        if not any(id(parent) in seen for parent in tag.parents):
+            regions.append(tag)
+        seen.add(id(tag))
+    if not regions:
+        regions = (soup.body or soup).find_all(recursive=False)
+    sections = []
+    for region in regions:
+        text = clean_page_text(region)
+        if text:
+            sections.append(text)
+    return sections
+
+
+class _PageState:
+    __slots__ = ("page_hash", "hashes", "sections", "docs")
+
+    def __init__(self, page_hash, hashes, sections, docs):
+        self.page_hash = page_hash
+        self.hashes = hashes      # section hashes in page order
+        self.sections = sections  # section hash -> chunk documents
+        self.docs = docs          # every document from the last ingestion
+
+
+class ChangeTracker:
+    """
+    Fingerprints of the last ingested version of each match page.
+
+    An identical page source short-circuits with one hash and no parse.
+    Otherwise the page is cut into its match regions and only sections
+    whose text hash is new are split again; unchanged sections reuse their
+    chunks. Pages are keyed by (url, innings); at most `max_pages` are kept,
+    least recently used first out, and a finished match can be dropped
+    with forget().
+    """
+
+    def __init__(self, max_pages: int = MAX_TRACKED_PAGES):
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[tuple, _PageState]" = OrderedDict()
+        self.stats = {"unchanged": 0, "changed": 0, "sections_reused": 0, "sections_split": 0}
+
+    def documents(self, snapshot, split: Callable[[str], list],
+                  extra: Callable[[], list] = lambda: []) -> Tuple[list, bool]:
+        """
+        Documents for the snapshot and whether any changed since the last
+        call for the same page. `split(text)` chunks one section; `extra()`
+        builds the documents not derived from section text (deliveries).
+        """
+        key = (snapshot.url, snapshot.innings)
+        page_hash = fingerprint(snapshot.page_source)
+        with self._lock:
+            previous = self._pages.get(key)
+            if previous is not None:
+                self._pages.move_to_end(key)
+        if previous is not None and previous.page_hash == page_hash:
+            self._skipped(snapshot, "identical page")
+            return previous.docs, False
+
+        with span("ingest.fingerprint"):
+            sections = page_sections(snapshot.soup)
+            hashes = [fingerprint(text) for text in sections]
+        cached = previous.sections if previous is not None else {}
+        if previous is not None and previous.hashes == hashes:
+            with self._lock:
+                previous.page_hash = page_hash
+            self._skipped(snapshot, "no section changed")
+            return previous.docs, False
+
+        chunks, docs, reused = {}, [], 0
+        for section_hash, text in zip(hashes, sections):
+            section_docs = chunks.get(section_hash) or cached.get(section_hash)
+            if section_docs is None:
+                section_docs = split(text)
+            else:
+                reused += 1
+            chunks[section_hash] = section_docs
+            docs.extend(section_docs)
+        # Page order lets the context budgeter stitch neighbouring chunks back together
+        for seq, doc in enumerate(docs):
+            doc.metadata["seq"] = seq
+        docs.extend(extra())
+
+        with self._lock:
+            self._pages[key] = _PageState(page_hash, hashes, chunks, docs)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+            self.stats["changed"] += 1
+            self.stats["sections_reused"] += reused
+            self.stats["sections_split"] += len(chunks) - reused
+        incr("ingest.sections_reused", reused)
+        incr("ingest.sections_split", len(chunks) - reused)
+        if previous is not None:
+            logging.info(f"{snapshot.url}: re-split {len(chunks) - reused} of {len(chunks)} sections")
+        return docs, True
+
+    def _skipped(self, snapshot, reason: str) -> None:
+        with self._lock:
+            self.stats["unchanged"] += 1
+        incr("ingest.unchanged")
+        logging.info(f"{snapshot.url}: {reason}, skipped split and indexing")
+
+    def forget(self, url: str) -> None:
+        """Drop every innings page of a match, e.g. once it has completed"""
+        with self._lock:
+            for key in [k for k in self._pages if k[0] == url]:
+                del self._pages[key]
+
+
+_tracker = ChangeTracker()
+
+
+def get_tracker() -> ChangeTracker:
+    return _tracker
@@ -1,26 +1,20 @@
-from selenium import webdriver
-from bs4 import BeautifulSoup
 import time
-import pickle
-import os
-from typing import List, Union
-
-# Create a single WebDriver instance
-driver = None
-
-def initialize_driver():
-    """Initialize the WebDriver if not already initialized"""
-    global driver
-    if driver is None:
-        driver = webdriver.Chrome()
-    return driver
+import threading
+from typing import Iterator, List, Optional, Set, Tuple
+from DataScrapper.DataScrapperDriverPool import get_feed_pool, shutdown_pool
+from DataScrapper.DataScrapperSnapshot import (
+    get_snapshot, is_live_soup, match_pause, select_innings
+)
+from DataScrapper.DataScrapperWaits import wait_for_element, COMMENTARY_SELECTOR
+from DataScrapper.DataScrapperParse import parse_html, parse_match_page
+from DataScrapper.DataScrapperDelivery import Delivery, parse_delivery, parse_deliveries
+from DataScrapper.DataScrapperCommentaryStore import delivery_key, get_store, match_id_from_url
+from tracing import span, incr
 
 def close_driver():
-    """Close the WebDriver if it exists"""
-    global driver
-    if driver is not None:
-        driver.quit()
-        driver = None
+    """Shut down the shared WebDriver pool and quit its browsers"""
+    close_feeds()
+    shutdown_pool()
 
 def get_commentary_js(innings_val: str, url: str) -> List[str]:
     """
@@ -33,88 +27,40 @@ def get_commentary_js(innings_val: str, url: str) -> List[str]:
     Returns:
         List of commentary strings or a message if not available
     """
-    global driver
-    
     try:
-        # Initialize driver if needed
-        if driver is None:
-            driver = webdriver.Chrome()
-        
-        # Load the page
-        driver.get(url)
-        time.sleep(5)  # Wait for page to fully load
-        
-        # Check if the match is live or completed
-        is_live = check_if_live(driver)
-        
-        # Try to set the innings using JavaScript
-        try:
-            # Set the dropdown value using JS
-            driver.execute_script(f"""
-                const dropdown = document.querySelector('select.mcSelectDefault.inningsList');
-                if (dropdown) {{
-                    dropdown.value = '{innings_val}';
-                    const event = new Event('change', {{ bubbles: true }});
-                    dropdown.dispatchEvent(event);
-                }}
-            """)
-            time.sleep(3)  # Wait for commentary to load
-        except Exception as e:
-            print(f"Error setting innings: {e}")
-            # If we can't set innings, continue with whatever is displayed
-        
-        # Now extract the commentary
-        return extract_commentary(driver)
+        match_id = match_id_from_url(url)
+        # Completed innings are never scraped twice; live ones are reused within their TTL
+        if get_store().is_fresh(match_id, innings_val):
+            stored = load_commentary(match_id, innings_val)
+            if stored:
+                return stored
+
+        # Shares the page load and parse with status checks and ingestion.
+        # Only an announced result freezes the innings; a live page unfreezes it
+        snapshot = get_snapshot(url, innings=innings_val)
+        return commentary_or_cached(
+            snapshot.deliveries, match_id, innings_val, completed=snapshot.is_completed
+        )
         
     except Exception as e:
         print(f"Error in get_commentary_js: {e}")
         return ["Error fetching commentary. Please try again."]
 
-def extract_commentary(driver) -> List[str]:
+def extract_commentary(driver, match_id: str, innings_val: str) -> List[str]:
     """Extract commentary from the current page"""
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    # Try different selectors for commentary text
-    selectors = [
-        {"class": "cmdText ng-scope"},
-        {"class": "cmdOver"}
-    ]
-        # bigboxes = soup.find_all("div", {"class": "commentaryText"})
-    bigboxes1 = soup.find_all("div", {"class": "cmdText"})
-    runOver = soup.find_all("p", {"class": "cmdOver"})
-    commentary = [box.text.strip() for box in bigboxes1]
-    # print(commentary[1])
-    run_and_Over = [box.text.strip() for box in runOver]
-    cleaned = [item for item in run_and_Over if item.strip() != '']
-    # print(run_and_Over[1])
-    result = ["Over- " + str(x) + " " + "Runs- " + str(y) for x, y in zip(cleaned, commentary)]
-    if len(result) > 0:
+    soup = parse_match_page(driver.page_source)
+    return commentary_or_cached(parse_deliveries(soup), match_id, innings_val)
+
+def commentary_or_cached(deliveries: List[Delivery], match_id: str, innings_val: str,
+                         completed: Optional[bool] = None) -> List[str]:
+    """Store freshly parsed deliveries, or fall back to this innings' stored copy"""
+    if len(deliveries) > 0:
         # Save commentary for caching
-        save_commentary(result)
-        return result
-    # bigboxes = soup.find_all("div", {"class": "cmdText ng-scope"})
-    # runOver = soup.find_all("p", {"class": "cmdOver"})
-    # commentary = [box.text.strip() for box in bigboxes]
-    # print(commentary[0])
-    # run_and_Over = [box.text.strip() for box in runOver]
-    # print(run_and_Over[0])
-    # result = [str(x) + " " + str(y) for x, y in zip(run_and_Over, commentary)]
-    # if len(result) > 0:
-    #             # Save commentary for caching
-    #             save_commentary(result)
-    #             return result
-    
-    # for selector in selectors:
-    #     bigboxes = soup.find_all("div", selector)
-    #     if bigboxes:
-    #         commentary = [box.text.strip() for box in bigboxes]
-    #         if len(commentary) > 0:
-    #             # Save commentary for caching
-    #             save_commentary(commentary)
-    #             return commentary
-    
+        save_commentary(deliveries, match_id, innings_val, completed=completed)
+        return [str(delivery) for delivery in deliveries]
+
     # If no commentary found, try to load from cache
-    cached_commentary = load_commentary()
+    cached_commentary = load_commentary(match_id, innings_val)
     if cached_commentary:
         return cached_commentary
     
@@ -122,33 +68,223 @@ def extract_commentary(driver) -> List[str]:
 
 def check_if_live(driver) -> bool:
     """Check if the current match is live"""
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
-    
-    # Look for live indicators
-    live_indicators = [
-        soup.find("div", {"class": "liveIndicator"}),
-        soup.find("span", text="LIVE"),
-        soup.find("div", text="Match in progress")
-    ]
-    
-    # Check if any live indicators were found
-    return any(indicator is not None for indicator in live_indicators)
+    soup = parse_match_page(driver.page_source)
+    return is_live_soup(soup)
 
-def save_commentary(commentary: List[str]):
-    """Save commentary to pickle file for caching"""
+def save_commentary(deliveries: List[Delivery], match_id: str, innings_val: str,
+                    completed: Optional[bool] = None):
+    """Append an innings' deliveries (newest first, as scraped) to the commentary store"""
     try:
-        with open("commentary_cache.pkl", "wb") as f:
-            pickle.dump(commentary, f)
+        get_store().append(match_id, innings_val, reversed(deliveries), completed=completed)
     except Exception as e:
         print(f"Error saving commentary: {e}")
 
-def load_commentary() -> List[str]:
-    """Load commentary from pickle file"""
+def load_commentary(match_id: str, innings_val: str) -> List[str]:
+    """Load one innings' commentary from the commentary store"""
     try:
-        if os.path.exists("commentary_cache.pkl"):
-            with open("commentary_cache.pkl", "rb") as f:
-                return pickle.load(f)
+        return [str(delivery) for delivery in get_store().get(match_id, innings_val)]
     except Exception as e:
         print(f"Error loading commentary: {e}")
     return []
 
+# Reads commentary entries newest-first, stopping at the first already-seen
+# key, so each poll only walks and transfers the new deliveries
+NEW_ENTRIES_JS = """
+const known = new Set(arguments[0]);
+const nodes = document.querySelectorAll('p.cmdOver, div.cmdText');
+const entries = [];
+let over = null;
+for (const node of nodes) {
+    const text = node.textContent.trim();
+    if (node.matches('p.cmdOver')) {
+        if (text !== '') { over = text; }
+        continue;
+    }
+    if (over === null) { continue; }
+    if (known.has(over + '|' + text)) { break; }
+    entries.push([over, text]);
+    over = null;
+}
+return entries;
+"""
+
+# The elements is_live_soup and match_pause look at: match header, newest
+# commentary entry and the live indicators, as one small HTML fragment
+STATUS_JS = """
+const picked = [];
+for (const selector of ['div.mcHeader', 'div.cmdText', 'div.liveIndicator']) {
+    const node = document.querySelector(selector);
+    if (node) { picked.push(node.outerHTML); }
+}
+for (const node of document.querySelectorAll('span, div')) {
+    const text = node.textContent.trim();
+    if ((node.tagName === 'SPAN' && text === 'LIVE') ||
+            (node.tagName === 'DIV' && text === 'Match in progress')) {
+        picked.push(node.outerHTML);
+    }
+}
+return picked.join('');
+"""
+
+# How many of the newest keys are sent to the page as stop markers
+STOP_KEYS = 12
+
+
+class CommentaryFeed:
+    """
+    Incremental commentary for one match innings.
+
+    The page is loaded once on a driver from the feed pool and kept open;
+    each poll only extracts the entries added since the previous poll, so the
+    work per poll scales with the number of new deliveries, not the match
+    length. status() reads live/paused state from the same open page.
+    Opening fails at once with TimeoutError when every feed driver is taken.
+    """
+
+    def __init__(self, url: str, innings_val: str, reload_after_idle: int = 30):
+        self.url = url
+        self.innings_val = str(innings_val)
+        self.reload_after_idle = reload_after_idle
+        self.entries: List[str] = []
+        self.deliveries: List[Delivery] = []
+        self._seen = set()
+        self._recent_raw = []
+        self._idle_polls = 0
+        self._driver = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self._driver is None:
+            # Never wait for a feed driver: the caller falls back to a page fetch
+            self._driver = get_feed_pool().checkout(timeout=0)
+        try:
+            self._driver.get(self.url)
+            wait_for_element(self._driver, COMMENTARY_SELECTOR, label="commentary feed")
+            select_innings(self._driver, self.innings_val)
+        except Exception:
+            # Hand the driver back; the pool health-checks it on the next checkout
+            self._release()
+            raise
+        self._idle_polls = 0
+
+    def poll(self) -> List[str]:
+        """
+        Return the commentary entries added since the last poll, newest first
+        (the same order and format as get_commentary_js)
+        """
+        with self._lock, span("commentary.poll"):
+            if self._driver is None or self._idle_polls >= self.reload_after_idle:
+                # First poll, or the DOM may have stopped updating: reload once
+                self._open()
+            try:
+                raw = self._driver.execute_script(NEW_ENTRIES_JS, self._recent_raw[:STOP_KEYS])
+            except Exception:
+                # Broken session: hand the driver back for recycling and retry next poll
+                self._release(discard=True)
+                raise
+
+            delta = []
+            new_deliveries = []
+            for over, text in raw or []:
+                delivery = parse_delivery(over, text)
+                if delivery is None:
+                    continue  # No over.ball to key it by
+                # Same key as the commentary store: wides sharing a ball stay distinct
+                key = delivery_key(delivery)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+                delta.append((over, text))
+                new_deliveries.append(delivery)
+
+            self._idle_polls = 0 if delta else self._idle_polls + 1
+            incr("commentary.new_balls", len(delta))
+            if not delta:
+                return []
+
+            self._recent_raw = [over + "|" + text for over, text in delta] + self._recent_raw[:STOP_KEYS]
+            new_entries = ["Over- " + over + " " + "Runs- " + text for over, text in delta]
+            self.entries = new_entries + self.entries
+            self.deliveries = new_deliveries + self.deliveries
+            save_commentary(new_deliveries, match_id_from_url(self.url), self.innings_val)
+            return new_entries
+
+    def status(self) -> Tuple[bool, Optional[str]]:
+        """(is live, pause) from the open page, without loading it again"""
+        with self._lock, span("commentary.status"):
+            if self._driver is None:
+                self._open()
+            try:
+                html = self._driver.execute_script(STATUS_JS)
+            except Exception:
+                self._release(discard=True)
+                raise
+            soup = parse_html(html or "")
+            return is_live_soup(soup), match_pause(soup)
+
+    def stream(self, interval: float = 10, should_continue=lambda: True) -> Iterator[str]:
+        """Yield new entries oldest-first as they appear, polling every `interval` seconds"""
+        while should_continue():
+            for entry in reversed(self.poll()):
+                yield entry
+            time.sleep(interval)
+
+    def _release(self, discard=False):
+        if self._driver is not None:
+            get_feed_pool().checkin(self._driver, discard=discard)
+            self._driver = None
+
+    def close(self):
+        """Return the feed's driver to the feed pool"""
+        with self._lock:
+            self._release()
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed(url: str, innings_val: str) -> CommentaryFeed:
+    """
+    Shared feed per (match URL, innings). Switching innings closes the
+    match's other feed so it stops holding a feed driver.
+    """
+    key = (url, str(innings_val))
+    stale = []
+    with _feeds_lock:
+        for other in [k for k in _feeds if k[0] == url and k != key]:
+            stale.append(_feeds.pop(other))
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = CommentaryFeed(url, innings_val)
+    for other in stale:
+        other.close()
+    return feed
+
+
+def find_feed(url: str, innings_val: str) -> Optional[CommentaryFeed]:
+    """The open feed for a match innings, if there is one"""
+    with _feeds_lock:
+        return _feeds.get((url, str(innings_val)))
+
+
+def feed_urls() -> Set[str]:
+    """Matches that currently hold a feed"""
+    with _feeds_lock:
+        return {url for url, _ in _feeds}
+
+
+def close_feed(url: str):
+    """Close every feed of a match, e.g. once it is over or nobody watches it"""
+    with _feeds_lock:
+        feeds = [_feeds.pop(key) for key in [k for k in _feeds if k[0] == url]]
+    for feed in feeds:
+        feed.close()
+
+
+def close_feeds():
+    with _feeds_lock:
+        feeds = list(_feeds.values())
+        _feeds.clear()
+    for feed in feeds:
+        feed.close()
@@ -0,0 +1,189 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Iterable, List, Optional
+from DataScrapper.DataScrapperDelivery import Delivery
+
+STORE_PATH = os.getenv("COMMENTARY_STORE_PATH", "commentary_store.sqlite")
+# Live innings are re-scraped once their stored copy is older than this
+LIVE_TTL = float(os.getenv("COMMENTARY_LIVE_TTL", "10"))
+
+
+def match_id_from_url(url: str) -> str:
+    return url.rstrip('/').split('/')[-1]
+
+
+def delivery_key(delivery: Delivery) -> str:
+    """over.ball plus a text digest, so wides sharing a ball number stay distinct"""
+    return delivery.over_ball + "#" + hashlib.sha1(delivery.text.encode("utf-8")).hexdigest()[:10]
+
+
+class CommentaryStore:
+    """
+    Append-only commentary keyed by (match id, innings).
+
+    Each ball is one row, so appending is O(1) and over ranges are served
+    from an index. Completed innings are kept permanently and never need to
+    be scraped again; live innings carry a freshness TTL.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS deliveries (
+                match_id TEXT NOT NULL,
+                innings TEXT NOT NULL,
+                key TEXT NOT NULL,
+                over INTEGER NOT NULL,
+                ball INTEGER NOT NULL,
+                batter TEXT,
+                bowler TEXT,
+                runs INTEGER NOT NULL,
+                extras INTEGER NOT NULL,
+                wicket INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (match_id, innings, key)
+            );
+            CREATE INDEX IF NOT EXISTS deliveries_by_over
+                ON deliveries (match_id, innings, over, ball);
+            CREATE TABLE IF NOT EXISTS innings (
+                match_id TEXT NOT NULL,
+                innings TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (match_id, innings)
+            );
+        """)
+        # Stores created before innings were versioned lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(innings)")}
+        if "version" not in columns:
+            self._conn.execute("ALTER TABLE innings ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def append(self, match_id: str, innings: str, deliveries: Iterable[Delivery],
+               completed: Optional[bool] = None) -> int:
+        """
+        Add deliveries (oldest first) to an innings; balls already stored are
+        ignored, and the innings' version is bumped when any are new. Returns
+        how many were new. `completed` sets the innings'
+        completed flag (False clears it, e.g. when a match shows as live
+        again); None leaves it as it was.
+        """
+        rows = [
+            (match_id, str(innings), delivery_key(d), d.over, d.ball, d.batter, d.bowler,
+             d.runs, d.extras, int(d.wicket), d.text)
+            for d in deliveries
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO deliveries "
+                "(match_id, innings, key, over, ball, batter, bowler, runs, extras, wicket, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT INTO innings (match_id, innings, completed, updated_at, version) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (match_id, innings) DO UPDATE SET "
+                "completed = CASE WHEN ? IS NULL THEN completed ELSE excluded.completed END, "
+                "updated_at = excluded.updated_at, version = version + ?",
+                (match_id, str(innings), int(bool(completed)), time.time(), int(added > 0),
+                 completed, int(added > 0))
+            )
+            self._conn.commit()
+        return added
+
+    def mark_completed(self, match_id: str, innings: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE innings SET completed = 1 WHERE match_id = ? AND innings = ?",
+                (match_id, str(innings))
+            )
+            self._conn.commit()
+
+    def is_completed(self, match_id: str, innings: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed FROM innings WHERE match_id = ? AND innings = ?",
+                (match_id, str(innings))
+            ).fetchone()
+        return bool(row and row[0])
+
+    def version(self, match_id: str, innings: str) -> int:
+        """Changes whenever new deliveries are stored for the innings"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM innings WHERE match_id = ? AND innings = ?",
+                (match_id, str(innings))
+            ).fetchone()
+        return row[0] if row else 0
+
+    def count(self, match_id: str, innings: str) -> int:
+        """Number of deliveries stored for the innings"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM deliveries WHERE match_id = ? AND innings = ?",
+                (match_id, str(innings))
+            ).fetchone()
+        return row[0]
+
+    def is_fresh(self, match_id: str, innings: str, ttl: float = LIVE_TTL) -> bool:
+        """Completed innings are always fresh; live ones for `ttl` seconds after a write"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed, updated_at FROM innings WHERE match_id = ? AND innings = ?",
+                (match_id, str(innings))
+            ).fetchone()
+        if row is None:
+            return False
+        completed, updated_at = row
+        return bool(completed) or time.time() - updated_at < ttl
+
+    def get(self, match_id: str, innings: str, start_over: Optional[int] = None,
+            end_over: Optional[int] = None) -> List[Delivery]:
+        """
+        Deliveries for an innings, newest first as shown on the site, optionally
+        limited to overs start_over..end_over (inclusive, 0-based as on the site)
+        """
+        query = ("SELECT over, ball, batter, bowler, runs, extras, wicket, text FROM deliveries "
+                 "WHERE match_id = ? AND innings = ?")
+        params = [match_id, str(innings)]
+        if start_over is not None:
+            query += " AND over >= ?"
+            params.append(start_over)
+        if end_over is not None:
+            query += " AND over <= ?"
+            params.append(end_over)
+        # rowid breaks ties between entries sharing a ball number in arrival order
+        query += " ORDER BY over DESC, ball DESC, rowid DESC"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            Delivery(over, ball, batter, bowler, runs, extras, bool(wicket), text)
+            for over, ball, batter, bowler, runs, extras, wicket, text in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CommentaryStore:
+    """Process-wide commentary store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CommentaryStore()
+        return _store
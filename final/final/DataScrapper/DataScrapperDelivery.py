@@ -0,0 +1,149 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+OVER_BALL = re.compile(r"(\d+)\.(\d+)")
+# "Bumrah to Kohli, FOUR, ..." -> bowler, batter, outcome
+# (an extra's outcome may carry a second segment: "no ball, 1 run", "wide, FOUR")
+BOWLER_TO_BATTER = re.compile(
+    r"^\s*(?P<bowler>[^,]+?)\s+to\s+(?P<batter>[^,]+?)\s*,\s*(?P<outcome>[^,.!]*)"
+    r"(?:,\s*(?P<more>\d+\s+runs?|(?i:four|six))\b)?"
+)
+RUNS = re.compile(r"(\d+)\s+runs?\b")
+BOUNDARY = re.compile(r"\b(four|six)\b")
+EXTRAS = re.compile(r"(?:(\d+)\s+)?(wides?|no\s*balls?|leg\s*byes?|byes?)\b")
+WICKET = re.compile(r"\bout\b|\bwicket\b", re.IGNORECASE)
+
+
+class Delivery:
+    """One ball of commentary, parsed into typed fields."""
+
+    __slots__ = ("over", "ball", "batter", "bowler", "runs", "extras", "wicket", "text")
+
+    def __init__(self, over: int, ball: int, batter: Optional[str], bowler: Optional[str],
+                 runs: int, extras: int, wicket: bool, text: str):
+        self.over = over
+        self.ball = ball
+        self.batter = batter
+        self.bowler = bowler
+        self.runs = runs
+        self.extras = extras
+        self.wicket = wicket
+        self.text = text
+
+    @property
+    def over_ball(self) -> str:
+        return f"{self.over}.{self.ball}"
+
+    @property
+    def total_runs(self) -> int:
+        return self.runs + self.extras
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self) -> str:
+        # Same line format the UI and cache have always used
+        return f"Over- {self.over_ball} Runs- {self.text}"
+
+    def __repr__(self) -> str:
+        return (f"Delivery({self.over_ball}, {self.bowler!r} to {self.batter!r}, "
+                f"runs={self.runs}, extras={self.extras}, wicket={self.wicket})")
+
+
+def scored(outcome: str) -> int:
+    """Runs named in a (lower-cased) outcome: 'FOUR', 'SIX' or '2 runs'"""
+    boundary = BOUNDARY.search(outcome)
+    if boundary:
+        return 6 if boundary.group(1) == "six" else 4
+    runs_match = RUNS.search(outcome)
+    return int(runs_match.group(1)) if runs_match else 0
+
+
+def parse_outcome(outcome: str) -> Tuple[int, int, bool]:
+    """
+    Runs off the bat, extras and wicket flag from an outcome like 'FOUR',
+    '2 wides', 'no ball, FOUR' or 'wide, FOUR'
+    """
+    outcome = outcome.strip().lower()
+    wicket = bool(WICKET.search(outcome))
+    runs = 0
+    extras = 0
+
+    extra_match = EXTRAS.search(outcome)
+    if extra_match:
+        kind = extra_match.group(2)
+        if kind.startswith("no"):
+            # A no-ball is one extra plus whatever came off the bat
+            extras = 1
+            runs = scored(outcome)
+        elif extra_match.group(1):
+            extras = int(extra_match.group(1))
+        elif kind.startswith("wide"):
+            # "wide, FOUR": the wide plus the four that ran away
+            extras = 1 + scored(outcome)
+        else:
+            # "leg byes, FOUR" / "byes, 2 runs"; a bare "bye" is one run
+            extras = scored(outcome) or 1
+    else:
+        runs = scored(outcome)
+    return runs, extras, wicket
+
+
+def parse_delivery(over_text: str, text: str) -> Optional[Delivery]:
+    """Build a Delivery from an over marker ('12.3') and its commentary text"""
+    over_match = OVER_BALL.search(over_text)
+    if not over_match:
+        return None
+    over, ball = int(over_match.group(1)), int(over_match.group(2))
+
+    match = BOWLER_TO_BATTER.match(text)
+    if match:
+        outcome, more = match.group("outcome"), match.group("more")
+        # "no run, four fielders out" is not a boundary: only an extra (or an
+        # explicit "N runs") takes its runs from the second segment
+        if more and (more[0].isdigit() or EXTRAS.search(outcome.lower())):
+            outcome += ", " + more
+        runs, extras, wicket = parse_outcome(outcome)
+        return Delivery(over, ball, match.group("batter"), match.group("bowler"),
+                        runs, extras, wicket, text)
+    # Free-form text (e.g. end of over notes): keep it, without ball fields
+    return Delivery(over, ball, None, None, 0, 0, False, text)
+
+
+def pair_entries(nodes: Iterable[Tuple[bool, str]]) -> List[Tuple[str, str]]:
+    """
+    Pair over markers with the commentary that follows them, in document
+    order. Empty markers and commentary without a marker are skipped instead
+    of shifting every later pair, which is what zip() did.
+    """
+    pairs = []
+    over = None
+    for is_over, text in nodes:
+        if is_over:
+            if text:
+                over = text
+        elif over is not None:
+            pairs.append((over, text))
+            over = None
+    return pairs
+
+
+def parse_deliveries(soup) -> List[Delivery]:
+    """All deliveries on a parsed match page, newest first as displayed"""
+    nodes = []
+    for tag in soup.find_all(["p", "div"], class_=["cmdOver", "cmdText"]):
+        classes = tag.get("class") or []
+        if tag.name == "p" and "cmdOver" in classes:
+            nodes.append((True, tag.get_text().strip()))
+        elif tag.name == "div" and "cmdText" in classes:
+            nodes.append((False, tag.get_text().strip()))
+    return parse_pairs(pair_entries(nodes))
+
+
+def parse_pairs(pairs: Iterable[Tuple[str, str]]) -> List[Delivery]:
+    deliveries = []
+    for over_text, text in pairs:
+        delivery = parse_delivery(over_text, text)
+        if delivery is not None:
+            deliveries.append(delivery)
+    return deliveries
@@ -0,0 +1,241 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from contextlib import contextmanager
+import threading
+import logging
+import atexit
+import os
+
+try:
+    import psutil
+except ImportError:  # Memory-based recycling is skipped without psutil
+    psutil = None
+
+# Pool defaults, overridable through the environment
+POOL_SIZE = int(os.getenv("SCRAPER_POOL_SIZE", "2"))
+MAX_PAGES_PER_DRIVER = int(os.getenv("SCRAPER_MAX_PAGES", "50"))
+MAX_DRIVER_MEMORY_MB = int(os.getenv("SCRAPER_MAX_MEMORY_MB", "700"))
+CHECKOUT_TIMEOUT = float(os.getenv("SCRAPER_CHECKOUT_TIMEOUT", "120"))
+# Drivers held open by live commentary feeds, kept apart from the shared pool
+# so long-lived feeds never starve one-off page fetches
+FEED_POOL_SIZE = int(os.getenv("SCRAPER_FEED_POOL_SIZE", "2"))
+
+
+def build_chrome_options():
+    """Headless Chrome options shared by every pooled driver"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Run in headless mode (no browser UI)
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--log-level=3")
+    return chrome_options
+
+
+def default_driver_factory():
+    return webdriver.Chrome(options=build_chrome_options())
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of reusable headless WebDrivers.
+
+    Drivers are created lazily up to `size`, health-checked on checkout and
+    recycled after `max_pages` page loads or once the browser process tree
+    grows past `max_memory_mb`. Checkout blocks when every driver is in use,
+    so concurrent scrapers never run more than `size` Chrome instances.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER,
+                 max_memory_mb=MAX_DRIVER_MEMORY_MB, driver_factory=default_driver_factory):
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.driver_factory = driver_factory
+        self._idle = []
+        self._leased = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "unhealthy": 0}
+
+    def checkout(self, timeout=CHECKOUT_TIMEOUT):
+        """Borrow a healthy driver, creating one if the pool is not full yet"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    pooled = None
+                    break
+                if not self._cond.wait(timeout=timeout):
+                    raise TimeoutError("Timed out waiting for a free WebDriver")
+
+        if pooled is not None and not self._is_healthy(pooled.driver):
+            self.stats["unhealthy"] += 1
+            self._quit(pooled.driver)
+            pooled = None
+
+        if pooled is None:
+            try:
+                pooled = _PooledDriver(self.driver_factory())
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+            self.stats["created"] += 1
+        else:
+            self.stats["reused"] += 1
+
+        with self._cond:
+            self._leased[id(pooled.driver)] = pooled
+        return pooled.driver
+
+    def checkin(self, driver, pages=1, discard=False):
+        """Return a driver to the pool, recycling it if it is worn out"""
+        with self._cond:
+            pooled = self._leased.pop(id(driver), None)
+        if pooled is None:
+            return
+        pooled.pages += pages
+
+        if discard or self._closed or self._needs_recycle(pooled):
+            if not discard:
+                self.stats["recycled"] += 1
+            self._quit(driver)
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return
+
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=CHECKOUT_TIMEOUT):
+        """Context manager around checkout/checkin; broken drivers are discarded"""
+        driver = self.checkout(timeout=timeout)
+        discard = False
+        try:
+            yield driver
+        except Exception:
+            discard = not self._is_healthy(driver)
+            raise
+        finally:
+            self.checkin(driver, discard=discard)
+
+    def _needs_recycle(self, pooled):
+        if pooled.pages >= self.max_pages:
+            return True
+        memory_mb = driver_memory_mb(pooled.driver)
+        return memory_mb is not None and memory_mb > self.max_memory_mb
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting WebDriver: {e}")
+
+    def close(self):
+        """Quit every idle driver; leased drivers are quit when checked in"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled.driver)
+
+
+def driver_memory_mb(driver):
+    """Resident memory of the chromedriver process and its Chrome children, in MB"""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            rss += child.memory_info().rss
+        return rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+_pool = None
+_feed_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide driver pool shared by all scrapers"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = DriverPool()
+        return _pool
+
+
+def get_feed_pool():
+    """
+    Separate budget of drivers for persistent commentary feeds, built with
+    the shared pool's driver factory
+    """
+    global _pool, _feed_pool
+    with _pool_lock:
+        if _feed_pool is None or _feed_pool._closed:
+            if _pool is None or _pool._closed:
+                _pool = DriverPool()
+            _feed_pool = DriverPool(size=FEED_POOL_SIZE, driver_factory=_pool.driver_factory)
+        return _feed_pool
+
+
+def set_pool(pool):
+    """
+    Replace the shared pool (e.g. with one using a different driver factory);
+    the feed pool is rebuilt from it on next use
+    """
+    global _pool, _feed_pool
+    with _pool_lock:
+        old, _pool = _pool, pool
+        feed_pool, _feed_pool = _feed_pool, None
+    if old is not None and old is not pool:
+        old.close()
+    if feed_pool is not None:
+        feed_pool.close()
+
+
+def shutdown_pool():
+    """Close the shared pool and the feed pool"""
+    global _pool, _feed_pool
+    with _pool_lock:
+        pools = (_pool, _feed_pool)
+        _pool = _feed_pool = None
+    for pool in pools:
+        if pool is not None:
+            pool.close()
+
+
+atexit.register(shutdown_pool)
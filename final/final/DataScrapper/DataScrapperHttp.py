@@ -0,0 +1,163 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from DataScrapper.DataScrapperParse import parse_html
+from tracing import span, incr
+
+# Set SCRAPER_HTTP=0 to always render pages in Chrome
+HTTP_ENABLED = os.getenv("SCRAPER_HTTP", "1") != "0"
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "5"))
+HTTP_POOL_SIZE = 8
+# Pages kept for conditional requests (ETag / Last-Modified)
+MAX_CACHED_PAGES = 32
+# After a URL's HTML lacked the required content, go straight to the browser for this long
+MISS_COOLDOWN = float(os.getenv("SCRAPER_HTTP_MISS_COOLDOWN", "300"))
+
+USER_AGENT = os.environ.get(
+    "USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class HttpPage:
+    """A page fetched over HTTP, parsed once"""
+
+    __slots__ = ("url", "text", "soup", "etag", "last_modified", "not_modified")
+
+    def __init__(self, url, text, soup, etag=None, last_modified=None, not_modified=False):
+        self.url = url
+        self.text = text
+        self.soup = soup
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+
+
+class HttpFetcher:
+    """
+    Keep-alive HTTP client for pages that don't need JavaScript.
+
+    Connections are pooled in one requests.Session. Each page's ETag and
+    Last-Modified are replayed as conditional headers, so an unchanged page
+    comes back as a bodyless 304 and its cached parse is reused.
+    """
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT, pool_size: int = HTTP_POOL_SIZE,
+                 max_cached: int = MAX_CACHED_PAGES):
+        self.timeout = timeout
+        self.max_cached = max_cached
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        self.stats = {"requests": 0, "not_modified": 0, "errors": 0, "misses": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._pages = OrderedDict()
+        self._miss_until = {}
+
+    def get(self, url: str, parse: Callable = parse_html) -> Optional[HttpPage]:
+        """Fetch and parse a page, or None on a network or HTTP error"""
+        with self._lock:
+            cached = self._pages.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        self.stats["requests"] += 1
+        try:
+            with span("scrape.http"):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.stats["errors"] += 1
+            logging.info(f"HTTP fetch of {url} failed: {e}")
+            return None
+
+        if response.status_code == 304 and cached is not None:
+            self.stats["not_modified"] += 1
+            incr("scrape.http_not_modified")
+            with self._lock:
+                self._pages.move_to_end(url)
+            return HttpPage(url, cached.text, cached.soup, cached.etag, cached.last_modified,
+                            not_modified=True)
+        if response.status_code != 200:
+            self.stats["errors"] += 1
+            return None
+
+        self.stats["bytes"] += len(response.content)
+        with span("scrape.parse"):
+            soup = parse(response.text)
+        page = HttpPage(url, response.text, soup,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"))
+        if page.etag or page.last_modified:
+            with self._lock:
+                self._pages[url] = page
+                self._pages.move_to_end(url)
+                while len(self._pages) > self.max_cached:
+                    self._pages.popitem(last=False)
+        return page
+
+    def fetch_html(self, url: str, required_selector: str,
+                   parse: Callable = parse_html) -> Optional[HttpPage]:
+        """
+        The page over HTTP if it already contains `required_selector`; None
+        means the caller should render it in the browser instead. `parse`
+        turns the HTML into a soup, e.g. parse_match_page for match pages.
+        """
+        if time.time() < self._miss_until.get(url, 0):
+            return None
+        page = self.get(url, parse)
+        if page is None:
+            return None
+        if page.soup.select_one(required_selector) is None:
+            # Content is rendered by JavaScript: don't retry HTTP for a while
+            self.stats["misses"] += 1
+            incr("scrape.http_missing_content")
+            self._miss_until[url] = time.time() + MISS_COOLDOWN
+            return None
+        incr("scrape.http_hits")
+        return page
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+_disabled = not HTTP_ENABLED
+
+
+def get_fetcher() -> Optional[HttpFetcher]:
+    """Process-wide HTTP fetcher, or None when the HTTP path is disabled"""
+    global _fetcher
+    if _disabled:
+        return None
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
+
+
+def set_fetcher(fetcher: Optional[HttpFetcher]) -> None:
+    """Replace the fetcher (tests, benchmarks); None disables the HTTP path"""
+    global _fetcher, _disabled
+    with _fetcher_lock:
+        _fetcher = fetcher
+        _disabled = fetcher is None
+
+
+def fetch_html(url: str, required_selector: str, parse: Callable = parse_html) -> Optional[HttpPage]:
+    """HTTP first: the page if it carries the required content, else None"""
+    fetcher = get_fetcher()
+    if fetcher is None:
+        return None
+    return fetcher.fetch_html(url, required_selector, parse)
@@ -1,22 +1,18 @@
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import requests
 import pandas as pd
-import time
-import re
 import logging
-# Setup Chrome options for faster loading
-chrome_options = Options()
-chrome_options.add_argument("--headless")  # Run in headless mode (no browser UI)
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--log-level=3")
+from DataScrapper.DataScrapperDriverPool import build_chrome_options
+from DataScrapper.DataScrapperSnapshot import get_snapshot
+from DataScrapper.DataScrapperChanges import get_tracker, page_sections
+from tracing import span, incr
+from recency import annotate_chunks, delivery_documents
+# Setup Chrome options for faster loading (applied to every pooled driver)
+chrome_options = build_chrome_options()
 # ----------------------------
 # Setup Logging
 # ----------------------------
@@ -30,24 +26,52 @@ logging.basicConfig(
 )
 
 def load_data(url):
-    driver = webdriver.Chrome()  # Or any driver you're using
-    driver.get(url)  # Replace with your target URL
+    docs, _ = load_changes(url)
+    return docs
+
+def load_changes(url):
+    """
+    Documents for a match page and whether they changed since the last call;
+    an unchanged page is not split again, a changed one only in the sections
+    whose text differs
+    """
+    # Reuses the page fetched for status/commentary in this cycle, if fresh
+    snapshot = get_snapshot(url)
+    return get_tracker().documents(
+        snapshot,
+        split=lambda text: split_section(text, snapshot.innings),
+        extra=lambda: delivery_docs(snapshot)
+    )
 
-    # Wait for the dynamic content to load (e.g., with time.sleep or WebDriverWait)
-    time.sleep(3)
+def documents_from_snapshot(snapshot):
+    """
+    Chunk and delivery documents for a fetched page; CPU only, no browser.
+    The page is split section by section like load_changes does, so a bulk
+    backfill and the ingestion worker produce the same chunks and chunk ids.
+    Chunks are left unnumbered: the caller assigns `seq` once it has merged
+    every page of the match.
+    """
+    chunks = [
+        doc for text in page_sections(snapshot.soup)
+        for doc in split_section(text, snapshot.innings)
+    ]
+    return chunks, delivery_docs(snapshot)
 
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    raw_text = soup.get_text()
-    clean_text = re.sub(r'[\n\r\t\b]+', ' ', raw_text)  # Remove newlines, tabs, backspaces
-    clean_text = re.sub(r'\s+', ' ', clean_text)        # Replace multiple spaces with a single space
-    clean_text = clean_text.strip() 
+def split_section(text, innings=None):
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=450,
         chunk_overlap=70,
         
     )
     logging.info(f"Splitting text into chunks")
-    docs=text_splitter.create_documents([clean_text])
+    with span("ingest.split"):
+        docs=text_splitter.create_documents([text])
+    # Over metadata drives recency scoring and the last-overs window
+    annotate_chunks(docs, innings)
+    incr("ingest.chunks", len(docs))
     return docs
 
+def delivery_docs(snapshot):
+    deliveries = delivery_documents(snapshot.deliveries, snapshot.innings)
+    incr("ingest.deliveries", len(deliveries))
+    return deliveries
@@ -0,0 +1,47 @@
+import re
+import importlib.util
+from bs4 import BeautifulSoup, SoupStrainer
+from tracing import span, incr
+
+# lxml builds the tree several times faster than the pure-Python parser
+PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+# Straining only pays off with lxml; html.parser is slower per tag when
+# strained than when it builds the whole page
+STRAIN = PARSER == "lxml"
+
+# Match-page regions worth parsing: the match-centre header and innings
+# dropdown (mc*), commentary entries (cmd*), scorecard, commentary wrappers
+# and live indicators. Navigation, footer, scripts and styles are never built.
+MATCH_REGION_CLASS = re.compile(r"(^|\s)(mc|cmd)|scorecard|commentary|live", re.IGNORECASE)
+MATCH_REGIONS = SoupStrainer(attrs={"class": MATCH_REGION_CLASS})
+# Live indicators recognised by their text alone (see is_live_soup). A
+# strainer only sees tag names and attributes, so these are cut out of the
+# raw markup and added to the strained tree.
+LIVE_TEXT_INDICATOR = re.compile(r"<(span|div)\b[^>]*>\s*(?:LIVE|Match in progress)\s*</\1>")
+
+
+def parse_html(html: str, parse_only: SoupStrainer = None) -> BeautifulSoup:
+    """Parse with the fastest available backend, optionally only the strained tags"""
+    return BeautifulSoup(html, PARSER, parse_only=parse_only)
+
+
+def parse_match_page(html: str) -> BeautifulSoup:
+    """
+    A match page reduced to its header, scorecard, commentary and live
+    indicator regions when lxml is installed, otherwise the whole page.
+    Falls back to the whole page if none of the regions are found, so a
+    markup change degrades to the old full parse instead of an empty page.
+    """
+    with span("scrape.parse"):
+        if not STRAIN:
+            return parse_html(html)
+        soup = parse_html(html, MATCH_REGIONS)
+        if soup.find() is None:
+            incr("scrape.parse_full_fallback")
+            return parse_html(html)
+        for indicator in LIVE_TEXT_INDICATOR.finditer(html):
+            tag = parse_html(indicator.group(0)).find(indicator.group(1))
+            # Indicators with a region class are already in the strained tree
+            if tag is not None and not MATCH_REGION_CLASS.search(" ".join(tag.get("class", []))):
+                soup.append(tag)
+    return soup
@@ -0,0 +1,257 @@
+from bs4 import BeautifulSoup
+from typing import List, Optional
+import threading
+import logging
+import time
+import re
+import os
+from tracing import span, incr
+from DataScrapper.DataScrapperDriverPool import get_pool
+from DataScrapper.DataScrapperHttp import fetch_html
+from DataScrapper.DataScrapperParse import parse_match_page
+from DataScrapper.DataScrapperDelivery import Delivery, parse_deliveries
+from DataScrapper.DataScrapperWaits import (
+    wait_for_element, wait_for_replacement, first_element,
+    COMMENTARY_SELECTOR, MATCH_PAGE_SELECTOR
+)
+
+# How long a fetched page is shared between status, commentary and ingestion
+SNAPSHOT_TTL = float(os.getenv("SCRAPER_SNAPSHOT_TTL", "8"))
+
+INNINGS_DROPDOWN_JS = "select.mcSelectDefault.inningsList"
+
+# Pauses in play announced in the match header or the latest commentary entry
+INNINGS_BREAK = re.compile(r"innings break|mid-?innings|end of (the )?(1st|first) innings", re.IGNORECASE)
+TIMEOUT = re.compile(r"strategic time-?out|drinks break|rain (delay|stops play|has stopped play)", re.IGNORECASE)
+# A finished match states its result in the header
+RESULT = re.compile(
+    r"\bwon by\b|\bwon the super over\b|\bmatch (tied|abandoned|drawn)\b|\bno result\b",
+    re.IGNORECASE
+)
+RESULT_REGION = re.compile(r"mcHeader|result", re.IGNORECASE)
+
+
+class MatchSnapshot:
+    """
+    One fetch of a match page, parsed at most once.
+
+    The soup, live flag, deliveries and cleaned text are derived lazily from
+    the same page source and cached on the snapshot, so every consumer in a
+    refresh cycle shares one browser load and one parse. Only the header,
+    scorecard and commentary regions are parsed (see DataScrapperParse).
+    """
+
+    def __init__(self, url: str, page_source: str, innings: Optional[str] = None, soup=None):
+        self.url = url
+        self.page_source = page_source
+        self.innings = innings
+        self.fetched_at = time.time()
+        self._lock = threading.Lock()
+        self._soup = soup
+        self._is_live = None
+        self._pause = False
+        self._result = False
+        self._deliveries = None
+        self._clean_text = None
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        with self._lock:
+            if self._soup is None:
+                self._soup = parse_match_page(self.page_source)
+            return self._soup
+
+    @property
+    def is_live(self) -> bool:
+        if self._is_live is None:
+            self._is_live = is_live_soup(self.soup)
+        return self._is_live
+
+    @property
+    def pause(self) -> Optional[str]:
+        """"innings_break", "timeout" or None while play is on"""
+        if self._pause is False:
+            self._pause = match_pause(self.soup)
+        return self._pause
+
+    @property
+    def result(self) -> Optional[str]:
+        """The announced result ("RCB won by 3 runs"), or None while undecided"""
+        if self._result is False:
+            self._result = match_result(self.soup)
+        return self._result
+
+    @property
+    def is_completed(self) -> Optional[bool]:
+        """
+        True once a result is announced, False while the match shows as live,
+        None when the page says neither (innings break, delay, missing indicator)
+        """
+        if self.is_live:
+            return False
+        return True if self.result is not None else None
+
+    @property
+    def deliveries(self) -> List[Delivery]:
+        if self._deliveries is None:
+            soup = self.soup
+            with span("scrape.deliveries"):
+                self._deliveries = parse_deliveries(soup)
+        return self._deliveries
+
+    @property
+    def commentary(self) -> List[str]:
+        return [str(delivery) for delivery in self.deliveries]
+
+    @property
+    def clean_text(self) -> str:
+        if self._clean_text is None:
+            soup = self.soup
+            with span("scrape.clean_text"):
+                self._clean_text = clean_page_text(soup)
+        return self._clean_text
+
+
+def is_live_soup(soup) -> bool:
+    """Check a parsed match page for live indicators"""
+    live_indicators = [
+        soup.find("div", {"class": "liveIndicator"}),
+        soup.find("span", text="LIVE"),
+        soup.find("div", text="Match in progress")
+    ]
+    return any(indicator is not None for indicator in live_indicators)
+
+
+def match_pause(soup) -> Optional[str]:
+    """Whether play is paused, from the match header and the newest commentary entry"""
+    header = soup.find("div", class_="mcHeader")
+    latest = soup.find("div", class_="cmdText")
+    text = " ".join(tag.get_text(" ") for tag in (header, latest) if tag is not None)
+    if TIMEOUT.search(text):
+        return "timeout"
+    if INNINGS_BREAK.search(text):
+        return "innings_break"
+    return None
+
+
+def match_result(soup) -> Optional[str]:
+    """Result text from the match header or a result banner, if the match is decided"""
+    texts = [" ".join(tag.get_text(" ").split()) for tag in soup.find_all(class_=RESULT_REGION)]
+    decided = [text for text in texts if RESULT.search(text)]
+    # The innermost tag (a result banner inside the header) reads best
+    return min(decided, key=len) if decided else None
+
+
+def parse_commentary(soup) -> List[str]:
+    """Commentary lines ("Over- 12.3 Runs- ...") from a parsed match page"""
+    return [str(delivery) for delivery in parse_deliveries(soup)]
+
+
+def clean_page_text(soup) -> str:
+    """Text of a parsed page (its match regions) with whitespace collapsed, as fed to the text splitter"""
+    raw_text = soup.get_text()
+    clean_text = re.sub(r'[\n\r\t\b]+', ' ', raw_text)  # Remove newlines, tabs, backspaces
+    clean_text = re.sub(r'\s+', ' ', clean_text)        # Replace multiple spaces with a single space
+    return clean_text.strip()
+
+
+def select_innings(driver, innings_val: str) -> None:
+    """Switch the innings dropdown and wait for its commentary to render"""
+    try:
+        before = first_element(driver, COMMENTARY_SELECTOR)
+        # Set the dropdown value using JS; only report a change if it switched innings
+        changed = driver.execute_script(f"""
+            const dropdown = document.querySelector('{INNINGS_DROPDOWN_JS}');
+            if (dropdown && dropdown.value !== '{innings_val}') {{
+                dropdown.value = '{innings_val}';
+                const event = new Event('change', {{ bubbles: true }});
+                dropdown.dispatchEvent(event);
+                return true;
+            }}
+            return false;
+        """)
+        if changed:
+            # Wait for the other innings' commentary to replace the current one
+            wait_for_replacement(driver, before, COMMENTARY_SELECTOR, label="innings change")
+    except Exception as e:
+        logging.warning(f"Error setting innings: {e}")
+        # If we can't set innings, continue with whatever is displayed
+
+
+def current_innings(driver) -> Optional[str]:
+    """Innings currently shown in the dropdown, if the page has one"""
+    try:
+        return driver.execute_script(
+            f"const d = document.querySelector('{INNINGS_DROPDOWN_JS}'); return d ? d.value : null;"
+        )
+    except Exception:
+        return None
+
+
+def page_innings(soup) -> Optional[str]:
+    """Innings selected in a static page's dropdown, if it has one"""
+    option = soup.select_one("select.inningsList option[selected]")
+    return option.get("value") if option is not None else None
+
+
+def fetch_snapshot(url: str, innings: Optional[str] = None) -> MatchSnapshot:
+    """
+    Load a match page once, optionally switching innings: over plain HTTP
+    when the served HTML already has the commentary for that innings, else
+    on a pooled driver
+    """
+    page = fetch_html(url, MATCH_PAGE_SELECTOR, parse=parse_match_page)
+    if page is not None:
+        shown = page_innings(page.soup)
+        # Switching innings needs the browser unless the page already shows it
+        if innings is None or shown == str(innings):
+            incr("scrape.fetch_http")
+            return MatchSnapshot(url, page.text, innings=shown or innings, soup=page.soup)
+
+    incr("scrape.fetch_webdriver")
+    with span("scrape.fetch"), get_pool().driver() as driver:
+        driver.get(url)
+        wait_for_element(driver, MATCH_PAGE_SELECTOR, label="match page")
+        if innings is not None:
+            select_innings(driver, innings)
+        shown = current_innings(driver)
+        return MatchSnapshot(url, driver.page_source, innings=shown or innings)
+
+
+_snapshots = {}
+_url_locks = {}
+_cache_lock = threading.Lock()
+snapshot_stats = {"fetches": 0, "hits": 0}
+
+
+def get_snapshot(url: str, innings: Optional[str] = None, ttl: float = SNAPSHOT_TTL) -> MatchSnapshot:
+    """
+    Return a fresh snapshot of `url`, fetching only if the cached one is older
+    than `ttl` or shows a different innings than requested. Concurrent callers
+    for the same URL wait for a single in-flight fetch instead of loading the
+    page again.
+    """
+    with _cache_lock:
+        url_lock = _url_locks.setdefault(url, threading.Lock())
+
+    with url_lock:
+        snapshot = _snapshots.get(url)
+        if (snapshot is not None and snapshot.age() < ttl
+                and (innings is None or snapshot.innings == str(innings))):
+            snapshot_stats["hits"] += 1
+            incr("scrape.snapshot_hits")
+            return snapshot
+
+        snapshot = fetch_snapshot(url, None if innings is None else str(innings))
+        snapshot_stats["fetches"] += 1
+        incr("scrape.snapshot_fetches")
+        _snapshots[url] = snapshot
+        return snapshot
+
+
+def invalidate_snapshot(url: str) -> None:
+    with _cache_lock:
+        _snapshots.pop(url, None)
@@ -0,0 +1,109 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from collections import defaultdict, deque
+import threading
+import logging
+import time
+import os
+
+# Upper bound for any readiness wait; most pages render well before this
+DEFAULT_TIMEOUT = float(os.getenv("SCRAPER_WAIT_TIMEOUT", "10"))
+POLL_FREQUENCY = 0.1
+
+# Selectors the scrapers wait on
+MATCH_LIST_SELECTOR = "ul#team_archive li, div.vn-ticketWrapper"
+COMMENTARY_SELECTOR = "div.cmdText"
+MATCH_PAGE_SELECTOR = "div.cmdText, div.liveIndicator"
+
+# Recent wait durations per label, for tuning timeouts
+_wait_times = defaultdict(lambda: deque(maxlen=500))
+_wait_timeouts = defaultdict(int)
+_stats_lock = threading.Lock()
+
+
+def _record(label, elapsed, timed_out):
+    with _stats_lock:
+        _wait_times[label].append(elapsed)
+        if timed_out:
+            _wait_timeouts[label] += 1
+    logging.debug(f"Wait '{label}' took {elapsed:.3f}s{' (timed out)' if timed_out else ''}")
+
+
+def wait_until(driver, condition, label, timeout=DEFAULT_TIMEOUT):
+    """
+    Wait until `condition` holds, returning as soon as it does.
+
+    Timeouts are not fatal: the caller carries on with whatever has rendered,
+    as it did with the old fixed sleeps. Returns True if the condition was met.
+    """
+    start = time.perf_counter()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        met = True
+    except TimeoutException:
+        met = False
+    _record(label, time.perf_counter() - start, not met)
+    return met
+
+
+def wait_for_element(driver, css_selector, label=None, timeout=DEFAULT_TIMEOUT):
+    """Wait until at least one element matching `css_selector` is in the DOM"""
+    return wait_until(
+        driver,
+        EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)),
+        label or css_selector,
+        timeout
+    )
+
+
+def first_element(driver, css_selector):
+    """First element matching `css_selector`, or None"""
+    elements = driver.find_elements(By.CSS_SELECTOR, css_selector)
+    return elements[0] if elements else None
+
+
+def wait_for_replacement(driver, old_element, css_selector, label=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Wait until `old_element` has been re-rendered, e.g. after the innings
+    dropdown changes. Falls back to waiting for presence if there was nothing
+    rendered before.
+    """
+    if old_element is None:
+        return wait_for_element(driver, css_selector, label, timeout)
+    try:
+        old_text = old_element.text
+    except Exception:
+        old_text = None
+
+    def replaced(driver):
+        try:
+            # Stale means the framework swapped the node out
+            if old_element.text != old_text:
+                return True
+        except Exception:
+            return True
+        return False
+
+    return wait_until(driver, replaced, label or f"{css_selector} replaced", timeout)
+
+
+def wait_stats():
+    """Per-label wait timings: count, timeouts, mean, p50, p95 and max in seconds"""
+    summary = {}
+    with _stats_lock:
+        items = [(label, sorted(times)) for label, times in _wait_times.items()]
+        timeouts = dict(_wait_timeouts)
+    for label, times in items:
+        if not times:
+            continue
+        summary[label] = {
+            "count": len(times),
+            "timeouts": timeouts.get(label, 0),
+            "mean": sum(times) / len(times),
+            "p50": times[len(times) // 2],
+            "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+            "max": times[-1],
+        }
+    return summary
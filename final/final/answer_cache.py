@@ -0,0 +1,202 @@
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional
+from langchain_core.messages import HumanMessage
+from tracing import span, incr
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class _Entry:
+    __slots__ = ("query", "vector", "answer", "created")
+
+    def __init__(self, query, vector, answer):
+        self.query = query
+        self.vector = vector
+        self.answer = answer
+        self.created = time.time()
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by (match id, data version), matched by query similarity.
+
+    Identical questions (after normalisation) hit without any embedding call;
+    paraphrases hit when their cosine similarity clears `threshold`. Entries
+    expire after `ttl` seconds, the cache is LRU-bounded to `max_entries`,
+    and a new data version for a match drops every older answer for it.
+    """
+
+    def __init__(self, embeddings, threshold: float = DEFAULT_THRESHOLD,
+                 ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (match_id, version, normalized query) -> _Entry, in LRU order
+        self._entries = OrderedDict()
+        self._versions = {}
+
+    def _sync_version(self, match_id, version):
+        """Drop answers computed against an older data version of the match"""
+        if self._versions.get(match_id) != version:
+            self._versions[match_id] = version
+            for key in [k for k in self._entries if k[0] == match_id and k[1] != version]:
+                del self._entries[key]
+
+    def _live_entries(self, match_id, version):
+        now = time.time()
+        expired = []
+        for key, entry in self._entries.items():
+            if now - entry.created > self.ttl:
+                expired.append(key)
+            elif key[0] == match_id and key[1] == version:
+                yield key, entry
+        for key in expired:
+            self._entries.pop(key, None)
+
+    def lookup(self, match_id: str, version, query: str) -> Optional[str]:
+        normalized = _normalize(query)
+        with self._lock:
+            self._sync_version(match_id, version)
+            entry = self._entries.get((match_id, version, normalized))
+            if entry is not None and time.time() - entry.created <= self.ttl:
+                self._entries.move_to_end((match_id, version, normalized))
+                return self._hit(entry)
+            candidates = list(self._live_entries(match_id, version))
+
+        if candidates:
+            with span("answer_cache.similarity"):
+                vector = _unit(self.embeddings.embed_query(normalized))
+                best_key, best_score = None, -1.0
+                for key, entry in candidates:
+                    score = sum(a * b for a, b in zip(vector, entry.vector))
+                    if score > best_score:
+                        best_key, best_score = key, score
+            if best_score >= self.threshold:
+                with self._lock:
+                    entry = self._entries.get(best_key)
+                    if entry is not None:
+                        self._entries.move_to_end(best_key)
+                        return self._hit(entry)
+
+        self.misses += 1
+        incr("answer_cache.misses")
+        return None
+
+    def _hit(self, entry):
+        self.hits += 1
+        incr("answer_cache.hits")
+        return entry.answer
+
+    def store(self, match_id: str, version, query: str, answer: str) -> None:
+        normalized = _normalize(query)
+        vector = _unit(self.embeddings.embed_query(normalized))
+        with self._lock:
+            self._sync_version(match_id, version)
+            key = (match_id, version, normalized)
+            self._entries[key] = _Entry(normalized, vector, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class CachedWorkflow:
+    """
+    Compiled LangGraph workflow behind a semantic answer cache.
+
+    `version_fn` returns the current data version of the match; it changes
+    whenever vectordb ingests new chunks, so answers never outlive the data
+    they were generated from. `stream_fn(app, query)` yields answer tokens
+    for the streaming path. Queries for which `bypass_fn(query)` is true
+    (answers that change with every ball) go straight to the workflow.
+    """
+
+    def __init__(self, app, cache: SemanticAnswerCache, match_id: str, version_fn: Callable,
+                 stream_fn: Optional[Callable] = None, bypass_fn: Optional[Callable] = None):
+        self.app = app
+        self.cache = cache
+        self.match_id = match_id
+        self.version_fn = version_fn
+        self.stream_fn = stream_fn
+        self.bypass_fn = bypass_fn
+
+    def _bypass(self, query: str) -> bool:
+        if self.bypass_fn is not None and self.bypass_fn(query):
+            incr("answer_cache.bypassed")
+            return True
+        return False
+
+    def invoke(self, inputs, config=None, **kwargs):
+        messages = inputs["messages"]
+        query = messages[-1].content
+        if self._bypass(query):
+            return self.app.invoke(inputs, config, **kwargs)
+        version = self.version_fn()
+
+        answer = self.cache.lookup(self.match_id, version, query)
+        if answer is not None:
+            return {"messages": list(messages) + [HumanMessage(content=answer)]}
+
+        result = self.app.invoke(inputs, config, **kwargs)
+        self.cache.store(self.match_id, version, query, result["messages"][-1].content)
+        return result
+
+    def stream_answer(self, query: str) -> Iterator[str]:
+        """Yield a cached answer whole, or stream a fresh one and cache it once complete"""
+        if self._bypass(query):
+            yield from self.stream_fn(self.app, query)
+            return
+        version = self.version_fn()
+        answer = self.cache.lookup(self.match_id, version, query)
+        if answer is not None:
+            yield answer
+            return
+
+        parts = []
+        for token in self.stream_fn(self.app, query):
+            parts.append(token)
+            yield token
+        if parts:
+            self.cache.store(self.match_id, version, query, "".join(parts))
+
+    def __getattr__(self, name):
+        return getattr(self.app, name)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache(embeddings) -> SemanticAnswerCache:
+    """Process-wide answer cache, shared by every session"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticAnswerCache(embeddings)
+        return _cache
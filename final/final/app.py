@@ -1,15 +1,21 @@
 import streamlit as st
-import time
-import threading
 import pandas as pd
 import os
 import sys
 from DataScrapper.DataScraperMatchLink import get_match_link, get_match_status, load_match_links
-from DataScrapper.DataScrapperCommentary import get_commentary_js, close_driver
-from DataScrapper.DataScrapperMain import load_data
-from helper import vectordb
-from workflow import create_workflow
+from DataScrapper.DataScrapperCommentary import close_driver
+from helper import attach_retriever, initialize_embeddings
+from workflow import create_cached_workflow, stream_answer
+from ingest_jobs import get_job_queue, collection_name_for
+from answer_cache import get_answer_cache
+from stats_engine import get_match_stats
+from season_index import get_season_index, season_retriever
+from DataScrapper.DataScrapperCommentaryStore import get_store, match_id_from_url
 from langchain_core.messages import HumanMessage
+from DataScrapper.DataScrapperSnapshot import snapshot_stats
+from DataScrapper.DataScrapperWaits import wait_stats
+import tracing
+import router
 
 # Add proper error handling for imports
 try:
@@ -31,6 +37,8 @@ if 'commentary_list' not in st.session_state:
     st.session_state.commentary_list = []
 if 'last_commentary_count' not in st.session_state:
     st.session_state.last_commentary_count = 0
+if 'commentary_markdown' not in st.session_state:
+    st.session_state.commentary_markdown = ""
 if 'match_links' not in st.session_state:
     st.session_state.match_links = []
 if 'match_statuses' not in st.session_state:
@@ -43,10 +51,11 @@ if 'workflow' not in st.session_state:
     st.session_state.workflow = None
 if 'retriever' not in st.session_state:
     st.session_state.retriever = None
-if 'data_loading_active' not in st.session_state:
-    st.session_state.data_loading_active = False
-if 'commentary_loading_active' not in st.session_state:
-    st.session_state.commentary_loading_active = False
+if 'workflow_key' not in st.session_state:
+    st.session_state.workflow_key = None
+
+# Seconds between re-reads of the shared commentary store while auto-refreshing
+COMMENTARY_REFRESH_SECONDS = 10
 
 # Headers and description
 st.title("CricAI: Real-time IPL 2025 Analysis")
@@ -59,6 +68,11 @@ Select a match, view live commentary, and ask questions about the game!
 os.makedirs("./chroma_db", exist_ok=True)
 os.makedirs("./logs", exist_ok=True)
 
+# Optional Prometheus endpoint for the pipeline metrics
+if os.getenv("CRICAI_METRICS_PORT"):
+    tracing.enable()
+    tracing.serve_metrics(int(os.getenv("CRICAI_METRICS_PORT")))
+
 # Sidebar for controls
 st.sidebar.header("Match Selection")
 
@@ -147,7 +161,66 @@ if st.sidebar.button("Use This URL"):
     st.sidebar.success(f"Using custom URL: {manual_url} ({status_indicator})")
 
 # Innings selection
-innings_number = st.sidebar.radio("Select Innings:", [1, 2])
+innings_number = st.sidebar.radio("Select Innings:", [1, 2], key="innings_number")
+
+def current_match_stats(url, innings):
+    """
+    Stats for a match innings, read when a question is asked. The workflow
+    calls this while streaming, outside the script run, so it is given the
+    match and innings instead of reading st.session_state.
+    """
+    if not url:
+        return None
+    return get_match_stats(url, innings)
+
+def recent_commentary(url, innings):
+    """Latest commentary (newest first) for "last over" questions, without scraping"""
+    if not url:
+        return []
+    return [str(d) for d in get_store().get(match_id_from_url(url), str(innings))]
+
+def watch_match(force=False):
+    """
+    Ask the ingestion worker to keep the selected innings up to date. Every
+    session watching an innings shares one job, so it is scraped and indexed
+    once; `force` makes the job due immediately.
+    """
+    url = st.session_state.selected_match_url
+    get_job_queue().request(
+        match_id_from_url(url), url, str(innings_number),
+        live=st.session_state.selected_match_status == "live", force=force
+    )
+
+def current_workflow():
+    """
+    Workflow over the worker-maintained index for the selected match, rebuilt
+    when the match changes or the worker publishes a new data version
+    """
+    url = st.session_state.selected_match_url
+    innings = innings_number
+    match_id = match_id_from_url(url)
+    queue = get_job_queue()
+    key = (match_id, innings, queue.data_version(match_id))
+    if st.session_state.workflow is None or st.session_state.workflow_key != key:
+        collection_name = collection_name_for(url)
+        retriever = attach_retriever(
+            collection_name, live=st.session_state.selected_match_status == "live"
+        )
+        if retriever is None:
+            return None
+        st.session_state.retriever = retriever
+        st.session_state.workflow = create_cached_workflow(
+            retriever, collection_name,
+            stats_fn=lambda: current_match_stats(url, innings),
+            recent_fn=lambda: recent_commentary(url, innings),
+            version_fn=lambda: queue.data_version(match_id),
+            season_retriever=season_retriever()
+        )
+        st.session_state.workflow_key = key
+    return st.session_state.workflow
+
+if not get_job_queue().workers_alive():
+    st.sidebar.warning("No ingestion worker is running. Start one with `python ingest_worker.py`.")
 
 # Main content area - divided into two columns
 col1, col2 = st.columns([1, 1])
@@ -157,75 +230,48 @@ with col1:
     st.header("Match Commentary")
     commentary_container = st.container()
     
-    # Function to update commentary in the background
-    def update_commentary():
-        while st.session_state.commentary_loading_active:
-            if st.session_state.selected_match_url:
-                try:
-                    # Only actively poll if match is live
-                    if st.session_state.selected_match_status == "live":
-                        new_commentary = get_commentary_js(str(innings_number), st.session_state.selected_match_url)
-                        if isinstance(new_commentary, list):
-                            st.session_state.commentary_list = new_commentary
-                        else:
-                            st.session_state.commentary_list = [new_commentary]
-                        time.sleep(10)  # Update every 10 seconds for live matches
-                    else:
-                        # For completed matches, fetch once and then stop
-                        if not st.session_state.commentary_list:
-                            new_commentary = get_commentary_js(str(innings_number), st.session_state.selected_match_url)
-                            if isinstance(new_commentary, list):
-                                st.session_state.commentary_list = new_commentary
-                            else:
-                                st.session_state.commentary_list = [new_commentary]
-                        time.sleep(60)  # Check less frequently for completed matches
-                except Exception as e:
-                    print(f"Error fetching commentary: {e}")
-                    time.sleep(30)  # Longer delay after error
-    
-    # Live match controls
-    if st.session_state.selected_match_status == "live":
-        st.info("🔴 LIVE MATCH - Commentary will update automatically")
-        commentary_auto_refresh = st.checkbox("Auto-refresh commentary", value=True)
-    else:
-        st.info("⚪ COMPLETED MATCH - Showing full commentary")
-        commentary_auto_refresh = st.checkbox("Auto-refresh commentary", value=False)
-    
-    # Handle auto-refresh thread
-    if commentary_auto_refresh and not st.session_state.commentary_loading_active:
-        st.session_state.commentary_loading_active = True
-        commentary_thread = threading.Thread(target=update_commentary)
-        commentary_thread.daemon = True
-        commentary_thread.start()
-    elif not commentary_auto_refresh:
-        st.session_state.commentary_loading_active = False
-    
-    # Manual refresh button
-    if st.button("Refresh Commentary Now"):
-        if st.session_state.selected_match_url:
-            try:
-                with st.status("Fetching commentary..."):
-                    new_commentary = get_commentary_js(str(innings_number), st.session_state.selected_match_url)
-                    if isinstance(new_commentary, list):
-                        st.session_state.commentary_list = new_commentary
-                    else:
-                        st.session_state.commentary_list = [new_commentary]
-                st.success("Commentary refreshed!")
-            except Exception as e:
-                st.error(f"Error: {e}")
-        else:
-            st.warning("Please select a match first")
-    
-    # Display commentary with the most recent at the top
-    with commentary_container:
+    def set_commentary(entries):
+        """Replace the commentary list and rebuild its markdown"""
+        st.session_state.commentary_list = list(entries)
+        st.session_state.commentary_markdown = format_commentary(entries, len(entries))
+
+    def add_commentary(new_entries):
+        """Prepend new entries (newest first) without re-rendering old ones"""
+        total = len(st.session_state.commentary_list) + len(new_entries)
+        st.session_state.commentary_list = new_entries + st.session_state.commentary_list
+        st.session_state.commentary_markdown = (
+            format_commentary(new_entries, total) + st.session_state.commentary_markdown
+        )
+
+    def format_commentary(entries, total):
+        """Markdown for newest-first entries, numbered in match order"""
+        return "".join(
+            f"**Commentary {total - i}:** {comment}\n\n---\n\n"
+            for i, comment in enumerate(entries)
+        )
+
+    def load_stored_commentary():
+        """Pick up the deliveries the ingestion worker has stored since the last read"""
+        if not st.session_state.selected_match_url:
+            return
+        match_id = match_id_from_url(st.session_state.selected_match_url)
+        entries = [str(d) for d in get_store().get(match_id, str(innings_number))]
+        old = st.session_state.commentary_list
+        added = len(entries) - len(old)
+        if added > 0 and entries[added:] == old:
+            add_commentary(entries[:added])
+        elif entries != old:
+            set_commentary(entries)
+
+    def render_commentary():
+        """Display commentary with the most recent at the top"""
+        load_stored_commentary()
         with st.expander("📢 Live Commentary", expanded=True):
             commentary_box = st.empty()
 
             if st.session_state.commentary_list:
-                # Format commentary nicely
-                comment_text = ""
-                for i, comment in enumerate(st.session_state.commentary_list):
-                    comment_text += f"**Commentary {i+1}:** {comment}\n\n---\n\n"
+                # Markdown is maintained incrementally as entries arrive
+                comment_text = st.session_state.commentary_markdown
 
                 # Highlight new comments
                 if len(st.session_state.commentary_list) > st.session_state.last_commentary_count:
@@ -239,71 +285,53 @@ with col1:
             else:
                 commentary_box.info("No commentary available yet. Please select a match and refresh.")
 
+    def watch_and_render_commentary():
+        # Keeps this session's interest in the match alive while it is open
+        if st.session_state.selected_match_url:
+            watch_match()
+        render_commentary()
+    
+    # Live match controls
+    if st.session_state.selected_match_status == "live":
+        st.info("🔴 LIVE MATCH - Commentary will update automatically")
+        commentary_auto_refresh = st.checkbox("Auto-refresh commentary", value=True)
+    else:
+        st.info("⚪ COMPLETED MATCH - Showing full commentary")
+        commentary_auto_refresh = st.checkbox("Auto-refresh commentary", value=False)
+    
+    # Manual refresh button
+    if st.button("Refresh Commentary Now"):
+        if st.session_state.selected_match_url:
+            watch_match(force=True)
+            st.success("Commentary refresh queued for the ingestion worker")
+        else:
+            st.warning("Please select a match first")
+    
+    with commentary_container:
+        if commentary_auto_refresh:
+            # Re-read the shared store periodically without rerunning the whole page
+            st.fragment(run_every=COMMENTARY_REFRESH_SECONDS)(watch_and_render_commentary)()
+        else:
+            render_commentary()
+
 # RAG Analysis section in second column
 with col2:
     st.header("AI Match Analysis")
     
-    # Function to load data in the background
-    def update_vector_db():
-        while st.session_state.data_loading_active:
-            if st.session_state.selected_match_url:
-                collection_name = f"ipl-{st.session_state.selected_match_url.split('/')[-1]}"
-                
-                try:
-                    docs = load_data(st.session_state.selected_match_url)
-                    st.session_state.retriever = vectordb(
-                        docs_list=docs,
-                        collection_name=collection_name,
-                        persist_directory="./chroma_db"
-                    )
-                    
-                    # Create workflow if not already done
-                    if not st.session_state.workflow:
-                        st.session_state.workflow = create_workflow(st.session_state.retriever)
-                        
-                    # Only actively update for live matches
-                    if st.session_state.selected_match_status == "live":
-                        time.sleep(20)  # Update every 20 seconds for live matches
-                    else:
-                        time.sleep(600)  # Update very infrequently for completed matches
-                except Exception as e:
-                    print(f"Error updating vector DB: {e}")
-                    time.sleep(60)  # Wait longer after error
-            else:
-                time.sleep(5)  # Short sleep if no match selected
-    
     # Toggle for data loading based on match status
     if st.session_state.selected_match_status == "live":
         data_auto_refresh = st.checkbox("Auto-refresh match data", value=True)
     else:
         data_auto_refresh = st.checkbox("Auto-refresh match data", value=False)
     
-    if data_auto_refresh and not st.session_state.data_loading_active:
-        st.session_state.data_loading_active = True
-        data_thread = threading.Thread(target=update_vector_db)
-        data_thread.daemon = True
-        data_thread.start()
-    elif not data_auto_refresh:
-        st.session_state.data_loading_active = False
+    if data_auto_refresh and st.session_state.selected_match_url:
+        watch_match()
     
     # Manual data refresh button
     if st.button("Refresh Match Data Now"):
         if st.session_state.selected_match_url:
-            with st.status("Loading match data..."):
-                try:
-                    collection_name = f"ipl-{st.session_state.selected_match_url.split('/')[-1]}"
-                    docs = load_data(st.session_state.selected_match_url)
-                    st.session_state.retriever = vectordb(
-                        docs_list=docs,
-                        collection_name=collection_name,
-                        persist_directory="./chroma_db"
-                    )
-                    
-                    # Create workflow
-                    st.session_state.workflow = create_workflow(st.session_state.retriever)
-                    st.success("Match data loaded successfully!")
-                except Exception as e:
-                    st.error(f"Error: {e}")
+            watch_match(force=True)
+            st.success("Match data refresh queued for the ingestion worker")
         else:
             st.warning("Please select a match first")
     
@@ -311,25 +339,18 @@ with col2:
     st.subheader("Ask about the match")
     user_query = st.text_input("Your question:", placeholder="Who's the top scorer so far?")
     
-        # In app.py, replace the workflow invocation code in the "Get Analysis" button handler:
     if st.button("Get Analysis"):
-        if not st.session_state.workflow or not st.session_state.retriever:
-            st.warning("Please refresh match data first before asking questions")
+        if not st.session_state.selected_match_url:
+            st.warning("Please select a match first")
         elif user_query:
             try:
-                with st.status("Analyzing..."):
-                    # Use the workflow to process the query
-                    # Based on the error, the workflow expects messages
-                    result = st.session_state.workflow.invoke({
-                        "messages": [HumanMessage(content=user_query)]
-                    })
-                    
-                    # Extract the answer from the last message
-                    answer = result["messages"][-1].content
-                
-                # Display the answer
-                st.info("CricAI Analysis")
-                st.markdown(answer)
+                workflow = current_workflow()
+                if workflow is None:
+                    st.warning("Match data is still being ingested. Please try again shortly")
+                else:
+                    # Tokens are written as they are generated
+                    st.info("CricAI Analysis")
+                    st.write_stream(stream_answer(workflow, user_query))
             except Exception as e:
                 st.error(f"Error generating analysis: {e}")
         else:
@@ -346,6 +367,67 @@ else:
     st.markdown("---")
     st.info("Select a match to begin analysis")
 
+# Diagnostics panel
+st.sidebar.markdown("---")
+st.sidebar.subheader("Diagnostics")
+tracing_enabled = st.sidebar.checkbox("Enable tracing", value=tracing.is_enabled())
+if tracing_enabled:
+    tracing.enable()
+else:
+    tracing.disable()
+
+if st.sidebar.checkbox("Show diagnostics", value=False):
+    st.markdown("---")
+    st.subheader("Pipeline Diagnostics")
+    metrics = tracing.snapshot()
+    if metrics["stages"]:
+        stage_rows = [
+            {
+                "stage": name,
+                "count": stage["count"],
+                "p50 (ms)": round(stage["p50"] * 1000, 1),
+                "p95 (ms)": round(stage["p95"] * 1000, 1),
+                "max (ms)": round(stage["max"] * 1000, 1),
+            }
+            for name, stage in sorted(metrics["stages"].items())
+        ]
+        st.dataframe(pd.DataFrame(stage_rows), use_container_width=True)
+    else:
+        st.info("No timings recorded yet. Enable tracing and refresh some data.")
+
+    diag_col1, diag_col2 = st.columns([1, 1])
+    with diag_col1:
+        st.markdown("**Counters**")
+        st.json(metrics["counters"])
+        st.markdown("**Page snapshots**")
+        st.json(snapshot_stats)
+    with diag_col2:
+        st.markdown("**Ingestion workers alive**")
+        st.json({"workers": get_job_queue().workers_alive()})
+        st.markdown("**Scraper waits (s)**")
+        st.json(wait_stats())
+        st.markdown("**Query routes**")
+        st.json(router.summary())
+        st.markdown("**Season index**")
+        st.json(get_season_index().summary())
+    try:
+        st.markdown("**Embedding cache**")
+        st.json(initialize_embeddings().stats())
+        st.markdown("**Answer cache**")
+        st.json(get_answer_cache(initialize_embeddings()).stats())
+    except Exception as e:
+        st.caption(f"Embedding cache unavailable: {e}")
+
+    st.markdown("**Ingestion jobs**")
+    jobs = get_job_queue().jobs()
+    if jobs:
+        st.dataframe(pd.DataFrame(jobs), use_container_width=True)
+    else:
+        st.caption("No matches have been queued for ingestion yet.")
+
+    with st.expander("Prometheus export"):
+        st.code(tracing.export_prometheus(), language="text")
+
 # Footer with clean-up
 st.markdown("---")
 st.caption("CricAI - Real-time IPL 2025 Analysis powered by RAG | © 2025")
@@ -0,0 +1,92 @@
+"""
+Parse benchmarks on the synthetic match pages (benchmarks/make_fixtures): tree building with each
+available backend, whole page vs. only the match regions, and the
+ball-by-ball commentary parser on the result.
+
+Run from final/final:  python -m benchmarks.bench_parse [iterations]
+"""
+import glob
+import importlib.util
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+from DataScrapper.DataScrapperDelivery import parse_deliveries
+from DataScrapper.DataScrapperParse import MATCH_REGIONS, parse_match_page
+from DataScrapper.DataScrapperSnapshot import clean_page_text
+from benchmarks.make_fixtures import HTML_DIR
+
+# Same splitter settings as DataScrapperMain.split_section
+CHUNK_SIZE, CHUNK_OVERLAP = 450, 70
+
+
+def load_match_pages():
+    paths = sorted(glob.glob(os.path.join(HTML_DIR, "match_*.html")))
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def parse_modes():
+    """(label, backend, strainer) for every backend installed here"""
+    backends = ["html.parser"]
+    if importlib.util.find_spec("lxml") is not None:
+        backends.append("lxml")
+    modes = []
+    for backend in backends:
+        modes.append((f"{backend}/full", backend, None))
+        modes.append((f"{backend}/regions", backend, MATCH_REGIONS))
+    return modes
+
+
+def bench_tree(iterations=20):
+    """ms per page to build the tree, and the text and chunks that reach the splitter"""
+    results = {}
+    pages = load_match_pages()
+    for label, backend, strainer in parse_modes():
+        elapsed, chars, deliveries = 0.0, 0, 0
+        for _, html in pages:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                soup = BeautifulSoup(html, backend, parse_only=strainer)
+            elapsed += time.perf_counter() - start
+            chars += len(clean_page_text(soup))
+            deliveries += len(parse_deliveries(soup))
+        results[label] = {
+            "ms_per_page": elapsed / (iterations * len(pages)) * 1000 if pages else 0.0,
+            "text_chars": chars,
+            "est_chunks": chars // (CHUNK_SIZE - CHUNK_OVERLAP),
+            "deliveries": deliveries,
+        }
+    return results
+
+
+def bench_parse(iterations=20):
+    results = {}
+    for name, html in load_match_pages():
+        soup = parse_match_page(html)
+        deliveries = parse_deliveries(soup)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse_deliveries(soup)
+        elapsed = time.perf_counter() - start
+
+        results[name] = {
+            "deliveries": len(deliveries),
+            "ms_per_page": elapsed / iterations * 1000,
+            "deliveries_per_sec": len(deliveries) * iterations / elapsed if elapsed else 0.0,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for label, row in bench_tree(iterations).items():
+        print(f"{label}: {row['ms_per_page']:.2f} ms/page, {row['text_chars']} text chars, "
+              f"~{row['est_chunks']} chunks, {row['deliveries']} deliveries")
+    for name, row in bench_parse(iterations).items():
+        print(f"{name}: {row['deliveries']} deliveries, "
+              f"{row['ms_per_page']:.2f} ms/page, {row['deliveries_per_sec']:.0f} deliveries/s")
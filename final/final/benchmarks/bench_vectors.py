@@ -0,0 +1,146 @@
+"""
+Recall vs. memory for the vector backends on a season-sized synthetic corpus.
+
+Vectors are clustered (one cluster per match, so neighbours are close, as
+with real chunk embeddings) and queries are perturbed corpus vectors. Recall
+is recall@k against exact float32 cosine search. The compact store is
+measured as float16 and int8, with and without the exact rerank; Chroma is
+measured too when chromadb is installed. "vectors" is the quantized plus any
+exact rows; "disk" is every byte the collection's directory holds, sidecar
+and preallocated rows included.
+
+Run from final/final:  python -m benchmarks.bench_vectors [--rows N] [--queries Q]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import List
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from compact_store import CompactVectorStore, normalize
+
+DIM = 768  # models/embedding-001
+ADD_BATCH = 1000
+
+
+class TableEmbeddings(Embeddings):
+    """Looks vectors up by text ("doc-<i>"), standing in for the embedding cache"""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.vectors[[int(text.split("-", 1)[1]) for text in texts]].tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def make_corpus(rows, queries, clusters=74, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    vectors = normalize(centers[labels] + 0.6 * rng.normal(size=(rows, DIM)).astype(np.float32))
+    picks = rng.integers(0, rows, size=queries)
+    query_vectors = normalize(vectors[picks] + 0.3 * rng.normal(size=(queries, DIM)).astype(np.float32))
+    return vectors, query_vectors
+
+
+def exact_top_k(vectors, query_vectors, k):
+    scores = query_vectors @ vectors.T
+    return [set(np.argsort(-row)[:k].tolist()) for row in scores]
+
+
+def recall(found, truth):
+    return float(np.mean([len(f & t) / len(t) for f, t in zip(found, truth)]))
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def bench_compact(vectors, query_vectors, truth, k, dtype, rerank, workdir):
+    embeddings = TableEmbeddings(vectors)
+    # Separate collections: only one created with rerank keeps the exact rows
+    name = f"bench-{dtype}" + ("-rerank" if rerank else "")
+    store = CompactVectorStore(name, embeddings, workdir, dtype=dtype, rerank=rerank)
+    if not store.stats()["rows"]:
+        for start in range(0, len(vectors), ADD_BATCH):
+            ids = [f"doc-{i}" for i in range(start, min(start + ADD_BATCH, len(vectors)))]
+            store.add_texts(ids, ids=ids)
+    start = time.perf_counter()
+    found = [
+        {int(doc.page_content.split("-", 1)[1])
+         for doc, _ in store.similarity_search_by_vector_with_score(query.tolist(), k)}
+        for query in query_vectors
+    ]
+    elapsed = time.perf_counter() - start
+    stats = store.stats()
+    return {
+        "recall": recall(found, truth),
+        "vector_mb": (stats["vector_bytes"] + stats["exact_bytes"]) / 2 ** 20,
+        "disk_mb": stats["disk_bytes"] / 2 ** 20,
+        "ms_per_query": elapsed / len(query_vectors) * 1000,
+    }
+
+
+def bench_chroma(vectors, query_vectors, truth, k, workdir):
+    try:
+        import chromadb
+    except ImportError:
+        return None
+    path = os.path.join(workdir, "chroma")
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+    for start in range(0, len(vectors), ADD_BATCH):
+        end = min(start + ADD_BATCH, len(vectors))
+        collection.add(ids=[f"doc-{i}" for i in range(start, end)],
+                       embeddings=vectors[start:end].tolist(),
+                       documents=[f"doc-{i}" for i in range(start, end)])
+    start = time.perf_counter()
+    result = collection.query(query_embeddings=query_vectors.tolist(), n_results=k)
+    elapsed = time.perf_counter() - start
+    found = [{int(doc_id.split("-", 1)[1]) for doc_id in ids} for ids in result["ids"]]
+    return {
+        "recall": recall(found, truth),
+        "vector_mb": vectors.nbytes / 2 ** 20,
+        "disk_mb": directory_bytes(path) / 2 ** 20,
+        "ms_per_query": elapsed / len(query_vectors) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="chunks in the corpus (~a season)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors, query_vectors = make_corpus(args.rows, args.queries)
+    truth = exact_top_k(vectors, query_vectors, args.k)
+    workdir = tempfile.mkdtemp(prefix="bench_vectors_")
+    results = {}
+    try:
+        chroma = bench_chroma(vectors, query_vectors, truth, args.k, workdir)
+        if chroma is not None:
+            results["chroma/float32"] = chroma
+        for dtype in ("float16", "int8"):
+            for rerank in (False, True):
+                label = f"compact/{dtype}" + ("+rerank" if rerank else "")
+                results[label] = bench_compact(vectors, query_vectors, truth, args.k, dtype, rerank, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.rows} vectors x {DIM} dims, {args.queries} queries, recall@{args.k} vs exact float32")
+    if "chroma/float32" not in results:
+        print(f"chromadb not installed; float32 vectors alone take {vectors.nbytes / 2 ** 20:.1f} MB")
+    for label, row in results.items():
+        print(f"{label:24s} recall {row['recall']:.3f}  vectors {row['vector_mb']:7.1f} MB  "
+              f"disk {row['disk_mb']:7.1f} MB  {row['ms_per_query']:.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Offline stand-ins for Chrome, Gemini embeddings and the Gemini chat model.
+
+FakeWebDriver serves the synthetic pages under benchmarks/html/ instead of
+iplt20.com, so the scrapers run unchanged against deterministic input.
+"""
+import re
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from benchmarks.make_fixtures import fixture_path
+
+MATCH_URL = re.compile(r"/match/\d+/(\d+)")
+
+EMBEDDING_SIZE = 768  # Same width as models/embedding-001
+
+FAKE_ANSWER = (
+    "Virat Kohli is the top scorer so far with a brisk half-century, "
+    "while Jasprit Bumrah has been the pick of the bowlers."
+)
+
+
+def fixture_for_url(url):
+    match = MATCH_URL.search(url)
+    if match:
+        return fixture_path(f"match_{match.group(1)}.html")
+    return fixture_path("results.html")
+
+
+class FakeElement:
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self):
+        return self._tag.get_text().strip()
+
+
+class FakeWebDriver:
+    """Just enough of the selenium WebDriver API for the scrapers"""
+
+    def __init__(self, *args, **kwargs):
+        self.page_source = ""
+        self.current_url = None
+        self._soup = None
+        self.pages_loaded = 0
+
+    def get(self, url):
+        with open(fixture_for_url(url), encoding="utf-8") as f:
+            self.page_source = f.read()
+        self.current_url = url
+        self._soup = None
+        self.pages_loaded += 1
+
+    def _parsed(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.page_source, "html.parser")
+        return self._soup
+
+    def find_elements(self, by=None, value=None):
+        return [FakeElement(tag) for tag in self._parsed().select(value)]
+
+    def find_element(self, by=None, value=None):
+        tag = self._parsed().select_one(value)
+        if tag is None:
+            raise NoSuchElementException(value)
+        return FakeElement(tag)
+
+    def execute_script(self, script, *args):
+        if "inningsList" in script and "d.value" in script:
+            option = self._parsed().select_one("select.inningsList option[selected]")
+            return option.get("value") if option else None
+        if script.strip() == "return 1":
+            return 1
+        # Innings switches and other page scripts are no-ops on a static page
+        return False
+
+    def quit(self):
+        pass
+
+
+def fake_embeddings():
+    return DeterministicFakeEmbedding(size=EMBEDDING_SIZE)
+
+
+def fake_llm():
+    return FakeListChatModel(responses=[FAKE_ANSWER])
@@ -0,0 +1,125 @@
+"""
+Local HTTP server for the synthetic pages in benchmarks/html/.
+
+Serves iplt20.com-shaped URLs (/match/2025/<id>, /matches/results/2025)
+with ETag and Last-Modified headers and answers conditional requests with
+304, so the HTTP fetch path can be exercised end to end offline. With
+`js_rendered=True` commentary and match tickets are stripped from the HTML,
+as on the live site before JavaScript runs, to exercise the WebDriver
+fallback.
+
+Run from final/final:
+    python -m benchmarks.fixture_server [--port 8765] [--js-rendered]
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.make_fixtures import fixture_path
+
+MATCH_PATH = re.compile(r"^/match/\d+/(\d+)/?$")
+RESULTS_PATH = re.compile(r"^/matches/results(/\d+)?/?$")
+# What the server-rendered HTML lacks on a JavaScript-rendered site
+SCRIPT_RENDERED = re.compile(
+    r'<div class="cmdText[^"]*">.*?</div>|<p class="cmdOver">.*?</p>|'
+    r'<div class="liveIndicator">.*?</div>|<ul id="team_archive">.*?</ul>',
+    re.DOTALL
+)
+
+
+def fixture_for_path(path):
+    match = MATCH_PATH.match(path)
+    if match:
+        return fixture_path(f"match_{match.group(1)}.html")
+    if RESULTS_PATH.match(path):
+        return fixture_path("results.html")
+    return None
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    js_rendered = False
+    requests_served = 0
+    not_modified = 0
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        path = fixture_for_path(self.path.split("?", 1)[0])
+        if path is None or not os.path.exists(path):
+            self.send_error(404)
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        if self.js_rendered:
+            body = SCRIPT_RENDERED.sub("", body.decode("utf-8")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        mtime = int(os.path.getmtime(path))
+
+        if self._not_modified(etag, mtime):
+            type(self).not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                return mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve_fixtures(port=0, js_rendered=False):
+    """Serve the fixtures on localhost in a background thread; yields the base URL"""
+    handler = type("Handler", (FixtureHandler,), {"js_rendered": js_rendered})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--js-rendered", action="store_true",
+                        help="strip commentary and match lists, as before JavaScript runs")
+    args = parser.parse_args()
+    handler = type("Handler", (FixtureHandler,), {"js_rendered": args.js_rendered})
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Serving fixtures on http://127.0.0.1:{args.port}/match/2025/<id>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
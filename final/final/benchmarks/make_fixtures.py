@@ -0,0 +1,111 @@
+"""
+Deterministic HTML fixtures shaped like iplt20.com results and match pages.
+
+Run `python -m benchmarks.make_fixtures` from final/final to (re)write the
+files under benchmarks/html/. The same seed always produces the same pages,
+so benchmark numbers stay comparable across commits.
+"""
+import os
+import random
+
+HTML_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html")
+
+BATTERS = ["Virat Kohli", "Faf du Plessis", "Rajat Patidar", "Glenn Maxwell",
+           "Dinesh Karthik", "Rohit Sharma", "Ishan Kishan", "Suryakumar Yadav",
+           "Tilak Varma", "Hardik Pandya", "Tim David"]
+BOWLERS = ["Jasprit Bumrah", "Trent Boult", "Piyush Chawla", "Gerald Coetzee",
+           "Mohammed Siraj", "Yash Dayal", "Karn Sharma", "Cameron Green"]
+OUTCOMES = ["no run", "1 run", "1 run", "2 runs", "FOUR", "SIX", "no run",
+            "1 run", "wide", "OUT", "3 runs", "1 leg bye", "no ball, 1 run"]
+FILLER = ["good length outside off, defended back", "full and straight, driven to long-on",
+          "short ball, pulled away", "slower one, mistimed towards cover",
+          "yorker, dug out to the bowler", "width offered and cut hard"]
+
+
+def _ball_lines(rng, overs):
+    lines = []
+    for over in range(overs):
+        bowler = BOWLERS[over % len(BOWLERS)]
+        ball = 1
+        while ball <= 6:
+            outcome = rng.choice(OUTCOMES)
+            batter = rng.choice(BATTERS)
+            text = f"{bowler} to {batter}, {outcome}, {rng.choice(FILLER)}"
+            lines.append((f"{over}.{ball}", text))
+            # Wides and no-balls are re-bowled under the same ball number
+            if outcome not in ("wide", "no ball, 1 run"):
+                ball += 1
+    return lines
+
+
+def build_match_page(match_id, overs=20, live=False, seed=0):
+    """A match page with header, nav, scorecard and newest-first commentary"""
+    rng = random.Random(seed + match_id)
+    items = []
+    for i, (over_ball, text) in enumerate(reversed(_ball_lines(rng, overs))):
+        if i % 37 == 5:
+            # The live site occasionally renders empty over markers
+            items.append('<p class="cmdOver"></p>')
+        items.append(
+            f'<div class="commentaryItem ng-scope"><p class="cmdOver">{over_ball}</p>'
+            f'<div class="cmdText ng-scope">{text}</div></div>'
+        )
+    live_marker = '<div class="liveIndicator">LIVE</div>' if live else ""
+    # Finished matches announce the result in the header
+    result = "" if live else '<div class="mcResult">RCB won by 3 runs</div>'
+    scorecard_rows = "".join(
+        f"<tr><td>{name}</td><td>{rng.randint(0, 90)}</td><td>{rng.randint(1, 60)}</td></tr>"
+        for name in BATTERS
+    )
+    nav_links = "".join(f'<li><a href="/teams/{i}">Team {i}</a></li>' for i in range(10))
+    return f"""<!DOCTYPE html>
+<html><head><title>Match {match_id} | IPLT20</title>
+<script>window.__config = {{"match": {match_id}}};</script>
+<style>.cmdText {{ color: #222; }}</style></head>
+<body>
+<nav class="main-nav"><ul>{nav_links}</ul></nav>
+<div class="mcHeader"><h1>Match {match_id}</h1>{live_marker}
+<div class="mcTeams">RCB 187/6 (20) vs MI 184/8 (20)</div>{result}</div>
+<div class="scorecard"><table>{scorecard_rows}</table></div>
+<select class="mcSelectDefault inningsList"><option value="1">1st Innings</option><option value="2" selected>2nd Innings</option></select>
+<div class="commentaryWrap">{''.join(items)}</div>
+<footer class="site-footer">Copyright IPLT20. All rights reserved. Terms and privacy.</footer>
+</body></html>
+"""
+
+
+def build_results_page(match_ids):
+    """A results page listing match tickets in ul#team_archive"""
+    boxes = ['<li class="header">Results</li>']
+    for match_id in match_ids:
+        boxes.append(
+            '<li><div class="vn-ticnbtn">'
+            '<a href="#">Highlights</a><a href="#">Scorecard</a>'
+            f'<a href="https://www.iplt20.com/match/2025/{match_id}">Match Centre</a>'
+            '</div></li>'
+        )
+    return f"""<!DOCTYPE html>
+<html><head><title>Results | IPLT20</title></head>
+<body><ul id="team_archive">{''.join(boxes)}</ul></body></html>
+"""
+
+
+MATCH_IDS = [1801, 1802, 1803]
+
+
+def fixture_path(name):
+    return os.path.join(HTML_DIR, name)
+
+
+def write_fixtures():
+    os.makedirs(HTML_DIR, exist_ok=True)
+    with open(fixture_path("results.html"), "w", encoding="utf-8") as f:
+        f.write(build_results_page(MATCH_IDS))
+    for i, match_id in enumerate(MATCH_IDS):
+        with open(fixture_path(f"match_{match_id}.html"), "w", encoding="utf-8") as f:
+            f.write(build_match_page(match_id, live=(i == 0)))
+
+
+if __name__ == "__main__":
+    write_fixtures()
+    print(f"Wrote fixtures to {HTML_DIR}")
@@ -0,0 +1,217 @@
+"""
+Deterministic offline benchmark for the ingest -> retrieve -> answer pipeline.
+
+Every external dependency is replaced: Chrome by FakeWebDriver serving the
+synthetic pages in benchmarks/html/ (written by make_fixtures), Gemini embeddings by deterministic fake
+vectors and gemini-1.5-pro by a fixed-answer chat model. Everything runs in
+a throwaway working directory, so numbers are comparable across commits.
+
+With --http, pages are fetched over keep-alive HTTP from a local fixture
+server (benchmarks/fixture_server.py) instead of the fake WebDriver.
+
+Run from final/final:
+    python -m benchmarks.run_benchmarks [--iterations N] [--http] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory comes from psutil instead
+    resource = None
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BENCH_QUESTIONS = [
+    "Who is the top scorer so far?",
+    "How did Bumrah bowl at the death?",
+    "What happened in the last over?",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if it cannot be read"""
+    if resource is not None:
+        # ru_maxrss is kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    if psutil is not None:
+        memory = psutil.Process().memory_info()
+        # peak_wset is Windows' peak working set; elsewhere fall back to current RSS
+        return getattr(memory, "peak_wset", memory.rss) / (1024 * 1024)
+    return None
+
+
+def time_stage(fn, iterations, before_each=None):
+    samples = []
+    result = None
+    for _ in range(iterations):
+        if before_each is not None:
+            before_each()
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def install_fakes(http_base=None):
+    """Point the pipeline's external dependencies at the offline stand-ins"""
+    from benchmarks.fakes import FakeWebDriver, fake_embeddings, fake_llm
+    from DataScrapper.DataScrapperDriverPool import DriverPool, set_pool
+    from DataScrapper.DataScrapperHttp import HttpFetcher, set_fetcher
+    from DataScrapper import DataScraperMatchLink
+    from embedding_cache import CachedEmbeddings
+    import helper
+    import workflow
+
+    set_pool(DriverPool(size=2, driver_factory=FakeWebDriver))
+    if http_base:
+        set_fetcher(HttpFetcher())
+        DataScraperMatchLink.url = f"{http_base}/matches/results/2025"
+    else:
+        set_fetcher(None)
+    helper._embeddings = CachedEmbeddings(
+        fake_embeddings(), model_name="fake-embedding", path="embedding_cache.sqlite"
+    )
+    workflow.llm = fake_llm()
+
+
+def reset_scrape_caches():
+    """Drop cached snapshots and stored commentary so each run fetches again"""
+    from DataScrapper import DataScrapperSnapshot, DataScrapperCommentaryStore
+    DataScrapperSnapshot._snapshots.clear()
+    DataScrapperCommentaryStore._store = DataScrapperCommentaryStore.CommentaryStore(":memory:")
+
+
+def run(iterations=10, http_base=None):
+    from langchain_core.messages import HumanMessage
+    from DataScrapper.DataScraperMatchLink import get_match_link
+    from DataScrapper.DataScrapperMain import load_data
+    from DataScrapper.DataScrapperCommentary import get_commentary_js
+    from helper import vectordb
+    from workflow import create_workflow, create_cached_workflow, stream_tokens
+
+    from DataScrapper.DataScrapperSnapshot import fetch_snapshot
+
+    install_fakes(http_base)
+    stages = {}
+
+    stages["get_match_link"], links = time_stage(get_match_link, iterations, reset_scrape_caches)
+    url = links[0]
+    if http_base:
+        url = f"{http_base}/match/2025/{url.split('/')[-1]}"
+    collection_name = f"ipl-{url.split('/')[-1]}"
+
+    stages["fetch_snapshot"], _ = time_stage(lambda: fetch_snapshot(url), iterations)
+
+    stages["load_data"], docs = time_stage(lambda: load_data(url), iterations, reset_scrape_caches)
+
+    cold = iter(range(iterations))
+    stages["vectordb (cold)"], _ = time_stage(
+        lambda: vectordb(docs_list=docs, collection_name=f"{collection_name}-cold-{next(cold)}"),
+        iterations
+    )
+    stages["vectordb (refresh)"], retriever = time_stage(
+        lambda: vectordb(docs_list=docs, collection_name=collection_name),
+        iterations
+    )
+
+    from context_budget import assemble_context, estimate_tokens
+    context_tokens = {"raw_repr": [], "budgeted": []}
+    for question in BENCH_QUESTIONS:
+        retrieved = retriever.invoke(question)
+        context_tokens["raw_repr"].append(estimate_tokens(f"Retrieved Documents: {retrieved}"))
+        context_tokens["budgeted"].append(
+            estimate_tokens(assemble_context(retrieved, header="Retrieved Documents:"))
+        )
+
+    graph = create_workflow(retriever)
+    questions = iter(BENCH_QUESTIONS * iterations)
+    stages["create_workflow.invoke"], _ = time_stage(
+        lambda: graph.invoke({"messages": [HumanMessage(content=next(questions))]}),
+        iterations
+    )
+
+    questions = iter(BENCH_QUESTIONS * iterations)
+    stages["stream_tokens (first token)"], _ = time_stage(
+        lambda: next(stream_tokens(graph, next(questions)), None),
+        iterations
+    )
+
+    cached_graph = create_cached_workflow(retriever, collection_name)
+    cached_graph.invoke({"messages": [HumanMessage(content=BENCH_QUESTIONS[0])]})
+    stages["cached_workflow.invoke (repeat)"], _ = time_stage(
+        lambda: cached_graph.invoke({"messages": [HumanMessage(content=BENCH_QUESTIONS[0])]}),
+        iterations
+    )
+
+    stages["get_commentary_js"], _ = time_stage(
+        lambda: get_commentary_js("2", url), iterations, reset_scrape_caches
+    )
+
+    report = {
+        "iterations": iterations,
+        "fetch": "http" if http_base else "webdriver",
+        "stages": {
+            name: {
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "mean_ms": statistics.mean(samples) * 1000,
+            }
+            for name, samples in stages.items()
+        },
+        "context_tokens": {
+            name: statistics.mean(values) for name, values in context_tokens.items()
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--http", action="store_true",
+                        help="Fetch pages over HTTP from the local fixture server")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    sys.path.insert(0, os.getcwd())
+    from benchmarks.fixture_server import serve_fixtures
+    with tempfile.TemporaryDirectory(prefix="cricai-bench-") as workdir:
+        os.chdir(workdir)
+        os.makedirs("logs", exist_ok=True)  # workflow.py logs to logs/app.log
+        if args.http:
+            with serve_fixtures() as base:
+                report = run(args.iterations, http_base=base)
+        else:
+            report = run(args.iterations)
+
+    for name, row in report["stages"].items():
+        print(f"{name:<32} p50 {row['p50_ms']:9.2f} ms   p95 {row['p95_ms']:9.2f} ms")
+    for name, tokens in report["context_tokens"].items():
+        print(f"{'context tokens (' + name + ')':<32} {tokens:.0f}")
+    if report["peak_rss_mb"] is not None:
+        print(f"{'peak RSS':<32} {report['peak_rss_mb']:.1f} MB")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Bulk ingestion of many matches, e.g. backfilling a season:
+
+    python bulk_ingest.py [--saved] [--limit N] [--innings 1 2] [URL ...]
+
+Each match flows through three bounded stages: page fetches on the driver
+pool's threads, parsing and splitting on a process pool (CPU-bound), and
+commentary storage plus embedding/indexing on a small thread pool (I/O-bound).
+At most `max_in_flight` matches are between fetch and index at once, so a
+slow stage holds back new fetches instead of piling up pages in memory.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from DataScrapper.DataScrapperDriverPool import POOL_SIZE
+from DataScrapper.DataScrapperSnapshot import MatchSnapshot, fetch_snapshot
+from DataScrapper.DataScrapperMain import documents_from_snapshot
+from DataScrapper.DataScraperMatchLink import get_match_link, load_match_links
+from DataScrapper.DataScrapperCommentary import save_commentary, close_driver
+from DataScrapper.DataScrapperCommentaryStore import match_id_from_url
+from helper import vectordb, refresh_stats
+from ingest_jobs import get_job_queue, collection_name_for
+from tracing import span, incr
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+INDEX_WORKERS = 2
+
+
+def fetch_pages(url, innings_list):
+    """Fetch stage: page source per innings (None = whichever innings the page shows)"""
+    pages = []
+    for innings in innings_list:
+        with span("bulk.fetch"):
+            snapshot = fetch_snapshot(url, innings)
+        pages.append((snapshot.page_source, snapshot.innings))
+    return pages
+
+
+def parse_pages(url, pages):
+    """
+    Parse stage, run in a worker process: (chunks, delivery documents) for
+    every innings page, each innings' deliveries, the live flag, and whether
+    a result is announced (None when the page says neither)
+    """
+    page_docs, deliveries, live, completed = [], [], False, None
+    for page_source, innings in pages:
+        snapshot = MatchSnapshot(url, page_source, innings=innings)
+        page_docs.append(documents_from_snapshot(snapshot))
+        deliveries.append((innings, snapshot.deliveries))
+        live = live or snapshot.is_live
+        completed = completed or snapshot.is_completed
+    return page_docs, deliveries, live, (False if live else completed)
+
+
+def merge_documents(page_docs):
+    """
+    One document list for the match. Chunks are numbered here, in page order
+    across every innings page, so `seq` is unique within the match however
+    the pages were split between worker processes.
+    """
+    chunks = [doc for page_chunks, _ in page_docs for doc in page_chunks]
+    # Page order lets the context budgeter stitch neighbouring chunks back together
+    for seq, doc in enumerate(chunks):
+        doc.metadata["seq"] = seq
+    return chunks + [doc for _, page_deliveries in page_docs for doc in page_deliveries]
+
+
+class BulkProgress:
+    """Completed/failed counts and throughput in matches per minute"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.done += 1
+            else:
+                self.failed += 1
+
+    def matches_per_minute(self) -> float:
+        elapsed = time.time() - self.started
+        return 60.0 * (self.done + self.failed) / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "elapsed_s": round(time.time() - self.started, 1),
+            "matches_per_minute": round(self.matches_per_minute(), 2),
+        }
+
+
+class BulkIngest:
+    """Pipelined multi-match ingestion with bounded stages and backpressure"""
+
+    def __init__(self, fetch_workers: int = POOL_SIZE, parse_workers: int = None,
+                 index_workers: int = INDEX_WORKERS, max_in_flight: int = None,
+                 innings=(None,)):
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 2
+        self.index_workers = index_workers
+        self.max_in_flight = max_in_flight or 2 * (fetch_workers + index_workers)
+        self.innings = list(innings)
+
+    def run(self, urls) -> dict:
+        urls = list(dict.fromkeys(urls))
+        progress = BulkProgress(len(urls))
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        finished = threading.Event()
+        remaining = [len(urls)]
+        remaining_lock = threading.Lock()
+        if not urls:
+            return progress.summary()
+
+        fetchers = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        # Workers are first started from a fetcher thread's callback; spawn
+        # keeps them from forking a process that already runs threads
+        parsers = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                      mp_context=multiprocessing.get_context("spawn"))
+        indexers = ThreadPoolExecutor(max_workers=self.index_workers)
+
+        def finish(url, error=None, stats=None):
+            progress.record(error is None)
+            match_id = match_id_from_url(url)
+            if error is None:
+                incr("bulk.matches_done")
+                logger.info(
+                    f"[{progress.done + progress.failed}/{progress.total}] match {match_id}: "
+                    f"{stats} ({progress.matches_per_minute():.1f} matches/min)"
+                )
+            else:
+                incr("bulk.matches_failed")
+                logger.error(f"[{progress.done + progress.failed}/{progress.total}] "
+                             f"match {match_id} failed: {error}")
+            in_flight.release()
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    finished.set()
+
+        def index(url, page_docs, deliveries, live, completed):
+            match_id = match_id_from_url(url)
+            docs = merge_documents(page_docs)
+            for innings, innings_deliveries in deliveries:
+                if innings is not None and innings_deliveries:
+                    save_commentary(innings_deliveries, match_id, innings, completed=completed)
+            collection_name = collection_name_for(url)
+            with span("bulk.index"):
+                vectordb(docs_list=docs, collection_name=collection_name,
+                         persist_directory="./chroma_db", live=live)
+            stats = refresh_stats.get(collection_name, {})
+            changed = bool(stats.get("added") or stats.get("removed"))
+            innings = next((i for i, _ in deliveries if i is not None), "1")
+            get_job_queue().publish(match_id, url, innings, live, changed)
+            return stats
+
+        def after_index(url, future):
+            try:
+                finish(url, stats=future.result())
+            except Exception as e:
+                finish(url, error=e)
+
+        def after_parse(url, future):
+            try:
+                page_docs, deliveries, live, completed = future.result()
+                indexers.submit(index, url, page_docs, deliveries, live, completed).add_done_callback(
+                    lambda f: after_index(url, f))
+            except Exception as e:
+                finish(url, error=e)
+
+        def after_fetch(url, future):
+            try:
+                pages = future.result()
+                parsers.submit(parse_pages, url, pages).add_done_callback(
+                    lambda f: after_parse(url, f))
+            except Exception as e:
+                finish(url, error=e)
+
+        logger.info(
+            f"Bulk ingesting {len(urls)} matches: {self.fetch_workers} fetchers, "
+            f"{self.parse_workers} parsers, {self.index_workers} indexers, "
+            f"at most {self.max_in_flight} in flight"
+        )
+        try:
+            for url in urls:
+                # Backpressure: wait for a slot before fetching another page
+                in_flight.acquire()
+                fetchers.submit(fetch_pages, url, self.innings).add_done_callback(
+                    lambda f, url=url: after_fetch(url, f))
+            finished.wait()
+        finally:
+            fetchers.shutdown(wait=True)
+            parsers.shutdown(wait=True)
+            indexers.shutdown(wait=True)
+
+        summary = progress.summary()
+        logger.info(f"Bulk ingestion finished: {summary}")
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CricAI bulk ingestion")
+    parser.add_argument("urls", nargs="*", help="match URLs (default: the results page links)")
+    parser.add_argument("--saved", action="store_true",
+                        help="use the saved match links instead of scraping the results page")
+    parser.add_argument("--limit", type=int, default=None, help="ingest at most this many matches")
+    parser.add_argument("--innings", nargs="*", default=None,
+                        help="innings to ingest per match (default: the one the page shows)")
+    parser.add_argument("--fetch-workers", type=int, default=POOL_SIZE)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--index-workers", type=int, default=INDEX_WORKERS)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    urls = args.urls or (load_match_links() if args.saved else get_match_link())
+    if args.limit is not None:
+        urls = urls[:args.limit]
+
+    os.makedirs("./chroma_db", exist_ok=True)
+    bulk = BulkIngest(
+        fetch_workers=args.fetch_workers,
+        parse_workers=args.parse_workers,
+        index_workers=args.index_workers,
+        max_in_flight=args.max_in_flight,
+        innings=args.innings or (None,)
+    )
+    try:
+        bulk.run(urls)
+    finally:
+        close_driver()
+
+
+if __name__ == "__main__":
+    main()
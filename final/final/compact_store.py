@@ -0,0 +1,446 @@
+import os
+import json
+import uuid
+import shutil
+import threading
+from typing import Any, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from tracing import span, incr
+
+DTYPES = ("float16", "int8")
+# With rerank, quantized scores pick k * RERANK_FACTOR candidates for exact
+# rescoring against the float32 rows kept alongside the quantized ones
+RERANK_FACTOR = 4
+INITIAL_CAPACITY = 256
+# Rows scored per block, so a scan never materialises the whole matrix as float32
+SCAN_BLOCK = 4096
+META_FILE = "meta.json"
+LOG_PREFIX = "log-"
+
+
+def normalize(vectors) -> np.ndarray:
+    """Unit-length float32 rows (a single vector becomes one row)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def quantize(vectors, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unit-normalised rows as float16, or as int8 codes with one float32 scale
+    per row (symmetric, the row's largest component maps to 127)
+    """
+    vectors = normalize(vectors)
+    if dtype == "float16":
+        return vectors.astype(np.float16), np.ones(len(vectors), dtype=np.float32)
+    peak = np.abs(vectors).max(axis=1)
+    peak[peak == 0] = 1.0
+    scales = (peak / 127.0).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def collection_path(persist_directory: str, collection_name: str) -> str:
+    return os.path.join(persist_directory, "compact", collection_name)
+
+
+def delete_collection(persist_directory: str, collection_name: str) -> None:
+    shutil.rmtree(collection_path(persist_directory, collection_name), ignore_errors=True)
+
+
+class CompactVectorStore(VectorStore):
+    """
+    Vector store keeping float16 or int8-quantized vectors in a memory-mapped
+    NumPy file, with ids, texts and metadata in a JSON sidecar.
+
+    Vectors stay on disk and are paged in by the OS while scanning, at a half
+    (float16) or a quarter (int8) of Chroma's float32 footprint, and search
+    ranks on the quantized scores. A collection created with rerank=True also
+    keeps the exact float32 rows in a second memory-mapped file and rescores
+    the top k * RERANK_FACTOR candidates against them; only the candidate
+    rows are paged in, but the file itself puts the collection at 1.5x
+    (float16) or 1.25x (int8) of plain float32 on disk, so it is opt-in.
+
+    Rows are appended in place and each add or delete appends one line to the
+    sidecar's log instead of rewriting it. Growth and compaction write a new
+    generation of the vector file and a new sidecar snapshot, replaced
+    atomically, which starts an empty log. Readers in other processes replay
+    the log, or reload a new snapshot, on their next search. One process
+    should write a collection at a time (the ingestion worker). A read-only
+    store loads the files once and never checks for changes.
+    """
+
+    def __init__(self, collection_name: str, embedding_function: Embeddings,
+                 persist_directory: str = "./chroma_db", dtype: str = "int8", rerank: bool = False,
+                 read_only: bool = False):
+        if dtype not in DTYPES:
+            raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+        self.collection_name = collection_name
+        self.path = collection_path(persist_directory, collection_name)
+        self.dtype = dtype
+        self.rerank = rerank
+        self.read_only = read_only
+        self._embedding = embedding_function
+        self._lock = threading.RLock()
+        self._meta_version = None
+        self._log_path = None
+        self._log_offset = 0
+        self._snapshot_bytes = 0
+        self._generation = 0
+        self._dim = None
+        self._count = 0
+        self._vectors = None
+        self._scales = None
+        self._exact = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._texts: List[Optional[str]] = []
+        self._metadatas: List[Optional[dict]] = []
+        self._rows = {}
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            self._refresh()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    # Files
+
+    def _file(self, kind: str, generation: int) -> str:
+        return os.path.join(self.path, f"{kind}-{generation}.npy")
+
+    def _refresh(self) -> None:
+        """Reload a new sidecar snapshot, then apply log entries another process appended"""
+        if self.read_only and self._meta_version is not None:
+            return
+        meta_path = os.path.join(self.path, META_FILE)
+        for _ in range(3):
+            try:
+                # The snapshot is replaced, never rewritten, so a new inode means new data
+                stat = os.stat(meta_path)
+                version = (stat.st_ino, stat.st_mtime_ns)
+                if version != self._meta_version:
+                    self._load(meta_path, version)
+                self._replay()
+                return
+            except FileNotFoundError:
+                # Nothing stored yet, or a writer replaced this generation meanwhile
+                if not os.path.exists(meta_path):
+                    return
+        raise RuntimeError(f"Collection '{self.collection_name}' kept changing while loading")
+
+    def _load(self, meta_path: str, version: tuple) -> None:
+        mmap_mode = "r" if self.read_only else "r+"
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        vectors = np.load(self._file("vectors", meta["generation"]), mmap_mode=mmap_mode)
+        scales = np.load(self._file("scales", meta["generation"]), mmap_mode=mmap_mode)
+        exact = np.load(self._file("exact", meta["generation"]), mmap_mode=mmap_mode) \
+            if meta.get("exact") else None
+        # The stored precision wins over the constructor's
+        self.dtype = meta["dtype"]
+        self._dim = meta["dim"]
+        self._count = meta["count"]
+        self._generation = meta["generation"]
+        self._ids = meta["ids"]
+        self._texts = meta["texts"]
+        self._metadatas = meta["metadatas"]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids) if doc_id is not None}
+        self._vectors, self._scales, self._exact = vectors, scales, exact
+        self._alive = np.zeros(len(vectors), dtype=bool)
+        self._alive[list(self._rows.values())] = True
+        # Sidecars written before the log existed have none
+        self._log_path = os.path.join(self.path, meta["log"]) if meta.get("log") else None
+        self._log_offset = 0
+        self._snapshot_bytes = os.path.getsize(meta_path)
+        self._meta_version = version
+
+    def _replay(self) -> None:
+        """Apply the log lines appended since the last read; a partly written line waits"""
+        if self._log_path is None:
+            return
+        with open(self._log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._apply(json.loads(line))
+        self._log_offset += end
+
+    def _apply(self, entry: dict) -> None:
+        if "delete" in entry:
+            self._drop(entry["delete"])
+            return
+        start, ids = entry["start"], entry["ids"]
+        self._drop(ids)
+        end = start + len(ids)
+        self._alive[start:end] = True
+        for row, doc_id in enumerate(ids, start):
+            self._rows[doc_id] = row
+        self._ids.extend(ids)
+        self._texts.extend(entry["texts"])
+        self._metadatas.extend(entry["metadatas"])
+        self._count = end
+
+    def _flush(self) -> None:
+        self._vectors.flush()
+        self._scales.flush()
+        if self._exact is not None:
+            self._exact.flush()
+
+    def _append_log(self, entry: dict) -> None:
+        """Record one add or delete; the vectors it refers to are flushed first"""
+        if self._log_path is None:
+            self._save()
+            return
+        self._flush()
+        with open(self._log_path, "ab") as f:
+            f.write(json.dumps(entry).encode("utf-8") + b"\n")
+            self._log_offset = f.tell()
+        # Fold the log into a snapshot once replaying it costs more than loading one
+        if self._log_offset > self._snapshot_bytes:
+            self._save()
+
+    def _save(self) -> None:
+        """Write a full sidecar snapshot with a new, empty log"""
+        self._flush()
+        log_name = f"{LOG_PREFIX}{uuid.uuid4().hex[:12]}.jsonl"
+        open(os.path.join(self.path, log_name), "wb").close()
+        meta = {
+            "dtype": self.dtype,
+            "exact": self._exact is not None,
+            "dim": self._dim,
+            "count": self._count,
+            "generation": self._generation,
+            "log": log_name,
+            "ids": self._ids,
+            "texts": self._texts,
+            "metadatas": self._metadatas,
+        }
+        meta_path = os.path.join(self.path, META_FILE)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        stat = os.stat(meta_path)
+        self._meta_version = (stat.st_ino, stat.st_mtime_ns)
+        self._snapshot_bytes = stat.st_size
+        self._log_path = os.path.join(self.path, log_name)
+        self._log_offset = 0
+        # Older generations and logs are unreferenced once the sidecar points past them
+        for name in os.listdir(self.path):
+            stem, ext = os.path.splitext(name)
+            stale_vectors = ext == ".npy" and not stem.endswith(f"-{self._generation}")
+            stale_log = name.startswith(LOG_PREFIX) and name != log_name
+            if stale_vectors or stale_log:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def _rewrite(self, capacity: int) -> None:
+        """Copy the live rows, compacted, into a new generation of `capacity` rows"""
+        generation = self._generation + 1
+        vectors = np.lib.format.open_memmap(
+            self._file("vectors", generation), mode="w+",
+            dtype=np.dtype(self.dtype), shape=(capacity, self._dim)
+        )
+        scales = np.lib.format.open_memmap(
+            self._file("scales", generation), mode="w+", dtype=np.float32, shape=(capacity,)
+        )
+        exact = np.lib.format.open_memmap(
+            self._file("exact", generation), mode="w+", dtype=np.float32, shape=(capacity, self._dim)
+        ) if self._exact is not None else None
+        live = [row for row in range(self._count) if self._ids[row] is not None]
+        if live:
+            vectors[:len(live)] = self._vectors[live]
+            scales[:len(live)] = self._scales[live]
+            if exact is not None:
+                exact[:len(live)] = self._exact[live]
+        self._ids = [self._ids[row] for row in live]
+        self._texts = [self._texts[row] for row in live]
+        self._metadatas = [self._metadatas[row] for row in live]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._count = len(live)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._alive[:self._count] = True
+        self._vectors, self._scales, self._exact, self._generation = vectors, scales, exact, generation
+        incr("vectordb.compact_rewrites")
+
+    def _ensure_capacity(self, rows: int, dim: int) -> None:
+        if self._dim is None:
+            self._dim = dim
+        elif dim != self._dim:
+            raise ValueError(f"Collection '{self.collection_name}' holds {self._dim}-d vectors, got {dim}-d")
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if rows <= capacity:
+            return
+        new_capacity = max(INITIAL_CAPACITY, capacity)
+        while new_capacity < rows:
+            new_capacity *= 2
+        if self._vectors is None:
+            self._vectors = np.zeros((0, dim), dtype=np.dtype(self.dtype))
+            self._scales = np.zeros(0, dtype=np.float32)
+            # A new collection keeps exact rows only if it is searched with rerank
+            self._exact = np.zeros((0, dim), dtype=np.float32) if self.rerank else None
+        self._rewrite(new_capacity)
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Collection '{self.collection_name}' is open read-only")
+
+    def _drop(self, ids: Iterable[str]) -> int:
+        dropped = 0
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            self._ids[row] = self._texts[row] = self._metadatas[row] = None
+            self._alive[row] = False
+            dropped += 1
+        return dropped
+
+    # VectorStore interface
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        self._check_writable()
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        with span("vectordb.embed"):
+            vectors = normalize(self._embedding.embed_documents(texts))
+        codes, scales = quantize(vectors, self.dtype)
+
+        with self._lock:
+            self._refresh()
+            self._drop(ids)
+            generation = self._generation
+            self._ensure_capacity(self._count + len(ids), codes.shape[1])
+            start, end = self._count, self._count + len(ids)
+            self._vectors[start:end] = codes
+            self._scales[start:end] = scales
+            if self._exact is not None:
+                self._exact[start:end] = vectors
+            self._alive[start:end] = True
+            for row, doc_id in enumerate(ids, start):
+                self._rows[doc_id] = row
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(metadatas)
+            self._count = end
+            if self._generation != generation:
+                self._save()
+            else:
+                self._append_log({"start": start, "ids": ids, "texts": texts, "metadatas": metadatas})
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        self._check_writable()
+        if not ids:
+            return False
+        with self._lock:
+            self._refresh()
+            if not self._drop(ids):
+                return False
+            # Compact once deleted rows outnumber live ones
+            dead = self._count - len(self._rows)
+            if dead > len(self._rows) and dead > INITIAL_CAPACITY:
+                self._rewrite(len(self._vectors))
+                self._save()
+            else:
+                self._append_log({"delete": list(ids)})
+        return True
+
+    def get(self, ids: Optional[List[str]] = None, include: Iterable[str] = ("documents", "metadatas")) -> dict:
+        """Stored entries in Chroma's `get` shape: {"ids", "documents", "metadatas"}"""
+        include = set(include)
+        with self._lock:
+            self._refresh()
+            rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows] if ids else \
+                sorted(self._rows.values())
+            result = {"ids": [self._ids[row] for row in rows]}
+            if "documents" in include:
+                result["documents"] = [self._texts[row] for row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[row] for row in rows]
+        return result
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self._embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[Tuple[Document, float]]:
+        """Top-k by cosine similarity: quantized scan, then exact rerank of the candidates"""
+        query = normalize(embedding)[0]
+        with self._lock:
+            self._refresh()
+            if not self._rows:
+                return []
+            count = self._count
+            scores = np.empty(count, dtype=np.float32)
+            with span("vectordb.compact_scan"):
+                for start in range(0, count, SCAN_BLOCK):
+                    end = min(start + SCAN_BLOCK, count)
+                    block = self._vectors[start:end].astype(np.float32)
+                    scores[start:end] = (block @ query) * self._scales[start:end]
+            scores[~self._alive[:count]] = -np.inf
+            rerank = self.rerank and self._exact is not None
+            wanted = min(k * RERANK_FACTOR if rerank else k, len(self._rows))
+            # Candidates in row order, so the exact file is read front to back
+            top = np.sort(np.argpartition(-scores, wanted - 1)[:wanted])
+            if rerank and wanted > k:
+                with span("vectordb.compact_rerank"):
+                    scores[top] = self._exact[top] @ query
+                incr("vectordb.compact_reranked", wanted)
+            candidates = [
+                (self._texts[row], self._metadatas[row], self._ids[row], float(scores[row]))
+                for row in top.tolist()
+            ]
+
+        candidates.sort(key=lambda candidate: candidate[3], reverse=True)
+        return [
+            (Document(page_content=text, metadata=dict(metadata or {})), score)
+            for text, metadata, doc_id, score in candidates[:k]
+        ]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, collection_name: str = "default",
+                   persist_directory: str = "./chroma_db", **kwargs: Any) -> "CompactVectorStore":
+        store = cls(collection_name, embedding, persist_directory, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    def stats(self) -> dict:
+        """
+        Live/deleted rows, the bytes held by the quantized and exact vector
+        files, and everything the collection takes on disk (sidecar included)
+        """
+        with self._lock:
+            self._refresh()
+            capacity = len(self._vectors) if self._vectors is not None else 0
+            return {
+                "dtype": self.dtype,
+                "dim": self._dim,
+                "rows": len(self._rows),
+                "deleted": self._count - len(self._rows),
+                "vector_bytes": self._vectors.nbytes + self._scales.nbytes if capacity else 0,
+                "exact_bytes": self._exact.nbytes if capacity and self._exact is not None else 0,
+                "disk_bytes": sum(entry.stat().st_size for entry in os.scandir(self.path)
+                                  if entry.is_file()),
+            }
@@ -0,0 +1,128 @@
+import re
+from typing import List, Optional
+
+# Roughly what fits alongside the prompt template and a 500-token answer
+DEFAULT_TOKEN_BUDGET = 1500
+# The splitter in load_data overlaps neighbouring chunks by 70 characters
+MIN_OVERLAP = 20
+MAX_OVERLAP = 120
+RECENCY_WEIGHT = 0.3
+# Recency signals in order of preference; each is normalised on its own
+# scale (overs 0-50, epoch seconds, page order), never against the others
+POSITION_KEYS = ("over", "ingested_at", "seq")
+# Match pages list commentary newest first, so a smaller seq is more recent
+DESCENDING_KEYS = frozenset({"seq"})
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, len(text) // 4)
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right`"""
+    longest = min(len(left), len(right), MAX_OVERLAP)
+    for size in range(longest, MIN_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+class _Span:
+    __slots__ = ("text", "relevance", "positions", "seq")
+
+    def __init__(self, text, relevance, positions, seq):
+        self.text = text
+        self.relevance = relevance
+        self.positions = positions  # position key -> value, for the keys the chunk has
+        self.seq = seq
+
+
+def merge_chunks(docs) -> List[_Span]:
+    """
+    Collapse retrieved chunks into distinct spans: duplicates and chunks
+    contained in another are dropped, and neighbours that share the
+    splitter's overlap are stitched back together.
+    """
+    spans = []
+    for rank, doc in enumerate(docs):
+        text = WHITESPACE.sub(" ", doc.page_content).strip()
+        if not text:
+            continue
+        metadata = getattr(doc, "metadata", None) or {}
+        relevance = 1.0 / (rank + 1)
+        positions = {
+            key: metadata[key] for key in POSITION_KEYS
+            if isinstance(metadata.get(key), (int, float))
+        }
+        spans.append(_Span(text, relevance, positions, metadata.get("seq")))
+
+    # Neighbouring chunks are adjacent in page order when we know it
+    spans.sort(key=lambda s: (s.seq is None, s.seq if s.seq is not None else 0))
+    merged: List[_Span] = []
+    for span in spans:
+        duplicate = next((m for m in merged if span.text in m.text), None)
+        if duplicate is not None:
+            duplicate.relevance = max(duplicate.relevance, span.relevance)
+            continue
+        if merged:
+            previous = merged[-1]
+            size = _overlap(previous.text, span.text)
+            if size:
+                previous.text += span.text[size:]
+                previous.relevance = max(previous.relevance, span.relevance)
+                previous.seq = span.seq
+                for key, value in span.positions.items():
+                    if value > previous.positions.get(key, value - 1):
+                        previous.positions[key] = value
+                continue
+        merged.append(span)
+    return merged
+
+
+def _rank(spans: List[_Span]) -> List[_Span]:
+    ranges = {}
+    for key in POSITION_KEYS:
+        values = [s.positions[key] for s in spans if key in s.positions]
+        if values and max(values) > min(values):
+            ranges[key] = (min(values), max(values))
+
+    def score(span):
+        # The most preferred key this span has that varies across the spans
+        recency = 0.0
+        for key in POSITION_KEYS:
+            if key in span.positions and key in ranges:
+                low, high = ranges[key]
+                recency = (span.positions[key] - low) / (high - low)
+                if key in DESCENDING_KEYS:
+                    recency = 1.0 - recency
+                break
+        return span.relevance + RECENCY_WEIGHT * recency
+
+    return sorted(spans, key=score, reverse=True)
+
+
+def assemble_context(docs, token_budget: int = DEFAULT_TOKEN_BUDGET,
+                     header: Optional[str] = None) -> str:
+    """
+    Build the prompt context from retrieved documents: plain chunk text
+    (no Document repr or metadata), overlaps merged, ranked by relevance
+    and recency, packed into `token_budget` estimated tokens.
+    """
+    parts = []
+    used = estimate_tokens(header) if header else 0
+    for span in _rank(merge_chunks(docs)):
+        cost = estimate_tokens(span.text)
+        if used + cost > token_budget:
+            remaining = token_budget - used
+            # Only worth including a truncated span if a useful amount fits
+            if remaining >= 60:
+                parts.append(span.text[:remaining * 4].rsplit(" ", 1)[0] + " ...")
+            break
+        parts.append(span.text)
+        used += cost
+
+    body = "\n\n".join(f"[{i + 1}] {text}" for i, text in enumerate(parts))
+    return f"{header}\n\n{body}" if header else body
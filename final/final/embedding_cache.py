@@ -0,0 +1,157 @@
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from typing import List
+from langchain_core.embeddings import Embeddings
+from tracing import span, incr
+
+logger = logging.getLogger(__name__)
+
+# Cache file sits next to ./chroma_db so both survive restarts together
+DEFAULT_CACHE_PATH = "./embedding_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Disk-backed, size-bounded LRU cache in front of an embedding model.
+
+    Vectors are keyed by (model name, sha256 of text) in a local SQLite file,
+    so any text embedded once is served without an API round trip, across
+    refreshes and restarts.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str,
+                 path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _lookup(self, hashes: List[str]) -> dict:
+        found = {}
+        # SQLite caps bound parameters, so look up in batches
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT text_hash, vector FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [self.model_name, *batch]
+            ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = array("f", blob).tolist()
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(now, self.model_name, text_hash) for text_hash in found]
+            )
+        return found
+
+    def _store(self, items: dict):
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(self.model_name, text_hash, array("f", vector).tobytes(), now)
+             for text_hash, vector in items.items()]
+        )
+        self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                " SELECT rowid FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [self._hash(text) for text in texts]
+        with self._lock:
+            cached = self._lookup(list(set(hashes)))
+            self._conn.commit()
+
+        # Embed each distinct missing text once
+        missing = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in cached:
+                missing.setdefault(text_hash, text)
+
+        hits = sum(1 for text_hash in hashes if text_hash in cached)
+        self.hits += hits
+        self.misses += len(hashes) - hits
+        incr("embed.cache_hits", hits)
+        incr("embed.cache_misses", len(hashes) - hits)
+
+        if missing:
+            with span("embed.documents"):
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            with self._lock:
+                self._store(fresh)
+                self._conn.commit()
+            cached.update(fresh)
+
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Queries use a different task type upstream, so they get their own key space
+        text_hash = "query:" + self._hash(text)
+        with self._lock:
+            cached = self._lookup([text_hash])
+            self._conn.commit()
+        if text_hash in cached:
+            self.hits += 1
+            incr("embed.cache_hits")
+            return cached[text_hash]
+
+        self.misses += 1
+        incr("embed.cache_misses")
+        with span("embed.query"):
+            vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._store({text_hash: vector})
+            self._conn.commit()
+        return vector
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and the current number of cached vectors."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": size,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -3,12 +3,20 @@ load_dotenv()
 import os
 import logging
 import sys
+import hashlib
+import time
 import chromadb
 from langchain_community.vectorstores import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.documents import Document
+from embedding_cache import CachedEmbeddings
+from tracing import span, incr, timed
+from lexical_index import BM25Index, HybridRetriever
+from recency import RecentIndex, RecencyRetriever
+from compact_store import CompactVectorStore, delete_collection as delete_compact_collection
 # Logging configuration
 logging.basicConfig(
     level=logging.INFO, 
@@ -29,26 +37,89 @@ headers = {
 }
 
 
+EMBEDDING_MODEL = "models/embedding-001"
+EMBEDDING_CACHE_PATH = "./embedding_cache.sqlite"
+# "chroma", or "compact" for float16/int8 memory-mapped vectors (see compact_store)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+COMPACT_DTYPE = os.getenv("COMPACT_VECTOR_DTYPE", "int8")
+# Keep exact float32 rows next to the quantized ones and rerank with them;
+# better recall at 1.25x (int8) / 1.5x (float16) of plain float32 on disk
+COMPACT_EXACT_RERANK = os.getenv("COMPACT_EXACT_RERANK", "0") == "1"
+
+# One cached embedding model per process, shared by every refresh
+_embeddings = None
+
+
 def initialize_embeddings():
     """
     Initialize Google Generative AI Embeddings with error handling.
+
+    The model is wrapped in a disk-backed cache, so text that has been
+    embedded before is served without an API call.
     
     Returns:
-        GoogleGenerativeAIEmbeddings: Configured embedding model
+        CachedEmbeddings: Configured embedding model
     """
+    global _embeddings
+    if _embeddings is not None:
+        return _embeddings
     try:
         embeddings = GoogleGenerativeAIEmbeddings(
-            model="models/embedding-001",
+            model=EMBEDDING_MODEL,
             google_api_key=api_key
         )
-        return embeddings
+        _embeddings = CachedEmbeddings(
+            embeddings,
+            model_name=EMBEDDING_MODEL,
+            path=EMBEDDING_CACHE_PATH
+        )
+        return _embeddings
     except Exception as e:
         logger.error(f"Failed to initialize embeddings: {e}")
         raise
 
 
 
-def vectordb(docs_list=None,collection_name=None,persist_directory=None):
+# Per-collection counters from the most recent refresh: {"added", "kept", "removed"}
+refresh_stats = {}
+# Per-collection data version, bumped whenever a refresh changes the stored chunks
+data_versions = {}
+# Per-collection BM25 index kept in step with the Chroma collection
+lexical_indexes = {}
+# Per-collection hot index over the latest overs
+recent_indexes = {}
+
+
+def open_vectorstore(collection_name, persist_directory, embeddings, read_only=False):
+    """
+    Attach to a collection (created if missing) in the configured vector
+    backend; read_only maps a compact collection once, without change checks.
+    Chroma has no read-only client, so read_only does not change a Chroma
+    collection; callers simply never write through it.
+    """
+    if VECTOR_BACKEND == "compact":
+        return CompactVectorStore(collection_name, embeddings, persist_directory,
+                                  dtype=COMPACT_DTYPE, rerank=COMPACT_EXACT_RERANK,
+                                  read_only=read_only)
+    client = chromadb.PersistentClient(path=persist_directory)
+    return Chroma(
+        client=client,
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        persist_directory=persist_directory
+    )
+
+
+def chunk_id(doc):
+    """
+    Stable content-hash ID for a chunk, so the same text always maps to the
+    same vector store entry across refreshes.
+    """
+    return hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+@timed("vectordb.refresh")
+def vectordb(docs_list=None,collection_name=None,persist_directory=None,incremental=True,live=True):
     persist_directory = "./chroma_db"
     os.makedirs(persist_directory, exist_ok=True)
     # collection_name = "ipl-data"
@@ -59,32 +130,165 @@ def vectordb(docs_list=None,collection_name=None,persist_directory=None):
         logger.error("Embedding initialization failed")
         raise
 
+    if not incremental:
+        return rebuild_vectordb(docs_list, collection_name, persist_directory, embeddings, live)
+
     try:
-        client = chromadb.PersistentClient(path=persist_directory)
+        # Attach to the existing collection (or create it) - never drop it, so
+        # retrievers built on it keep serving queries during the refresh
+        vectorstore = open_vectorstore(collection_name, persist_directory, embeddings)
+
+        lexical_index = lexical_indexes.setdefault(collection_name, BM25Index())
+        recent_index = recent_indexes.setdefault(collection_name, RecentIndex())
+        if not docs_list:
+            # A failed or blank scrape says nothing about what was removed;
+            # keep the collection as it is instead of deleting every chunk
+            logger.warning(f"Collection '{collection_name}': no documents scraped, kept as is")
+            refresh_stats[collection_name] = {"added": 0, "kept": 0, "removed": 0}
+            return recency_retriever(hybrid_retriever(vectorstore, lexical_index), recent_index, live)
+
+        with span("vectordb.diff"):
+            stored = vectorstore.get(include=["metadatas"])
+        existing = dict(zip(stored["ids"], stored["metadatas"]))
+        existing_ids = set(existing)
+
+        # Content-hash every chunk; identical chunks collapse onto one ID.
+        # A chunk keeps the time it was first ingested, as stored with it,
+        # across refreshes and restarts.
+        now = time.time()
+        new_docs = {}
+        for doc in docs_list:
+            doc_id = chunk_id(doc)
+            doc.metadata["chunk_id"] = doc_id
+            doc.metadata["ingested_at"] = (existing.get(doc_id) or {}).get("ingested_at", now)
+            new_docs.setdefault(doc_id, doc)
+
+        to_add = [doc_id for doc_id in new_docs if doc_id not in existing_ids]
+        to_remove = [doc_id for doc_id in existing_ids if doc_id not in new_docs]
+
+        # Only chunks we have never seen are embedded
+        with span("vectordb.upsert"):
+            if to_add:
+                vectorstore.add_documents(
+                    documents=[new_docs[doc_id] for doc_id in to_add],
+                    ids=to_add
+                )
+            if to_remove:
+                vectorstore.delete(ids=to_remove)
+
+        stats = {
+            "added": len(to_add),
+            "kept": len(new_docs) - len(to_add),
+            "removed": len(to_remove),
+        }
+        refresh_stats[collection_name] = stats
+        if to_add or to_remove:
+            data_versions[collection_name] = data_versions.get(collection_name, 0) + 1
+
+        # new_docs is the full current chunk set, so the lexical and hot
+        # indexes never need to read the collection back
+        with span("vectordb.lexical_index"):
+            lexical_index.sync(new_docs)
+        with span("vectordb.recent_index"):
+            recent_index.sync(new_docs)
+        for name, value in stats.items():
+            incr(f"vectordb.chunks_{name}", value)
+        logger.info(
+            f"Collection '{collection_name}' refreshed: "
+            f"{stats['added']} added, {stats['kept']} kept, {stats['removed']} removed "
+            f"(embedding cache: {embeddings.stats()})"
+        )
+
+        return recency_retriever(hybrid_retriever(vectorstore, lexical_index), recent_index, live)
+
+    except Exception as e:
+        logger.error(f"Vector database refresh failed: {e}")
+        raise
 
+
+def rebuild_vectordb(docs_list, collection_name, persist_directory, embeddings, live=True):
+    """Drop the collection and re-embed every chunk from scratch."""
+    try:
         # Delete existing collection if it exists
-        try:
-            client.delete_collection(name=collection_name)
-            logger.info(f"Old collection '{collection_name}' deleted.")
-        except Exception as e:
-            logger.warning(f"Collection '{collection_name}' did not exist or couldn't be deleted: {e}")
-
-        # Create new collection and add new documents
-        vectorstore = Chroma.from_documents(
-            documents=docs_list,
-            embedding=embeddings,
-            collection_name=collection_name,
-            persist_directory=persist_directory
+        if VECTOR_BACKEND == "compact":
+            delete_compact_collection(persist_directory, collection_name)
+        else:
+            client = chromadb.PersistentClient(path=persist_directory)
+            try:
+                client.delete_collection(name=collection_name)
+                logger.info(f"Old collection '{collection_name}' deleted.")
+            except Exception as e:
+                logger.warning(f"Collection '{collection_name}' did not exist or couldn't be deleted: {e}")
+
+        # Create new collection and add new documents (duplicates collapse onto one ID)
+        unique_docs = {chunk_id(doc): doc for doc in docs_list}
+        now = time.time()
+        for doc_id, doc in unique_docs.items():
+            doc.metadata["chunk_id"] = doc_id
+            doc.metadata["ingested_at"] = now
+        vectorstore = open_vectorstore(collection_name, persist_directory, embeddings)
+        vectorstore.add_documents(
+            documents=list(unique_docs.values()),
+            ids=list(unique_docs.keys())
         )
 
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 10})
-        return retriever
+        refresh_stats[collection_name] = {"added": len(unique_docs), "kept": 0, "removed": 0}
+        data_versions[collection_name] = data_versions.get(collection_name, 0) + 1
+
+        lexical_index = lexical_indexes[collection_name] = BM25Index()
+        lexical_index.sync(unique_docs)
+        recent_index = recent_indexes[collection_name] = RecentIndex()
+        recent_index.sync(unique_docs)
+        return recency_retriever(hybrid_retriever(vectorstore, lexical_index), recent_index, live)
 
     except Exception as e:
         logger.error(f"Vector database refresh failed: {e}")
         raise
 
 
+def attach_retriever(collection_name, persist_directory="./chroma_db", live=True, read_only=False):
+    """
+    Retriever over a collection maintained by the ingestion worker. The stored
+    chunks are read back to build this process's lexical and hot indexes;
+    nothing is embedded. Returns None until the collection has data.
+    """
+    try:
+        vectorstore = open_vectorstore(
+            collection_name, persist_directory, initialize_embeddings(), read_only=read_only
+        )
+        with span("vectordb.attach"):
+            stored = vectorstore.get(include=["documents", "metadatas"])
+        if not stored["ids"]:
+            return None  # Nothing ingested yet
+        docs = {
+            doc_id: Document(page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        }
+        lexical_index = lexical_indexes.setdefault(collection_name, BM25Index())
+        lexical_index.sync(docs)
+        recent_index = recent_indexes.setdefault(collection_name, RecentIndex())
+        recent_index.sync(docs)
+        return recency_retriever(hybrid_retriever(vectorstore, lexical_index), recent_index, live)
+
+    except Exception as e:
+        logger.error(f"Attaching to collection '{collection_name}' failed: {e}")
+        raise
+
+
+def hybrid_retriever(vectorstore, lexical_index):
+    """Dense top-10 fused with BM25 matches behind the standard retriever interface"""
+    return HybridRetriever(
+        vector_retriever=vectorstore.as_retriever(search_kwargs={"k": 10}),
+        lexical_index=lexical_index,
+        k=10
+    )
+
+
+def recency_retriever(retriever, recent_index, live=True):
+    """Over-window questions from the hot index; time decay on the rest while live"""
+    return RecencyRetriever(base_retriever=retriever, recent_index=recent_index, live=live, k=10)
+
+
 def chain_creator():
     llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=api_key)
 
@@ -0,0 +1,239 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import List, Optional
+
+JOBS_PATH = os.getenv("INGEST_JOBS_PATH", "ingest_jobs.sqlite")
+# A match stays scheduled while some UI session has asked for it this recently
+WATCH_TTL = float(os.getenv("INGEST_WATCH_TTL", "120"))
+# A job claimed longer ago than this is assumed to belong to a dead worker
+CLAIM_TIMEOUT = float(os.getenv("INGEST_CLAIM_TIMEOUT", "600"))
+# A worker counts as alive while its heartbeat is this recent
+WORKER_TTL = 30.0
+
+JOBS_TABLE = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        match_id TEXT NOT NULL,
+        url TEXT NOT NULL,
+        innings TEXT NOT NULL,
+        live INTEGER NOT NULL DEFAULT 1,
+        status TEXT NOT NULL DEFAULT 'pending',
+        requested_at REAL NOT NULL,
+        next_run REAL NOT NULL,
+        claimed_at REAL,
+        finished_at REAL,
+        runs INTEGER NOT NULL DEFAULT 0,
+        data_version INTEGER NOT NULL DEFAULT 0,
+        commentary INTEGER NOT NULL DEFAULT 0,
+        schedule TEXT,
+        error TEXT,
+        PRIMARY KEY (match_id, innings)
+    )
+"""
+JOB_COLUMNS = (
+    "match_id, url, innings, live, status, requested_at, next_run, claimed_at, "
+    "finished_at, runs, data_version, commentary, schedule, error"
+)
+
+
+def collection_name_for(url: str) -> str:
+    """Chroma collection holding a match's chunks"""
+    return f"ipl-{url.split('/')[-1]}"
+
+
+class JobQueue:
+    """
+    Ingestion jobs shared between UI sessions and the ingestion worker.
+
+    There is one row per match innings: every session watching an innings
+    refreshes the same row instead of adding a job, so it is scraped and
+    indexed once however many sessions are open, and sessions watching
+    different innings of a match keep separate jobs. The worker records the
+    data version here, which the UI uses to know when to re-read the index.
+    """
+
+    def __init__(self, path: str = JOBS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(JOBS_TABLE + """;
+            CREATE TABLE IF NOT EXISTS workers (
+                worker_id TEXT PRIMARY KEY,
+                heartbeat REAL NOT NULL
+            );
+        """)
+        # Tables created before the scheduler recorded its reason lack the column
+        columns = {row[1]: row[5] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "schedule" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN schedule TEXT")
+        # Tables keyed by match id alone hold one innings per match; rekey them
+        if not columns["innings"]:
+            self._conn.execute("ALTER TABLE jobs RENAME TO jobs_by_match")
+            self._conn.execute(JOBS_TABLE)
+            self._conn.execute(
+                f"INSERT INTO jobs ({JOB_COLUMNS}) SELECT {JOB_COLUMNS} FROM jobs_by_match"
+            )
+            self._conn.execute("DROP TABLE jobs_by_match")
+        self._conn.commit()
+
+    def request(self, match_id: str, url: str, innings: str, live: bool = True,
+                force: bool = False) -> None:
+        """
+        Ask for a match innings to be kept ingested. Repeated requests only
+        refresh the watch time; `force` makes it due now.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (match_id, url, innings, live, requested_at, next_run) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (match_id, innings) DO UPDATE SET "
+                "requested_at = excluded.requested_at, url = excluded.url, "
+                "next_run = CASE WHEN ? THEN excluded.next_run ELSE next_run END",
+                (match_id, url, str(innings), int(live), now, now, int(force))
+            )
+            self._conn.commit()
+
+    def claim(self, max_running: Optional[int] = None) -> Optional[dict]:
+        """
+        Take the most overdue job that is watched and not being worked on,
+        unless `max_running` jobs are already running across all workers
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                running = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'running' AND claimed_at >= ?",
+                    (now - CLAIM_TIMEOUT,)
+                ).fetchone()[0]
+                if max_running is not None and running >= max_running:
+                    self._conn.execute("COMMIT")
+                    return None
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE next_run <= ? AND requested_at >= ? "
+                    "AND (status != 'running' OR claimed_at < ?) "
+                    "ORDER BY next_run LIMIT 1",
+                    (now, now - WATCH_TTL, now - CLAIM_TIMEOUT)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', claimed_at = ? "
+                        "WHERE match_id = ? AND innings = ?",
+                        (now, row["match_id"], row["innings"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(row) if row is not None else None
+
+    def finish(self, match_id: str, innings: str, next_run: float, live: bool,
+               changed: bool = False, commentary: int = 0, reason: str = "") -> None:
+        """Record a successful run; `changed` bumps the shared data version"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, next_run = ?, live = ?, "
+                "runs = runs + 1, data_version = data_version + ?, "
+                "commentary = commentary + ?, schedule = ?, error = NULL "
+                "WHERE match_id = ? AND innings = ?",
+                (time.time(), next_run, int(live), int(changed), commentary, reason,
+                 match_id, str(innings))
+            )
+            self._conn.commit()
+
+    def publish(self, match_id: str, url: str, innings: str, live: bool, changed: bool) -> None:
+        """
+        Record an ingestion done outside the queue (a bulk backfill) so UI
+        sessions see its data version. The job stays unwatched until asked for.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (match_id, url, innings, live, status, requested_at, next_run, "
+                "finished_at, runs, data_version) VALUES (?, ?, ?, ?, 'done', 0, ?, ?, 1, ?) "
+                "ON CONFLICT (match_id, innings) DO UPDATE SET live = excluded.live, "
+                "finished_at = excluded.finished_at, runs = runs + 1, "
+                "data_version = data_version + excluded.data_version",
+                (match_id, url, str(innings), int(live), now, now, int(changed))
+            )
+            self._conn.commit()
+
+    def fail(self, match_id: str, innings: str, error: str, retry_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'error', finished_at = ?, next_run = ?, error = ? "
+                "WHERE match_id = ? AND innings = ?",
+                (time.time(), retry_at, error[:500], match_id, str(innings))
+            )
+            self._conn.commit()
+
+    def get(self, match_id: str, innings: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE match_id = ? AND innings = ?", (match_id, str(innings))
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def data_version(self, match_id: str) -> int:
+        """Version of a match's index, which every innings' job writes to"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT SUM(data_version) FROM jobs WHERE match_id = ?", (match_id,)
+            ).fetchone()
+        return row[0] or 0
+
+    def jobs(self) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY match_id, innings").fetchall()
+        return [dict(row) for row in rows]
+
+    def matches(self) -> List[dict]:
+        """One row per match: its url, whether any innings is live and its index version"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT match_id, MAX(url) AS url, MAX(live) AS live, "
+                "SUM(data_version) AS data_version FROM jobs GROUP BY match_id ORDER BY match_id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (worker_id, time.time())
+            )
+            self._conn.commit()
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            self._conn.commit()
+
+    def workers_alive(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM workers WHERE heartbeat >= ?", (time.time() - WORKER_TTL,)
+            ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue connection"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
@@ -0,0 +1,132 @@
+import os
+import time
+import random
+import threading
+from typing import Dict, Optional
+from tracing import incr, observe
+
+# Live play: poll about once per expected ball, within these bounds (seconds)
+MIN_LIVE_INTERVAL = 5.0
+MAX_LIVE_INTERVAL = 30.0
+# A T20 ball every ~25s until we have observed the real rate
+DEFAULT_BALL_SECONDS = 25.0
+# Polls that find nothing new stretch the interval by this factor each, up to MAX_IDLE_INTERVAL
+IDLE_BACKOFF = 1.5
+MAX_IDLE_INTERVAL = 120.0
+# Pauses in play
+TIMEOUT_INTERVAL = 60.0
+INNINGS_BREAK_INTERVAL = 120.0
+COMPLETED_INTERVAL = 600.0
+# Errors: exponential backoff with jitter
+ERROR_BASE = 5.0
+ERROR_MAX = 300.0
+# Spread of the jitter applied to every interval, so matches don't poll in lockstep
+JITTER = 0.1
+# Weight of the newest observation in the ball-rate average
+RATE_ALPHA = 0.3
+# Matches scraped at once across every worker process
+MAX_CONCURRENT = int(os.getenv("INGEST_MAX_CONCURRENT", os.getenv("SCRAPER_POOL_SIZE", "2")))
+
+
+class MatchSchedule:
+    """Polling signals observed for one match"""
+
+    __slots__ = ("ball_seconds", "last_ball_at", "idle_polls", "errors", "interval", "reason")
+
+    def __init__(self):
+        self.ball_seconds = DEFAULT_BALL_SECONDS
+        self.last_ball_at = None
+        self.idle_polls = 0
+        self.errors = 0
+        self.interval = MIN_LIVE_INTERVAL
+        self.reason = "new"
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PollScheduler:
+    """
+    Adaptive poll interval per match.
+
+    Live matches are polled about once per expected ball, using a moving
+    average of the observed time between balls; fetches that find nothing
+    new back the interval off geometrically. Innings breaks and timeouts
+    poll slowly, completed matches rarely, and errors back off
+    exponentially with jitter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matches: Dict[str, MatchSchedule] = {}
+
+    def _schedule(self, match_id: str) -> MatchSchedule:
+        return self._matches.setdefault(match_id, MatchSchedule())
+
+    def _jitter(self, interval: float) -> float:
+        return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def after_poll(self, match_id: str, live: bool, new_balls: int,
+                   pause: Optional[str] = None, now: Optional[float] = None) -> float:
+        """Record a successful poll; returns seconds until the next one"""
+        now = time.time() if now is None else now
+        with self._lock:
+            schedule = self._schedule(match_id)
+            schedule.errors = 0
+            if new_balls:
+                if schedule.last_ball_at is not None:
+                    # A long gap is a stoppage, not slow bowling
+                    observed = min((now - schedule.last_ball_at) / new_balls, 2 * MAX_LIVE_INTERVAL)
+                    schedule.ball_seconds += RATE_ALPHA * (observed - schedule.ball_seconds)
+                schedule.last_ball_at = now
+                schedule.idle_polls = 0
+            else:
+                schedule.idle_polls += 1
+
+            if not live:
+                interval, reason = COMPLETED_INTERVAL, "completed"
+            elif pause is not None:
+                # The gap across a pause says nothing about the ball rate
+                schedule.last_ball_at = None
+                if pause == "innings_break":
+                    interval, reason = INNINGS_BREAK_INTERVAL, "innings break"
+                else:
+                    interval, reason = TIMEOUT_INTERVAL, "timeout"
+            else:
+                expected = min(max(schedule.ball_seconds, MIN_LIVE_INTERVAL), MAX_LIVE_INTERVAL)
+                if schedule.idle_polls:
+                    interval = min(expected * IDLE_BACKOFF ** schedule.idle_polls, MAX_IDLE_INTERVAL)
+                    reason = "no change"
+                else:
+                    interval, reason = expected, "ball rate"
+            schedule.interval = self._jitter(interval)
+            schedule.reason = reason
+        incr(f"schedule.{reason.replace(' ', '_')}")
+        observe("schedule.interval", schedule.interval)
+        return schedule.interval
+
+    def after_error(self, match_id: str) -> float:
+        """Record a failed poll; returns a backed-off, jittered delay"""
+        with self._lock:
+            schedule = self._schedule(match_id)
+            schedule.errors += 1
+            delay = min(ERROR_BASE * 2 ** (schedule.errors - 1), ERROR_MAX)
+            # Equal jitter: never less than half the backoff
+            schedule.interval = delay / 2 + random.uniform(0, delay / 2)
+            schedule.reason = "error"
+        incr("schedule.error")
+        return schedule.interval
+
+    def reason(self, match_id: str) -> Optional[str]:
+        """Why the match got its current interval ("ball rate", "no change", "error", ...)"""
+        with self._lock:
+            schedule = self._matches.get(match_id)
+            return schedule.reason if schedule is not None else None
+
+    def forget(self, match_id: str) -> None:
+        with self._lock:
+            self._matches.pop(match_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {match_id: schedule.to_dict() for match_id, schedule in self._matches.items()}
@@ -0,0 +1,222 @@
+"""
+Standalone ingestion worker.
+
+Run one next to the Streamlit app:
+
+    python ingest_worker.py [--workers N]
+
+UI sessions only enqueue the match they are watching (see ingest_jobs); this
+process scrapes commentary into the commentary store and indexes the match
+page into Chroma, once per match however many sessions are watching it.
+"""
+import os
+import sys
+import time
+import uuid
+import signal
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from DataScrapper.DataScrapperDriverPool import POOL_SIZE
+from DataScrapper.DataScrapperSnapshot import get_snapshot
+from DataScrapper.DataScrapperCommentary import (
+    get_commentary_js, get_feed, find_feed, feed_urls, close_feed, close_driver
+)
+from DataScrapper.DataScrapperCommentaryStore import get_store, match_id_from_url
+from DataScrapper.DataScrapperMain import load_changes
+from DataScrapper.DataScrapperChanges import get_tracker
+from helper import vectordb, refresh_stats
+from ingest_jobs import get_job_queue, collection_name_for, WATCH_TTL
+from ingest_scheduler import PollScheduler, MAX_CONCURRENT, COMPLETED_INTERVAL
+from tracing import span, incr
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler("ingest_worker.log")
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between vector store refreshes of a live match
+LIVE_INDEX_INTERVAL = 20
+IDLE_SLEEP = 1.0
+# How often feeds of matches nobody watches any more are closed
+FEED_SWEEP_SECONDS = 30.0
+
+
+def job_key_for(job: dict) -> str:
+    """Scheduler key of a job: one per match innings"""
+    return f"{job['match_id']}/{job['innings']}"
+
+
+class IngestWorker:
+    """
+    Claims due jobs from the shared queue and runs them on a bounded thread
+    pool; the PollScheduler decides when each match is due again.
+    """
+
+    def __init__(self, workers: int = POOL_SIZE, max_concurrent: int = MAX_CONCURRENT):
+        self.workers = workers
+        self.max_concurrent = max_concurrent
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.queue = get_job_queue()
+        self.scheduler = PollScheduler()
+        self._stop = threading.Event()
+        self._running = set()
+        self._running_lock = threading.Lock()
+        # match id -> time of the last vector store refresh
+        self._indexed_at = {}
+        self._swept_at = 0.0
+
+    def poll_commentary(self, url: str, innings: str):
+        """
+        (live, pause, new entries) for one cycle. A live match keeps its page
+        open in a feed, which also reports live/paused state from that page;
+        a match that is not live, or a live one with no feed driver free,
+        takes a fresh snapshot instead. A feed is closed once its match is
+        no longer live.
+        """
+        feed = find_feed(url, innings)
+        if feed is not None:
+            try:
+                new_entries = len(feed.poll())
+                live, pause = feed.status()
+            except Exception as e:
+                logger.warning(f"Commentary feed for {url} failed, reopening next cycle: {e}")
+                close_feed(url)
+                raise
+            if live:
+                return live, pause, new_entries
+            close_feed(url)
+            incr("ingest.feeds_closed")
+
+        # The same snapshot serves status, pause detection and ingestion
+        snapshot = get_snapshot(url)
+        if snapshot.is_live and feed is None:
+            try:
+                # Live innings: keep the page open and take only the new balls
+                return True, snapshot.pause, len(get_feed(url, innings).poll())
+            except TimeoutError:
+                close_feed(url)
+                incr("ingest.feed_unavailable")
+            except Exception:
+                close_feed(url)
+                raise
+        live = snapshot.is_live
+        # Only deliveries the store did not hold yet count: the scrape returns
+        # the whole innings, or a placeholder when nothing could be parsed
+        match_id = match_id_from_url(url)
+        stored = get_store().count(match_id, innings)
+        get_commentary_js(innings, url)
+        new_entries = get_store().count(match_id, innings) - stored
+        return live, snapshot.pause if live else None, new_entries
+
+    def close_unwatched_feeds(self) -> None:
+        """Close feeds of matches no UI session has asked for within the watch TTL"""
+        if time.time() - self._swept_at < FEED_SWEEP_SECONDS:
+            return
+        self._swept_at = time.time()
+        watched = {job["url"] for job in self.queue.jobs()
+                   if job["requested_at"] >= self._swept_at - WATCH_TTL}
+        for url in feed_urls() - watched:
+            close_feed(url)
+            incr("ingest.feeds_closed")
+
+    def run_job(self, job: dict) -> None:
+        match_id, url, innings = job["match_id"], job["url"], job["innings"]
+        # Each innings is its own job; the match's index is shared between them
+        job_key = job_key_for(job)
+        try:
+            with span("ingest.job"):
+                live, pause, new_entries = self.poll_commentary(url, innings)
+
+                changed = False
+                interval = LIVE_INDEX_INTERVAL if live else COMPLETED_INTERVAL
+                # A live page only changes meaningfully when balls are bowled
+                stale = new_entries or not live or match_id not in self._indexed_at
+                if stale and time.time() - self._indexed_at.get(match_id, 0) >= interval:
+                    collection_name = collection_name_for(url)
+                    docs, page_changed = load_changes(url)
+                    # Same page text as the last cycle: nothing to re-embed
+                    if page_changed or match_id not in self._indexed_at:
+                        vectordb(
+                            docs_list=docs,
+                            collection_name=collection_name,
+                            persist_directory="./chroma_db",
+                            live=live
+                        )
+                        stats = refresh_stats.get(collection_name, {})
+                        changed = bool(stats.get("added") or stats.get("removed"))
+                    self._indexed_at[match_id] = time.time()
+                    if not live:
+                        # A completed page no longer changes; free its fingerprints
+                        get_tracker().forget(url)
+
+            delay = self.scheduler.after_poll(job_key, live, new_entries if live else 0, pause)
+            self.queue.finish(
+                match_id, innings, time.time() + delay, live, changed=changed,
+                commentary=new_entries, reason=self.scheduler.reason(job_key)
+            )
+            incr("ingest.jobs_done")
+        except Exception as e:
+            delay = self.scheduler.after_error(job_key)
+            logger.error(f"Ingestion of match {match_id} innings {innings} failed, "
+                         f"retrying in {delay:.0f}s: {e}")
+            self.queue.fail(match_id, innings, str(e), retry_at=time.time() + delay)
+            incr("ingest.jobs_failed")
+        finally:
+            with self._running_lock:
+                self._running.discard(job_key)
+
+    def run(self, once: bool = False) -> None:
+        logger.info(f"Ingestion worker {self.worker_id} started with {self.workers} slots")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while not self._stop.is_set():
+                self.queue.heartbeat(self.worker_id)
+                self.close_unwatched_feeds()
+                claimed = False
+                with self._running_lock:
+                    free = len(self._running) < self.workers
+                job = self.queue.claim(max_running=self.max_concurrent) if free else None
+                if job is not None:
+                    with self._running_lock:
+                        self._running.add(job_key_for(job))
+                    executor.submit(self.run_job, job)
+                    claimed = True
+                if once and not claimed:
+                    break
+                if not claimed:
+                    self._stop.wait(IDLE_SLEEP)
+        self.queue.remove_worker(self.worker_id)
+        logger.info(f"Ingestion worker {self.worker_id} stopped")
+
+    def stop(self, *args) -> None:
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CricAI ingestion worker")
+    parser.add_argument("--workers", type=int, default=POOL_SIZE,
+                        help="matches ingested concurrently (default: the driver pool size)")
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT,
+                        help="matches ingested at once across all worker processes")
+    parser.add_argument("--once", action="store_true",
+                        help="run the jobs that are due now, then exit")
+    args = parser.parse_args(argv)
+
+    os.makedirs("./chroma_db", exist_ok=True)
+    worker = IngestWorker(workers=args.workers, max_concurrent=args.max_concurrent)
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    try:
+        worker.run(once=args.once)
+    finally:
+        close_driver()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import re
+import math
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStoreRetriever
+from tracing import span, incr
+
+TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have how in is it its "
+    "many much of on or so than that the their them they this to was were what "
+    "when where which who whom why will with".split()
+)
+# Names and numbers ("Kohli", "12.3", "6s") mark an entity-heavy question
+ENTITY = re.compile(r"\b(?:[A-Z][a-z]+|\d+(?:\.\d+)?)\b")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def entity_terms(query: str) -> set:
+    """Index terms for the names and numbers in a question"""
+    # Skip the capitalised first word of a sentence
+    rest = query.split(" ", 1)[1] if " " in query else ""
+    return set(tokenize(" ".join(ENTITY.findall(rest))))
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index, updated incrementally by chunk ID so it
+    can track the Chroma collection without re-indexing on every refresh.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._docs: Dict[str, Document] = {}
+        self._lengths: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def get(self, doc_id: str):
+        return self._docs.get(doc_id)
+
+    def has_any(self, terms) -> bool:
+        """Whether any indexed chunk contains one of the (tokenized) terms"""
+        with self._lock:
+            return any(term in self._postings for term in terms)
+
+    def add(self, doc_id: str, doc: Document) -> None:
+        with self._lock:
+            if doc_id in self._docs:
+                return
+            terms = tokenize(doc.page_content)
+            counts = defaultdict(int)
+            for term in terms:
+                counts[term] += 1
+            for term, tf in counts.items():
+                self._postings[term][doc_id] = tf
+            self._docs[doc_id] = doc
+            self._lengths[doc_id] = len(terms)
+            self._total_length += len(terms)
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                return
+            for term in set(tokenize(doc.page_content)):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths.pop(doc_id)
+
+    def sync(self, docs: Dict[str, Document]) -> Tuple[int, int]:
+        """Make the index hold exactly `docs` (id -> Document); returns (added, removed)"""
+        with self._lock:
+            stale = [doc_id for doc_id in self._docs if doc_id not in docs]
+            for doc_id in stale:
+                self.remove(doc_id)
+            added = 0
+            for doc_id, doc in docs.items():
+                if doc_id not in self._docs:
+                    self.add(doc_id, doc)
+                    added += 1
+            return added, len(stale)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Document, float]]:
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._docs)
+            if not n or not terms:
+                return []
+            avg_length = self._total_length / n
+            scores = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [(self._docs[doc_id], score) for doc_id, score in best]
+
+
+def _doc_key(doc: Document) -> str:
+    return doc.metadata.get("chunk_id") or doc.page_content
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """Fuse ranked lists: each document scores sum(1 / (rrf_k + rank))"""
+    scores = defaultdict(float)
+    docs = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            key = _doc_key(doc)
+            scores[key] += 1.0 / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in best]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Vector retriever plus a BM25 index, fused with reciprocal-rank fusion.
+
+    Entity-heavy questions (names, numbers) whose best lexical match contains
+    every entity are answered from the BM25 index alone with a smaller k,
+    skipping the embedding call entirely.
+    """
+
+    vector_retriever: VectorStoreRetriever
+    lexical_index: BM25Index
+    k: int = 10
+    lexical_k: int = 10
+    entity_k: int = 5
+    rrf_k: int = 60
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.search(query)
+
+    def search(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        """Hybrid search; pass the query's `embedding` if it is already known to skip embedding it again"""
+        with span("retrieve.lexical"):
+            lexical = self.lexical_index.search(query, self.lexical_k)
+
+        entities = entity_terms(query)
+        if (entities and len(lexical) >= self.entity_k
+                and entities <= set(tokenize(lexical[0][0].page_content))):
+            incr("retrieve.lexical_only")
+            return [doc for doc, _ in lexical[:self.entity_k]]
+
+        with span("retrieve.vector"):
+            if embedding is None:
+                dense = self.vector_retriever.invoke(query)
+            else:
+                dense = self.vector_retriever.vectorstore.similarity_search_by_vector(
+                    embedding, **self.vector_retriever.search_kwargs
+                )
+        incr("retrieve.hybrid")
+        return reciprocal_rank_fusion(
+            [dense, [doc for doc, _ in lexical]], k=self.k, rrf_k=self.rrf_k
+        )
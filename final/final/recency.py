@@ -0,0 +1,206 @@
+import re
+import time
+import threading
+from typing import Iterable, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from lexical_index import BM25Index
+from tracing import span, incr
+
+# Overs held in the hot in-memory index; wider windows are filtered from the full retrieval
+HOT_OVERS = 6
+# Relevance halves for every HALF_LIFE_OVERS overs (or HALF_LIFE_SECONDS when a chunk has no over)
+HALF_LIFE_OVERS = 4.0
+HALF_LIFE_SECONDS = 900.0
+# Share of relevance an old chunk keeps however stale it is
+DECAY_FLOOR = 0.25
+
+# "last few overs" without a number
+DEFAULT_WINDOW_OVERS = 3
+
+# "12.3 Bumrah to Kohli, ..." in page text marks a delivery
+DELIVERY_MARKER = re.compile(r"\b(\d{1,2})\.(\d)\s+[^,]{2,60}?\s+to\s+")
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+                "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+# "last 3 overs", "past two overs", "last over"
+OVER_WINDOW = re.compile(
+    r"\b(?:last|past|previous|final)\s+(?:(\d{1,2}|few|couple of|" + "|".join(NUMBER_WORDS) + r")\s+)?(overs?)\b",
+    re.IGNORECASE
+)
+
+
+def chunk_over(text: str) -> Optional[tuple]:
+    """(over, ball) of the latest delivery mentioned in a chunk of page text"""
+    latest = None
+    for match in DELIVERY_MARKER.finditer(text):
+        over_ball = (int(match.group(1)), int(match.group(2)))
+        if latest is None or over_ball > latest:
+            latest = over_ball
+    return latest
+
+
+def annotate_chunks(docs: List[Document], innings: Optional[str] = None) -> List[Document]:
+    """Attach over/ball (where the chunk mentions a delivery) and innings metadata"""
+    for doc in docs:
+        over_ball = chunk_over(doc.page_content)
+        if over_ball is not None:
+            doc.metadata["over"], doc.metadata["ball"] = over_ball
+        if innings is not None:
+            doc.metadata["innings"] = str(innings)
+    return docs
+
+
+def delivery_documents(deliveries: Iterable, innings: Optional[str] = None) -> List[Document]:
+    """One document per parsed delivery, carrying its over and ball"""
+    docs = []
+    for d in deliveries:
+        metadata = {"kind": "delivery", "over": d.over, "ball": d.ball}
+        if innings is not None:
+            metadata["innings"] = str(innings)
+        docs.append(Document(page_content=str(d), metadata=metadata))
+    return docs
+
+
+def over_window(query: str) -> Optional[int]:
+    """Number of overs a question is scoped to ("last 3 overs" -> 3), if any"""
+    match = OVER_WINDOW.search(query)
+    if not match:
+        return None
+    count = (match.group(1) or "").lower()
+    if count.isdigit():
+        return int(count)
+    if count in NUMBER_WORDS:
+        return NUMBER_WORDS[count]
+    if count == "couple of":
+        return 2
+    return 1 if match.group(2).lower() == "over" else DEFAULT_WINDOW_OVERS
+
+
+def _position(doc: Document):
+    return (doc.metadata.get("over", -1), doc.metadata.get("ball", -1))
+
+
+class RecentIndex:
+    """
+    Hot in-memory index over the last HOT_OVERS overs of a collection.
+
+    Rebuilt from the current chunk set on every refresh, so over-window
+    questions are answered without touching the persisted collection.
+    """
+
+    def __init__(self, overs: int = HOT_OVERS):
+        self.overs = overs
+        self.latest_over = None
+        self._lock = threading.Lock()
+        self._docs: dict = {}
+        self._lexical = BM25Index()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def sync(self, docs: dict) -> None:
+        """Keep the documents (id -> Document) from the latest `overs` overs"""
+        overs = [doc.metadata["over"] for doc in docs.values() if "over" in doc.metadata]
+        with self._lock:
+            self.latest_over = max(overs) if overs else None
+            if self.latest_over is None:
+                hot = {}
+            else:
+                first = self.latest_over - self.overs + 1
+                hot = {doc_id: doc for doc_id, doc in docs.items()
+                       if doc.metadata.get("over", -1) >= first}
+            self._docs = hot
+            self._lexical.sync(hot)
+
+    def window(self, query: str, overs: int, k: int = 10) -> List[Document]:
+        """Documents from the last `overs` overs, best lexical matches first, then newest"""
+        with self._lock:
+            if self.latest_over is None:
+                return []
+            first = self.latest_over - overs + 1
+            matches = [doc for doc, _ in self._lexical.search(query, k)
+                       if doc.metadata.get("over", -1) >= first]
+            seen = {id(doc) for doc in matches}
+            newest = sorted(
+                (doc for doc in self._docs.values()
+                 if doc.metadata.get("over", -1) >= first and id(doc) not in seen),
+                key=_position, reverse=True
+            )
+        return (matches + newest)[:k]
+
+
+def decay(doc: Document, latest_over: Optional[int], now: float,
+          half_life_overs: float = HALF_LIFE_OVERS,
+          half_life_seconds: float = HALF_LIFE_SECONDS) -> float:
+    """Time-decay weight in [DECAY_FLOOR, 1]: by overs behind the latest, else by ingestion age"""
+    over = doc.metadata.get("over")
+    ingested_at = doc.metadata.get("ingested_at")
+    if over is not None and latest_over is not None:
+        weight = 0.5 ** (max(0, latest_over - over) / half_life_overs)
+    elif ingested_at is not None:
+        weight = 0.5 ** (max(0.0, now - ingested_at) / half_life_seconds)
+    else:
+        return 1.0
+    return DECAY_FLOOR + (1 - DECAY_FLOOR) * weight
+
+
+class RecencyRetriever(BaseRetriever):
+    """
+    Wraps a retriever with recency for live matches.
+
+    Questions scoped to the last few overs are served from the hot
+    RecentIndex (or, for windows wider than it holds, by filtering the
+    base results on over metadata). Other questions get the base ranking
+    re-scored by rank relevance times a time-decay weight; `live=False`
+    turns decay off for completed matches.
+    """
+
+    base_retriever: BaseRetriever
+    recent_index: RecentIndex
+    live: bool = True
+    k: int = 10
+    half_life_overs: float = HALF_LIFE_OVERS
+    half_life_seconds: float = HALF_LIFE_SECONDS
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.search(query)
+
+    def _base(self, query: str, embedding: Optional[List[float]]) -> List[Document]:
+        if embedding is None:
+            return self.base_retriever.invoke(query)
+        return self.base_retriever.search(query, embedding)
+
+    def search(self, query: str, embedding: Optional[List[float]] = None) -> List[Document]:
+        """
+        Recency-aware search; a known query `embedding` is handed to the base
+        retriever's `search` instead of embedding the query again
+        """
+        overs = over_window(query)
+        latest_over = self.recent_index.latest_over
+        if overs is not None and latest_over is not None:
+            if overs <= self.recent_index.overs:
+                with span("retrieve.over_window"):
+                    docs = self.recent_index.window(query, overs, self.k)
+                if docs:
+                    incr("retrieve.over_window")
+                    return docs
+            else:
+                first = latest_over - overs + 1
+                docs = [doc for doc in self._base(query, embedding)
+                        if doc.metadata.get("over", latest_over) >= first]
+                incr("retrieve.over_filter")
+                return docs[:self.k]
+
+        docs = self._base(query, embedding)
+        if not self.live:
+            return docs[:self.k]
+        now = time.time()
+        scored = [
+            (doc, decay(doc, latest_over, now, self.half_life_overs, self.half_life_seconds) / (rank + 1))
+            for rank, doc in enumerate(docs)
+        ]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [doc for doc, _ in scored[:self.k]]
@@ -0,0 +1,96 @@
+import re
+import threading
+from tracing import incr, observe
+
+# Routes, cheapest first
+RECENT = "recent"        # last ball / last over: recent in-memory commentary + flash model
+STATS = "stats"          # computable numbers: stats engine, no LLM
+SMALLTALK = "smalltalk"  # greetings and chit-chat: flash model, no retrieval
+RAG = "rag"              # open-ended analysis: retrieval + gemini-1.5-pro
+SEASON = "season"        # across matches: fan-out over the season index + gemini-1.5-pro
+
+ROUTES = (RECENT, STATS, SMALLTALK, RAG, SEASON)
+# Answers on these routes change with every ball (in any match, for SEASON),
+# so they bypass the per-match answer cache
+UNCACHED_ROUTES = frozenset({RECENT, STATS, SEASON})
+
+SMALLTALK_PATTERN = re.compile(
+    r"^\s*(hi|hello|hey|hiya|yo|thanks|thank you|cheers|good (morning|afternoon|evening)|"
+    r"who are you|what can you do|how are you|what'?s up|bye|goodbye)\b",
+    re.IGNORECASE
+)
+# Words that can follow a greeting without asking anything ("thanks a lot", "hi there")
+SMALLTALK_FILLER = re.compile(
+    r"^[\s,.!?]*(?:(?:there|again|so much|a lot|very much|mate|cricai)\b)?[\s,.!?]*",
+    re.IGNORECASE
+)
+RECENT_PATTERN = re.compile(
+    r"\b(last|latest|previous|this|current|recent)\s+(ball|delivery|deliveries|over|few balls)\b|"
+    r"\bjust happened\b|\bright now\b|\bwhat('s| is) happening\b",
+    re.IGNORECASE
+)
+SEASON_PATTERN = re.compile(
+    r"\b(this|the|whole|entire|ipl)\s+season\b|\bseason\s+so\s+far\b|\bacross\s+(all\s+)?(the\s+)?matches\b|"
+    r"\b(all|every|previous|other)\s+matches\b|\b(in|of|so far in)\s+the\s+(tournament|ipl)\b",
+    re.IGNORECASE
+)
+STATS_PATTERN = re.compile(
+    r"\b(top|highest|leading)\s+(run\s*)?scorer\b|\bmost (runs|wickets|sixes|fours)\b|"
+    r"\bstrike\s*rate\b|\beconomy\b|\bpartnership\b|\brun\s*rate\b|"
+    r"\bhow many (runs|sixes|fours|wickets|balls)\b|\b(total|score)\b|"
+    r"\bruns? in (the )?\d{1,2}(st|nd|rd|th)? over\b|\bover \d{1,2}\b",
+    re.IGNORECASE
+)
+
+
+def classify(question: str) -> str:
+    """Pick the cheapest route that can answer the question"""
+    # Data intents first, so "hi, who is top scorer?" is not small talk
+    # Before STATS: "best economy this season" is not a one-match number
+    if SEASON_PATTERN.search(question):
+        return SEASON
+    if RECENT_PATTERN.search(question):
+        return RECENT
+    if STATS_PATTERN.search(question) and "required" not in question.lower():
+        return STATS
+    if is_smalltalk(question):
+        return SMALLTALK
+    return RAG
+
+
+def is_smalltalk(question: str) -> bool:
+    """Only greetings and pleasantries, with nothing left over to answer"""
+    rest, greeted = question, False
+    while True:
+        greeting = SMALLTALK_PATTERN.match(rest)
+        if greeting is None:
+            break
+        greeted = True
+        rest = SMALLTALK_FILLER.sub("", rest[greeting.end():], count=1)
+    return greeted and not rest.strip(" ,.!?")
+
+
+_lock = threading.Lock()
+route_stats = {route: {"count": 0, "total_seconds": 0.0} for route in ROUTES}
+
+
+def record(route: str, seconds: float) -> None:
+    """Count one answered question and its latency against the route that served it"""
+    with _lock:
+        stats = route_stats.setdefault(route, {"count": 0, "total_seconds": 0.0})
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+    incr(f"route.{route}")
+    observe(f"route.{route}", seconds)
+
+
+def summary() -> dict:
+    """Per-route traffic and mean latency"""
+    with _lock:
+        return {
+            route: {
+                "count": stats["count"],
+                "mean_ms": 1000 * stats["total_seconds"] / stats["count"] if stats["count"] else 0.0,
+            }
+            for route, stats in route_stats.items()
+        }
@@ -0,0 +1,206 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from helper import attach_retriever, initialize_embeddings, lexical_indexes
+from ingest_jobs import get_job_queue, collection_name_for
+from lexical_index import entity_terms, reciprocal_rank_fusion
+from tracing import span, incr, observe
+
+logger = logging.getLogger(__name__)
+
+# Shards queried at once; the rest queue behind them
+SHARD_WORKERS = int(os.getenv("SEASON_SHARD_WORKERS", "8"))
+# A shard slower than this is left out of the merge rather than holding up the answer
+SHARD_TIMEOUT = float(os.getenv("SEASON_SHARD_TIMEOUT", "10"))
+# How often the shard list is re-read from the job queue
+SHARD_REFRESH_SECONDS = 15.0
+SEASON_K = 10
+
+
+class SeasonShard:
+    """One match's retriever inside the season index"""
+
+    __slots__ = ("match_id", "collection_name", "retriever", "data_version", "frozen")
+
+    def __init__(self, match_id, collection_name, retriever, data_version, frozen):
+        self.match_id = match_id
+        self.collection_name = collection_name
+        self.retriever = retriever
+        self.data_version = data_version
+        self.frozen = frozen
+
+    def mentions_any(self, terms: set) -> bool:
+        index = lexical_indexes.get(self.collection_name)
+        return index is None or index.has_any(terms)
+
+
+class SeasonIndex:
+    """
+    Every ingested match as a shard, queried in parallel for season-level
+    questions. The question is embedded once and the vector is handed to
+    every shard's dense search.
+
+    Shards follow the ingestion job queue. Attaching happens on a background
+    thread; queries use the shards attached so far and only the very first
+    query waits (up to the shard timeout) for the initial attach. A live
+    match's shard is re-attached whenever the worker publishes a new data
+    version; a completed match's shard is frozen: attached read-only, with no
+    change checks between queries. A completed match's version only moves
+    when it is indexed again (a bulk backfill, say), and the shard is then
+    re-attached like any other. Read-only only
+    changes the compact backend (mapped once, no change checks); Chroma has
+    no read-only client, so frozen Chroma shards open a normal collection
+    that this process simply never writes. Live refreshes only ever touch
+    their own match's collection.
+    """
+
+    def __init__(self, workers: int = SHARD_WORKERS, timeout: float = SHARD_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._shards: Dict[str, SeasonShard] = {}
+        self._refreshed_at = 0.0
+        self._refreshing: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="season-shard")
+        self._attacher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="season-attach")
+        self.stats = {"queries": 0, "shards_queried": 0, "shards_skipped": 0, "timeouts": 0}
+
+    def refresh(self, force: bool = False) -> Future:
+        """
+        Start a background attach of newly ingested and changed live shards
+        when one is due; returns the running (or last) refresh
+        """
+        with self._lock:
+            running = self._refreshing is not None and not self._refreshing.done()
+            due = force or time.time() - self._refreshed_at >= SHARD_REFRESH_SECONDS
+            if not running and due:
+                self._refreshed_at = time.time()
+                self._refreshing = self._attacher.submit(self._attach_changed)
+            return self._refreshing
+
+    def _attach_changed(self) -> None:
+        """Attach shards whose data version moved; runs on the attach thread"""
+        with span("season.refresh"):
+            for match in get_job_queue().matches():
+                if not match["data_version"]:
+                    continue  # Nothing indexed yet
+                with self._lock:
+                    shard = self._shards.get(match["match_id"])
+                if shard is not None and shard.data_version == match["data_version"]:
+                    continue
+                live = bool(match["live"])
+                collection_name = collection_name_for(match["url"])
+                try:
+                    retriever = attach_retriever(collection_name, live=live, read_only=not live)
+                except Exception as e:
+                    logger.warning(f"Season shard {match['match_id']} unavailable: {e}")
+                    continue
+                if retriever is None:
+                    continue
+                with self._lock:
+                    self._shards[match["match_id"]] = SeasonShard(
+                        match["match_id"], collection_name, retriever, match["data_version"], frozen=not live
+                    )
+                incr("season.shards_attached")
+
+    def shards(self) -> List[SeasonShard]:
+        with self._lock:
+            return list(self._shards.values())
+
+    def select(self, query: str) -> List[SeasonShard]:
+        """
+        Shards worth querying: those whose text mentions a name or number from
+        the question, or every shard when the question has none (or none match)
+        """
+        shards = self.shards()
+        entities = entity_terms(query)
+        if not entities:
+            return shards
+        relevant = [shard for shard in shards if shard.mentions_any(entities)]
+        return relevant or shards
+
+    def search(self, query: str, k: int = SEASON_K) -> List[Document]:
+        """Fan the query out to the selected shards in parallel and merge their top-k"""
+        refreshing = self.refresh()
+        if not self.shards() and refreshing is not None:
+            # Cold start: give the first attach a chance before answering from nothing
+            wait([refreshing], timeout=self.timeout)
+        total = len(self.shards())
+        shards = self.select(query)
+        with self._lock:
+            self.stats["queries"] += 1
+            self.stats["shards_queried"] += len(shards)
+            self.stats["shards_skipped"] += total - len(shards)
+        if not shards:
+            return []
+
+        started = time.perf_counter()
+        with span("season.embed"):
+            embedding = initialize_embeddings().embed_query(query)
+        futures = {self._executor.submit(shard.retriever.search, query, embedding): shard for shard in shards}
+        done, pending = wait(futures, timeout=self.timeout)
+        for future in pending:
+            future.cancel()
+            with self._lock:
+                self.stats["timeouts"] += 1
+            incr("season.shard_timeouts")
+            logger.warning(f"Season shard {futures[future].match_id} timed out")
+
+        rankings = []
+        for future in done:
+            shard = futures[future]
+            try:
+                docs = future.result()
+            except Exception as e:
+                logger.warning(f"Season shard {shard.match_id} failed: {e}")
+                continue
+            for doc in docs:
+                doc.metadata.setdefault("match_id", shard.match_id)
+            rankings.append(docs)
+        observe("season.fanout", time.perf_counter() - started)
+        return reciprocal_rank_fusion(rankings, k=k)
+
+    def summary(self) -> dict:
+        shards = self.shards()
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            "shards": len(shards),
+            "frozen": sum(1 for shard in shards if shard.frozen),
+            "live": sum(1 for shard in shards if not shard.frozen),
+            **stats,
+        }
+
+
+class SeasonRetriever(BaseRetriever):
+    """The season index behind the standard retriever interface"""
+
+    season_index: SeasonIndex
+    k: int = SEASON_K
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        with span("retrieve.season"):
+            return self.season_index.search(query, self.k)
+
+
+_season_index: Optional[SeasonIndex] = None
+_season_lock = threading.Lock()
+
+
+def get_season_index() -> SeasonIndex:
+    global _season_index
+    with _season_lock:
+        if _season_index is None:
+            _season_index = SeasonIndex()
+        return _season_index
+
+
+def season_retriever(k: int = SEASON_K) -> SeasonRetriever:
+    return SeasonRetriever(season_index=get_season_index(), k=k)
@@ -0,0 +1,268 @@
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from DataScrapper.DataScrapperDelivery import Delivery
+from DataScrapper.DataScrapperCommentaryStore import delivery_key, get_store, match_id_from_url
+
+# Wides and no-balls are re-bowled, so they don't count as balls bowled;
+# a no-ball still counts as a ball faced by the batter, a wide does not
+NOT_LEGAL = re.compile(r",\s*(?:\d+\s+)?(?:wides?|no\s*ball)", re.IGNORECASE)
+WIDE = re.compile(r",\s*(?:\d+\s+)?wides?\b", re.IGNORECASE)
+# Dismissals that are not credited to the bowler
+NOT_BOWLER_WICKET = re.compile(r"\brun\s*out\b|\bretired\b|\bobstruct", re.IGNORECASE)
+MAX_OVERS = 50
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class MatchStats:
+    """
+    Columnar per-innings stats, maintained incrementally from deliveries.
+
+    Every delivery is appended once to NumPy columns; per-batter, per-bowler
+    and per-over aggregates are updated in place with vectorised adds, so
+    questions about scores, strike rates, economy and partnerships are
+    answered exactly from arrays instead of by the LLM.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+        # Commentary store version the engine was last topped up from
+        self.store_version = None
+        self.players: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.size = 0
+        # Delivery columns (chronological)
+        self.over = np.zeros(256, dtype=np.int16)
+        self.runs = np.zeros(256, dtype=np.int16)
+        self.extras = np.zeros(256, dtype=np.int16)
+        self.wicket = np.zeros(256, dtype=bool)
+        self.legal = np.zeros(256, dtype=bool)
+        self.batter = np.zeros(256, dtype=np.int32)
+        self.bowler = np.zeros(256, dtype=np.int32)
+        # Aggregates indexed by player id / over number
+        self.bat_runs = np.zeros(32, dtype=np.int32)
+        self.bat_balls = np.zeros(32, dtype=np.int32)
+        self.bat_fours = np.zeros(32, dtype=np.int32)
+        self.bat_sixes = np.zeros(32, dtype=np.int32)
+        self.bat_outs = np.zeros(32, dtype=np.int32)
+        self.bowl_runs = np.zeros(32, dtype=np.int32)
+        self.bowl_balls = np.zeros(32, dtype=np.int32)
+        self.bowl_wickets = np.zeros(32, dtype=np.int32)
+        self.over_runs = np.zeros(MAX_OVERS, dtype=np.int32)
+        self.over_wickets = np.zeros(MAX_OVERS, dtype=np.int32)
+        # Partnership since the last wicket
+        self.partnership_runs = 0
+        self.partnership_balls = 0
+        # The partnership the last wicket ended, including the wicket ball
+        self.last_partnership = None
+
+    def _player(self, name: Optional[str]) -> int:
+        name = (name or "Unknown").strip()
+        if name not in self.players:
+            self.players[name] = len(self.names)
+            self.names.append(name)
+        return self.players[name]
+
+    def add(self, deliveries: Iterable[Delivery]) -> int:
+        """Append deliveries (oldest first); already-seen balls are skipped"""
+        with self._lock:
+            fresh = []
+            for d in deliveries:
+                if d.batter is None:
+                    continue  # Free-form notes carry no ball data
+                key = delivery_key(d)
+                if key not in self._seen:
+                    self._seen.add(key)
+                    fresh.append(d)
+            if not fresh:
+                return 0
+
+            n = len(fresh)
+            start, end = self.size, self.size + n
+            for name in ("over", "runs", "extras", "wicket", "legal", "batter", "bowler"):
+                setattr(self, name, _grow(getattr(self, name), end))
+
+            over = np.fromiter((d.over for d in fresh), dtype=np.int16, count=n)
+            runs = np.fromiter((d.runs for d in fresh), dtype=np.int16, count=n)
+            extras = np.fromiter((d.extras for d in fresh), dtype=np.int16, count=n)
+            wicket = np.fromiter((d.wicket for d in fresh), dtype=bool, count=n)
+            legal = np.fromiter((not NOT_LEGAL.search(d.text) for d in fresh), dtype=bool, count=n)
+            faced = np.fromiter((not WIDE.search(d.text) for d in fresh), dtype=bool, count=n)
+            bowler_wicket = wicket & np.fromiter(
+                (not NOT_BOWLER_WICKET.search(d.text) for d in fresh), dtype=bool, count=n
+            )
+            batter = np.fromiter((self._player(d.batter) for d in fresh), dtype=np.int32, count=n)
+            bowler = np.fromiter((self._player(d.bowler) for d in fresh), dtype=np.int32, count=n)
+
+            self.over[start:end] = over
+            self.runs[start:end] = runs
+            self.extras[start:end] = extras
+            self.wicket[start:end] = wicket
+            self.legal[start:end] = legal
+            self.batter[start:end] = batter
+            self.bowler[start:end] = bowler
+            self.size = end
+
+            players = len(self.names)
+            for name in ("bat_runs", "bat_balls", "bat_fours", "bat_sixes", "bat_outs",
+                         "bowl_runs", "bowl_balls", "bowl_wickets"):
+                setattr(self, name, _grow(getattr(self, name), players))
+
+            np.add.at(self.bat_runs, batter, runs)
+            np.add.at(self.bat_balls, batter, faced)
+            np.add.at(self.bat_fours, batter, runs == 4)
+            np.add.at(self.bat_sixes, batter, runs == 6)
+            np.add.at(self.bat_outs, batter, wicket)
+            # Byes and leg byes are legal extras not charged to the bowler
+            np.add.at(self.bowl_runs, bowler, runs + np.where(legal, 0, extras))
+            np.add.at(self.bowl_balls, bowler, legal)
+            np.add.at(self.bowl_wickets, bowler, bowler_wicket)
+            in_range = over < MAX_OVERS
+            np.add.at(self.over_runs, over[in_range], (runs + extras)[in_range])
+            np.add.at(self.over_wickets, over[in_range], wicket[in_range])
+
+            for d, is_faced in zip(fresh, faced):
+                # The wicket ball's runs still belong to the partnership it ends
+                self.partnership_runs += d.runs + d.extras
+                self.partnership_balls += int(is_faced)
+                if d.wicket:
+                    self.last_partnership = (self.partnership_runs, self.partnership_balls)
+                    self.partnership_runs, self.partnership_balls = 0, 0
+            return n
+
+    # ---- queries -------------------------------------------------------
+
+    def total(self):
+        runs = int(self.runs[:self.size].sum() + self.extras[:self.size].sum())
+        wickets = int(self.wicket[:self.size].sum())
+        balls = int(self.legal[:self.size].sum())
+        return runs, wickets, balls
+
+    def find_player(self, text: str, bowling: bool = False) -> Optional[int]:
+        """Player id whose name (or surname) appears in `text`, preferring the role asked about"""
+        lowered = text.lower()
+        matches = []
+        for name, pid in self.players.items():
+            parts = name.lower().split()
+            if name.lower() in lowered or (parts and re.search(rf"\b{re.escape(parts[-1])}\b", lowered)):
+                matches.append(pid)
+        if not matches:
+            return None
+        balls = self.bowl_balls if bowling else self.bat_balls
+        return max(matches, key=lambda pid: balls[pid] if pid < len(balls) else 0)
+
+    def strike_rate(self, pid: int) -> float:
+        balls = self.bat_balls[pid]
+        return 100.0 * self.bat_runs[pid] / balls if balls else 0.0
+
+    def economy(self, pid: int) -> float:
+        balls = self.bowl_balls[pid]
+        return 6.0 * self.bowl_runs[pid] / balls if balls else 0.0
+
+    def batting_line(self, pid: int) -> str:
+        return (f"{self.names[pid]}: {self.bat_runs[pid]} runs off {self.bat_balls[pid]} balls "
+                f"({self.bat_fours[pid]} fours, {self.bat_sixes[pid]} sixes), "
+                f"strike rate {self.strike_rate(pid):.2f}")
+
+    def bowling_line(self, pid: int) -> str:
+        balls = int(self.bowl_balls[pid])
+        return (f"{self.names[pid]}: {balls // 6}.{balls % 6} overs, {self.bowl_runs[pid]} runs, "
+                f"{self.bowl_wickets[pid]} wickets, economy {self.economy(pid):.2f}")
+
+    def answer(self, question: str) -> Optional[str]:
+        """Exact answer for a computable question, or None to fall back to RAG"""
+        # add() grows and fills the columns under the same lock
+        with self._lock:
+            return self._answer(question)
+
+    def _answer(self, question: str) -> Optional[str]:
+        if self.size == 0:
+            return None
+        q = question.lower()
+        players = len(self.names)
+
+        if re.search(r"\b(top|highest|leading)\s+(run\s*)?scorer|\bmost runs\b", q):
+            pid = int(np.argmax(self.bat_runs[:players]))
+            return f"Top scorer: {self.batting_line(pid)}."
+
+        if re.search(r"\bmost wickets\b|\b(top|leading|best) wicket", q):
+            pid = int(np.argmax(self.bowl_wickets[:players]))
+            return f"Most wickets: {self.bowling_line(pid)}."
+
+        if re.search(r"\b(best|lowest) economy\b", q):
+            balls = self.bowl_balls[:players]
+            eligible = np.flatnonzero(balls >= 6)
+            if len(eligible):
+                economies = 6.0 * self.bowl_runs[eligible] / balls[eligible]
+                pid = int(eligible[np.argmin(economies)])
+                return f"Best economy (min. 1 over): {self.bowling_line(pid)}."
+
+        over_match = re.search(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+over\b|\bover\s+(\d{1,2})\b", q)
+        if over_match and re.search(r"\bruns?\b|\bscored\b|\bwickets?\b", q):
+            number = int(over_match.group(1) or over_match.group(2))
+            index = number - 1  # The site numbers overs from 0
+            if 0 <= index < MAX_OVERS and (self.over[:self.size] == index).any():
+                return (f"Over {number}: {self.over_runs[index]} runs, "
+                        f"{self.over_wickets[index]} wickets.")
+
+        if "partnership" in q:
+            answer = (f"Current partnership: {self.partnership_runs} runs off "
+                      f"{self.partnership_balls} balls.")
+            if self.last_partnership is not None:
+                runs, balls = self.last_partnership
+                answer += f" The previous one was worth {runs} runs off {balls} balls."
+            return answer
+
+        if re.search(r"\b(current\s+)?run\s*rate\b", q) and "required" not in q:
+            runs, _, balls = self.total()
+            if balls:
+                return f"Current run rate: {6.0 * runs / balls:.2f} ({runs} runs in {balls // 6}.{balls % 6} overs)."
+
+        if re.search(r"\b(total|score)\b", q) and not re.search(r"\bwho\b", q) and self.find_player(q) is None:
+            runs, wickets, balls = self.total()
+            return f"Score: {runs}/{wickets} in {balls // 6}.{balls % 6} overs."
+
+        if re.search(r"\beconomy\b|\bbowl(ed|ing)\b|\bwickets\b|\bconceded\b", q):
+            pid = self.find_player(q, bowling=True)
+            if pid is not None and self.bowl_balls[pid]:
+                return self.bowling_line(pid) + "."
+
+        if re.search(r"\bstrike\s*rate\b|\bhow many\b|\bruns\b|\bsixes\b|\bfours\b|\bscored?\b", q):
+            pid = self.find_player(q)
+            if pid is not None and (self.bat_balls[pid] or self.bat_runs[pid]):
+                if "six" in q:
+                    return f"{self.names[pid]} has hit {self.bat_sixes[pid]} sixes."
+                if "four" in q:
+                    return f"{self.names[pid]} has hit {self.bat_fours[pid]} fours."
+                return self.batting_line(pid) + "."
+        return None
+
+
+_engines: Dict[tuple, MatchStats] = {}
+_engines_lock = threading.Lock()
+
+
+def get_match_stats(match_url: str, innings_val) -> MatchStats:
+    """
+    Stats for a match innings, cached per innings and topped up from the
+    commentary store only when its version shows new balls were stored
+    """
+    key = (match_id_from_url(match_url), str(innings_val))
+    with _engines_lock:
+        engine = _engines.setdefault(key, MatchStats())
+    store = get_store()
+    version = store.version(*key)
+    if version != engine.store_version:
+        # The store returns newest first; the engine skips balls it already has
+        engine.add(reversed(store.get(*key)))
+        engine.store_version = version
+    return engine
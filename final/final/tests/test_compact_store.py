@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+from langchain_core.embeddings import Embeddings  # noqa: E402
+from compact_store import CompactVectorStore, quantize  # noqa: E402
+
+DIM = 32
+
+
+class TableEmbeddings(Embeddings):
+    """A fixed random vector per text, so queries can target a known row"""
+
+    def __init__(self, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.vectors = {}
+
+    def vector(self, text):
+        if text not in self.vectors:
+            self.vectors[text] = self.rng.normal(size=DIM).astype(np.float32)
+        return self.vectors[text]
+
+    def embed_documents(self, texts):
+        return [self.vector(text).tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.vector(text).tolist()
+
+
+@pytest.fixture
+def embeddings():
+    return TableEmbeddings()
+
+
+def open_store(tmp_path, embeddings, **kwargs):
+    return CompactVectorStore("match", embeddings, str(tmp_path), **kwargs)
+
+
+def texts(n):
+    return [f"chunk {i}" for i in range(n)]
+
+
+def test_int8_codes_round_trip_close_to_the_unit_vector():
+    vectors = np.random.default_rng(1).normal(size=(20, DIM))
+    codes, scales = quantize(vectors, "int8")
+    restored = codes.astype(np.float32) * scales[:, None]
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    assert np.abs(restored - unit).max() < 0.01
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_nearest_row_is_found_after_reopening(tmp_path, embeddings, dtype):
+    store = open_store(tmp_path, embeddings, dtype=dtype)
+    ids = store.add_texts(texts(50), metadatas=[{"seq": i} for i in range(50)],
+                          ids=[f"id-{i}" for i in range(50)])
+    assert ids[7] == "id-7"
+
+    reopened = open_store(tmp_path, embeddings, dtype="float16", read_only=True)
+    assert reopened.dtype == dtype
+    doc, score = reopened.similarity_search_with_score("chunk 7", k=1)[0]
+    assert (doc.page_content, doc.metadata) == ("chunk 7", {"seq": 7})
+    assert score == pytest.approx(1.0, abs=0.02)
+
+
+def test_exact_rows_are_opt_in(tmp_path, embeddings):
+    plain = CompactVectorStore("plain", embeddings, str(tmp_path))
+    plain.add_texts(texts(10))
+    assert plain.stats()["exact_bytes"] == 0
+
+    reranked = CompactVectorStore("reranked", embeddings, str(tmp_path), rerank=True)
+    reranked.add_texts(texts(10))
+    stats = reranked.stats()
+    # float32 rows next to int8 codes: four times the quantized file
+    assert stats["exact_bytes"] > 3 * stats["vector_bytes"]
+    assert stats["disk_bytes"] >= stats["vector_bytes"] + stats["exact_bytes"]
+
+
+def test_rerank_scores_with_the_exact_rows(tmp_path, embeddings):
+    store = open_store(tmp_path, embeddings, rerank=True)
+    store.add_texts(texts(40))
+    for text in ("chunk 3", "chunk 30"):
+        doc, score = store.similarity_search_with_score(text, k=1)[0]
+        assert doc.page_content == text
+        # Rescored in float32, so the match is exact rather than quantized
+        assert score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_adds_and_deletes_append_to_the_log_not_the_snapshot(tmp_path, embeddings):
+    writer = open_store(tmp_path, embeddings)
+    writer.add_texts(texts(5), ids=[f"id-{i}" for i in range(5)])
+    meta_path = os.path.join(writer.path, "meta.json")
+    snapshot = os.stat(meta_path).st_ino
+
+    reader = open_store(tmp_path, embeddings)
+    writer.add_texts(["late chunk"], ids=["id-late"])
+    writer.delete(["id-0"])
+    # Re-adding an id replaces its row
+    writer.add_texts(["chunk 1 again"], ids=["id-1"])
+    assert os.stat(meta_path).st_ino == snapshot
+
+    for store in (writer, reader, open_store(tmp_path, embeddings)):
+        stored = store.get()
+        assert sorted(stored["ids"]) == ["id-1", "id-2", "id-3", "id-4", "id-late"]
+        assert store.get(["id-1"])["documents"] == ["chunk 1 again"]
+        assert store.similarity_search("late chunk", k=1)[0].page_content == "late chunk"
+
+
+def test_growth_writes_a_new_snapshot_readers_pick_up(tmp_path, embeddings):
+    writer = open_store(tmp_path, embeddings)
+    writer.add_texts(texts(10))
+    reader = open_store(tmp_path, embeddings)
+    writer.add_texts([f"more {i}" for i in range(300)])
+    assert reader.stats()["rows"] == 310
+    assert reader.similarity_search("more 250", k=1)[0].page_content == "more 250"
+    logs = [name for name in os.listdir(writer.path) if name.startswith("log-")]
+    assert len(logs) == 1
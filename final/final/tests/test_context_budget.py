@@ -0,0 +1,55 @@
+from context_budget import assemble_context, estimate_tokens, merge_chunks
+
+
+class Doc:
+    def __init__(self, page_content, **metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+OVERLAP = "shared overlap between neighbouring chunks of the page"
+
+
+def test_duplicates_and_contained_chunks_collapse():
+    spans = merge_chunks([Doc("Kohli hit a four"), Doc("Kohli  hit a four"), Doc("hit a four")])
+    assert [span.text for span in spans] == ["Kohli hit a four"]
+
+
+def test_neighbours_sharing_the_overlap_are_stitched():
+    spans = merge_chunks([Doc(OVERLAP + " end.", seq=1), Doc("Start of page. " + OVERLAP, seq=0)])
+    assert [span.text for span in spans] == ["Start of page. " + OVERLAP + " end."]
+
+
+def test_context_has_plain_numbered_text():
+    context = assemble_context([Doc("first chunk", seq=0), Doc("second chunk", seq=5)])
+    assert context == "[1] first chunk\n\n[2] second chunk"
+    assert "metadata" not in context and "page_content" not in context
+
+
+def test_header_comes_first():
+    assert assemble_context([Doc("chunk")], header="Score: 10/0").startswith("Score: 10/0\n\n[1] chunk")
+
+
+def test_packing_respects_the_token_budget():
+    docs = [Doc(f"chunk {i} " + "word " * 100, seq=i * 10) for i in range(10)]
+    context = assemble_context(docs, token_budget=300)
+    assert estimate_tokens(context) <= 300 + 10
+    assert context.count("[") < 10
+
+
+def test_recency_only_breaks_near_ties_in_relevance():
+    docs = [Doc("early over chunk", over=2), Doc("latest over chunk", over=18)]
+    context = assemble_context(docs)
+    assert context.index("early over") < context.index("latest over")
+    docs = [Doc("top chunk", over=5), Doc("early over chunk", over=2), Doc("latest over chunk", over=18)]
+    context = assemble_context(docs)
+    assert context.index("latest over") < context.index("early over")
+
+
+def test_recency_keys_are_not_compared_across_scales():
+    # A chunk with only an epoch timestamp must not look newer than every over
+    docs = [Doc("note without an over", ingested_at=1_700_000_000.0),
+            Doc("over twenty", over=20), Doc("over one", over=1)]
+    context = assemble_context(docs)
+    assert context.index("note without an over") < context.index("over twenty")
+    assert context.index("over twenty") < context.index("over one")
@@ -0,0 +1,62 @@
+import pytest
+from DataScrapper.DataScrapperDelivery import pair_entries, parse_delivery, parse_outcome, parse_pairs
+
+
+@pytest.mark.parametrize("outcome, expected", [
+    ("no run", (0, 0, False)),
+    ("1 run", (1, 0, False)),
+    ("3 runs", (3, 0, False)),
+    ("FOUR", (4, 0, False)),
+    ("SIX", (6, 0, False)),
+    ("wide", (0, 1, False)),
+    ("2 wides", (0, 2, False)),
+    ("wide, FOUR", (0, 5, False)),
+    ("no ball", (0, 1, False)),
+    ("no ball, 1 run", (1, 1, False)),
+    ("no ball, FOUR", (4, 1, False)),
+    ("no ball, SIX", (6, 1, False)),
+    ("1 leg bye", (0, 1, False)),
+    ("leg byes, FOUR", (0, 4, False)),
+    ("byes, 2 runs", (0, 2, False)),
+    ("OUT", (0, 0, True)),
+])
+def test_parse_outcome(outcome, expected):
+    assert parse_outcome(outcome) == expected
+
+
+def test_parse_delivery_fields():
+    delivery = parse_delivery("12.3", "Bumrah to Kohli, FOUR, driven through the covers")
+    assert (delivery.over, delivery.ball) == (12, 3)
+    assert (delivery.bowler, delivery.batter) == ("Bumrah", "Kohli")
+    assert (delivery.runs, delivery.extras, delivery.wicket) == (4, 0, False)
+    assert str(delivery) == "Over- 12.3 Runs- Bumrah to Kohli, FOUR, driven through the covers"
+
+
+@pytest.mark.parametrize("text, runs, extras", [
+    ("Bumrah to Kohli, no ball, FOUR, slapped away", 4, 1),
+    ("Bumrah to Kohli, wide, FOUR, down leg and away", 0, 5),
+    ("Bumrah to Kohli, no ball, 1 run", 1, 1),
+    # A word after a plain outcome is commentary, not runs
+    ("Bumrah to Kohli, no run, four fielders inside the ring", 0, 0),
+])
+def test_second_outcome_segment(text, runs, extras):
+    delivery = parse_delivery("5.1", text)
+    assert (delivery.runs, delivery.extras) == (runs, extras)
+
+
+def test_free_form_text_keeps_over_without_ball_fields():
+    delivery = parse_delivery("19.6", "End of the innings, a fine finish")
+    assert delivery.over_ball == "19.6"
+    assert delivery.batter is None and delivery.total_runs == 0
+
+
+def test_entries_without_an_over_marker_are_skipped():
+    assert parse_delivery("", "Bumrah to Kohli, FOUR") is None
+
+
+def test_pair_entries_skips_orphans_instead_of_shifting():
+    nodes = [(False, "orphan"), (True, "1.2"), (False, "A to B, 1 run"),
+             (True, ""), (True, "1.1"), (False, "A to B, FOUR")]
+    pairs = pair_entries(nodes)
+    assert pairs == [("1.2", "A to B, 1 run"), ("1.1", "A to B, FOUR")]
+    assert [d.total_runs for d in parse_pairs(pairs)] == [1, 4]
@@ -0,0 +1,67 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+from langchain_core.embeddings import Embeddings
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 0.0]
+
+
+@pytest.fixture
+def model():
+    return CountingEmbeddings()
+
+
+def cache(model, tmp_path, max_entries=100):
+    return CachedEmbeddings(model, model_name="fake", path=str(tmp_path / "cache.sqlite"),
+                            max_entries=max_entries)
+
+
+def test_repeated_texts_are_embedded_once(model, tmp_path):
+    cached = cache(model, tmp_path)
+    assert cached.embed_documents(["a", "bb", "a"]) == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert cached.embed_documents(["bb"]) == [[2.0, 1.0]]
+    assert model.calls == [["a", "bb"]]
+    assert cached.stats()["hits"] == 1
+
+
+def test_cache_survives_a_restart(model, tmp_path):
+    cache(model, tmp_path).embed_documents(["a"])
+    restarted = cache(model, tmp_path)
+    restarted.embed_documents(["a"])
+    assert model.calls == [["a"]]
+    assert restarted.stats()["hits"] == 1
+
+
+def test_queries_and_documents_use_separate_keys(model, tmp_path):
+    cached = cache(model, tmp_path)
+    cached.embed_documents(["a"])
+    assert cached.embed_query("a") == [1.0, 0.0]
+    assert cached.embed_query("a") == [1.0, 0.0]
+    assert model.calls == [["a"], ["a"]]
+
+
+def test_least_recently_used_entries_are_evicted(model, tmp_path, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr("embedding_cache.time.time", lambda: next(clock))
+    cached = cache(model, tmp_path, max_entries=2)
+    cached.embed_documents(["a"])
+    cached.embed_documents(["b"])
+    cached.embed_documents(["a"])  # "b" is now the oldest
+    cached.embed_documents(["c"])
+    assert cached.stats()["entries"] == 2
+    assert cached.stats()["evictions"] == 1
+    model.calls.clear()
+    cached.embed_documents(["a", "b"])
+    assert model.calls == [["b"]]
@@ -0,0 +1,48 @@
+import sqlite3
+import time
+
+from ingest_jobs import JobQueue
+
+
+def test_innings_of_a_match_are_separate_jobs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    url = "https://example.com/match/101"
+    queue.request("101", url, "1")
+    queue.request("101", url, "2")
+    assert [(job["match_id"], job["innings"]) for job in queue.jobs()] == [("101", "1"), ("101", "2")]
+
+    first = queue.claim()
+    second = queue.claim()
+    assert {first["innings"], second["innings"]} == {"1", "2"}
+    assert queue.claim() is None
+
+    queue.finish("101", "1", time.time() + 60, live=True, changed=True, commentary=3)
+    queue.finish("101", "2", time.time() + 60, live=True, changed=True)
+    assert queue.get("101", "1")["commentary"] == 3
+    assert queue.get("101", "2")["status"] == "done"
+    # Both innings write to the one match index
+    assert queue.data_version("101") == 2
+    assert queue.matches() == [{"match_id": "101", "url": url, "live": 1, "data_version": 2}]
+
+
+def test_match_keyed_table_is_rekeyed(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (match_id TEXT PRIMARY KEY, url TEXT NOT NULL, innings TEXT NOT NULL, "
+        "live INTEGER NOT NULL DEFAULT 1, status TEXT NOT NULL DEFAULT 'pending', "
+        "requested_at REAL NOT NULL, next_run REAL NOT NULL, claimed_at REAL, finished_at REAL, "
+        "runs INTEGER NOT NULL DEFAULT 0, data_version INTEGER NOT NULL DEFAULT 0, "
+        "commentary INTEGER NOT NULL DEFAULT 0, error TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO jobs (match_id, url, innings, requested_at, next_run, data_version) "
+        "VALUES ('7', 'u', '1', 0, 0, 4)"
+    )
+    conn.commit()
+    conn.close()
+
+    queue = JobQueue(path)
+    assert queue.get("7", "1")["data_version"] == 4
+    queue.request("7", "u", "2")
+    assert len(queue.jobs()) == 2
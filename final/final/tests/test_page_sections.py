@@ -0,0 +1,30 @@
+import pytest
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("selenium")
+
+from DataScrapper.DataScrapperChanges import page_sections  # noqa: E402
+
+PAGE = """
+<html><body><div id="wrapper">
+  <nav>Home | Fixtures</nav>
+  <div class="mc-header">MI vs CSK <span class="live">LIVE</span></div>
+  <div class="scorecard">MI 182/4 (20)</div>
+  <div class="commentary-wrap"><div class="cmd-entry">19.6 Bumrah to Dhoni, SIX</div></div>
+  <footer>(c) 2025</footer>
+</div></body></html>
+"""
+
+
+def test_sections_are_the_outermost_match_regions():
+    soup = bs4.BeautifulSoup(PAGE, "html.parser")
+    assert page_sections(soup) == [
+        "MI vs CSK LIVE",
+        "MI 182/4 (20)",
+        "19.6 Bumrah to Dhoni, SIX",
+    ]
+
+
+def test_page_without_regions_falls_back_to_top_level_blocks():
+    soup = bs4.BeautifulSoup("<body><p>one</p><p>two</p></body>", "html.parser")
+    assert page_sections(soup) == ["one", "two"]
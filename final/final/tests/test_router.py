@@ -0,0 +1,38 @@
+import pytest
+from router import RAG, RECENT, SEASON, SMALLTALK, STATS, classify, record, route_stats, summary
+
+
+@pytest.mark.parametrize("question, route", [
+    ("hi", SMALLTALK),
+    ("Thanks a lot!", SMALLTALK),
+    ("hi there, how are you?", SMALLTALK),
+    ("What happened on the last ball?", RECENT),
+    ("What's happening right now?", RECENT),
+    ("Who is the top scorer?", STATS),
+    ("What is Kohli's strike rate?", STATS),
+    ("How many runs in the 5th over?", STATS),
+    ("What's the score?", STATS),
+    ("Who has the best economy this season?", SEASON),
+    ("Most sixes across all matches", SEASON),
+    ("What is the required run rate?", RAG),
+    ("How did Bumrah bowl at the death?", RAG),
+])
+def test_classify(question, route):
+    assert classify(question) == route
+
+
+@pytest.mark.parametrize("question, route", [
+    ("hi, who is the top scorer?", STATS),
+    ("hello, what happened in the last over?", RECENT),
+    ("hey, tell me about the powerplay", RAG),
+    ("thanks! what about this season?", SEASON),
+])
+def test_greeting_does_not_hide_a_question(question, route):
+    assert classify(question) == route
+
+
+def test_record_feeds_the_summary():
+    before = route_stats[STATS]["count"]
+    record(STATS, 0.002)
+    assert route_stats[STATS]["count"] == before + 1
+    assert summary()[STATS]["mean_ms"] > 0
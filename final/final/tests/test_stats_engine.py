@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("numpy")
+from DataScrapper.DataScrapperDelivery import parse_delivery
+from stats_engine import MatchStats
+
+
+def innings(*balls):
+    """Deliveries oldest first from (over marker, commentary) pairs"""
+    return [parse_delivery(over, text) for over, text in balls]
+
+
+@pytest.fixture
+def stats():
+    engine = MatchStats()
+    engine.add(innings(
+        ("0.1", "Bumrah to Kohli, FOUR, driven"),
+        ("0.2", "Bumrah to Kohli, 1 run"),
+        ("0.3", "Bumrah to Rohit, wide"),
+        ("0.3", "Bumrah to Rohit, no ball, SIX"),
+        ("0.3", "Bumrah to Rohit, 2 runs"),
+        ("0.4", "Bumrah to Rohit, 1 leg bye"),
+        ("0.5", "Bumrah to Kohli, run out 1 run, short of his ground"),
+        ("0.6", "Bumrah to Gill, OUT, caught at slip"),
+        ("1.1", "Shami to Rahul, SIX"),
+    ))
+    return engine
+
+
+def test_total_counts_extras_and_only_legal_balls(stats):
+    assert stats.total() == (4 + 1 + 1 + 7 + 2 + 1 + 1 + 0 + 6, 2, 7)
+
+
+def test_batting_counts_no_balls_as_faced_but_not_wides(stats):
+    rohit = stats.players["Rohit"]
+    assert stats.bat_runs[rohit] == 8
+    assert stats.bat_balls[rohit] == 3  # no-ball, 2 runs and the leg bye
+    assert stats.batting_line(stats.players["Kohli"]).startswith("Kohli: 6 runs off 3 balls")
+
+
+def test_bowling_charges_wides_and_no_balls_but_not_byes_or_run_outs(stats):
+    bumrah = stats.players["Bumrah"]
+    assert stats.bowl_balls[bumrah] == 6
+    # FOUR, 1, wide, no-ball SIX, 2, (leg bye not charged), 1 on the run-out ball
+    assert stats.bowl_runs[bumrah] == 4 + 1 + 1 + 7 + 2 + 1
+    assert stats.bowl_wickets[bumrah] == 1
+
+
+def test_per_over_aggregates(stats):
+    assert stats.answer("How many runs in the 1st over?") == "Over 1: 17 runs, 2 wickets."
+    assert stats.answer("runs in over 2") == "Over 2: 6 runs, 0 wickets."
+
+
+def test_partnership_includes_the_wicket_ball():
+    engine = MatchStats()
+    engine.add(innings(("0.1", "Bumrah to Kohli, 2 runs"),
+                       ("0.2", "Bumrah to Kohli, run out 1 run, short of his ground")))
+    assert (engine.partnership_runs, engine.partnership_balls) == (0, 0)
+    assert engine.last_partnership == (3, 2)
+    assert engine.answer("What is the partnership?") == (
+        "Current partnership: 0 runs off 0 balls. The previous one was worth 3 runs off 2 balls."
+    )
+
+
+def test_already_seen_balls_are_skipped(stats):
+    before = stats.total()
+    assert stats.add(innings(("1.1", "Shami to Rahul, SIX"))) == 0
+    assert stats.total() == before
+
+
+def test_questions(stats):
+    assert stats.answer("Who is the top scorer?").startswith("Top scorer: Rohit: 8 runs")
+    assert stats.answer("What's the score?") == "Score: 23/2 in 1.1 overs."
+    assert stats.answer("Who will win?") is None
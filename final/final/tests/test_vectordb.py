@@ -0,0 +1,64 @@
+import pytest
+
+helper = pytest.importorskip("helper")
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from embedding_cache import CachedEmbeddings
+
+
+@pytest.fixture
+def compact_backend(tmp_path, monkeypatch):
+    # vectordb always writes to ./chroma_db
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(helper, "VECTOR_BACKEND", "compact")
+    monkeypatch.setattr(helper, "_embeddings", CachedEmbeddings(
+        DeterministicFakeEmbedding(size=16), model_name="fake", path=str(tmp_path / "cache.sqlite")
+    ))
+    monkeypatch.setattr(helper, "lexical_indexes", {})
+    monkeypatch.setattr(helper, "recent_indexes", {})
+    return "ipl-test"
+
+
+def stored(collection_name):
+    store = helper.open_vectorstore(collection_name, "./chroma_db", helper.initialize_embeddings())
+    result = store.get(include=["documents", "metadatas"])
+    return dict(zip(result["documents"], result["metadatas"]))
+
+
+def test_refresh_embeds_only_new_chunks_and_drops_missing_ones(compact_backend):
+    helper.vectordb([Document(page_content="a"), Document(page_content="b")],
+                    collection_name=compact_backend)
+    assert helper.refresh_stats[compact_backend] == {"added": 2, "kept": 0, "removed": 0}
+    first_seen = stored(compact_backend)["a"]["ingested_at"]
+
+    helper.vectordb([Document(page_content="a"), Document(page_content="c")],
+                    collection_name=compact_backend)
+    assert helper.refresh_stats[compact_backend] == {"added": 1, "kept": 1, "removed": 1}
+    chunks = stored(compact_backend)
+    assert set(chunks) == {"a", "c"}
+    assert chunks["a"]["ingested_at"] == first_seen
+    assert chunks["a"]["chunk_id"] == helper.chunk_id(Document(page_content="a"))
+
+
+def test_duplicate_chunks_collapse_onto_one_id(compact_backend):
+    helper.vectordb([Document(page_content="a"), Document(page_content="a")],
+                    collection_name=compact_backend)
+    assert helper.refresh_stats[compact_backend]["added"] == 1
+
+
+def test_ingested_at_survives_a_restart(compact_backend, monkeypatch):
+    helper.vectordb([Document(page_content="a")], collection_name=compact_backend)
+    first_seen = stored(compact_backend)["a"]["ingested_at"]
+    # A new process starts with empty in-memory indexes
+    monkeypatch.setattr(helper, "lexical_indexes", {})
+    helper.vectordb([Document(page_content="a"), Document(page_content="b")],
+                    collection_name=compact_backend)
+    assert stored(compact_backend)["a"]["ingested_at"] == first_seen
+
+
+@pytest.mark.parametrize("docs", [None, []])
+def test_empty_scrape_keeps_the_collection(compact_backend, docs):
+    helper.vectordb([Document(page_content="a")], collection_name=compact_backend)
+    helper.vectordb(docs, collection_name=compact_backend)
+    assert helper.refresh_stats[compact_backend]["removed"] == 0
+    assert set(stored(compact_backend)) == {"a"}
@@ -0,0 +1,183 @@
+import os
+import time
+import threading
+import functools
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tracing is off unless CRICAI_TRACING=1; when off every hook is a single flag check
+_enabled = os.getenv("CRICAI_TRACING", "0") == "1"
+
+# Recent samples per stage, for quantiles
+RESERVOIR_SIZE = 1000
+
+_lock = threading.Lock()
+_samples = defaultdict(lambda: deque(maxlen=RESERVOIR_SIZE))
+_totals = defaultdict(lambda: [0, 0.0])  # stage -> [count, total seconds]
+_counters = defaultdict(float)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Time a block: `with span("ingest.split"): ...`"""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def timed(name):
+    """Decorator timing every call of the wrapped function under `name`"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def observe(name, seconds):
+    """Record one duration for a stage"""
+    if not _enabled:
+        return
+    with _lock:
+        _samples[name].append(seconds)
+        total = _totals[name]
+        total[0] += 1
+        total[1] += seconds
+
+
+def incr(name, value=1):
+    """Increment a counter"""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += value
+
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def snapshot():
+    """Current stage timings (count, total, p50/p95/max in seconds) and counters"""
+    with _lock:
+        samples = {name: sorted(values) for name, values in _samples.items()}
+        totals = {name: tuple(total) for name, total in _totals.items()}
+        counters = dict(_counters)
+    stages = {}
+    for name, ordered in samples.items():
+        if not ordered:
+            continue
+        count, total = totals[name]
+        stages[name] = {
+            "count": count,
+            "total": total,
+            "p50": _quantile(ordered, 0.5),
+            "p95": _quantile(ordered, 0.95),
+            "max": ordered[-1],
+        }
+    return {"stages": stages, "counters": counters}
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+        _counters.clear()
+
+
+def _metric_name(name):
+    return "cricai_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def export_prometheus():
+    """Render stages as a summary and counters as *_total, in Prometheus text format"""
+    data = snapshot()
+    lines = [
+        "# HELP cricai_stage_seconds Latency of pipeline stages.",
+        "# TYPE cricai_stage_seconds summary",
+    ]
+    for name, stage in sorted(data["stages"].items()):
+        label = f'stage="{name}"'
+        lines.append(f'cricai_stage_seconds{{{label},quantile="0.5"}} {stage["p50"]:.6f}')
+        lines.append(f'cricai_stage_seconds{{{label},quantile="0.95"}} {stage["p95"]:.6f}')
+        lines.append(f'cricai_stage_seconds_sum{{{label}}} {stage["total"]:.6f}')
+        lines.append(f'cricai_stage_seconds_count{{{label}}} {stage["count"]}')
+    for name, value in sorted(data["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = export_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def serve_metrics(port):
+    """Serve /metrics on `port` from a daemon thread (idempotent)"""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
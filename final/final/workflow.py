@@ -6,8 +6,12 @@ from langgraph.graph import StateGraph, MessagesState, START, END
 from langgraph.graph.message import add_messages
 from langchain.tools.retriever import create_retriever_tool
 from typing import Annotated, Sequence, TypedDict
-from helper import vectordb, chain_creator
-from ingestion import load_data
+import time
+from helper import vectordb, chain_creator, initialize_embeddings, data_versions
+from answer_cache import CachedWorkflow, get_answer_cache
+from tracing import span
+import router
+from context_budget import assemble_context, DEFAULT_TOKEN_BUDGET
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -37,8 +41,25 @@ llm = ChatGoogleGenerativeAI(
     temperature=0.1
 )
 
-def create_workflow(retriever):
-    """Create LangGraph workflow for multi-agent system"""
+# Latest commentary entries given to the recent route (about two overs)
+RECENT_ENTRIES = 12
+
+
+def create_workflow(retriever, context_tokens=DEFAULT_TOKEN_BUDGET, stats_fn=None, recent_fn=None,
+                    season_retriever=None):
+    """
+    Create LangGraph workflow for multi-agent system
+
+    Questions are routed to the cheapest path that can answer them:
+    stats_fn, if given, returns the current MatchStats; computable questions
+    (scores, strike rates, economy, partnerships) are answered from it
+    directly and skip retrieval and generation. recent_fn, if given, returns
+    the in-memory commentary (newest first); "last over" questions are
+    answered from it by the flash model. Small talk goes to the flash model
+    without context, and only open-ended analysis takes the full RAG path.
+    Season-level questions retrieve from season_retriever, if given, across
+    every match instead of the selected match's retriever.
+    """
     # Retriever Tool
     retriever_tool = create_retriever_tool(
     retriever=retriever,
@@ -50,22 +71,97 @@ def create_workflow(retriever):
     # Define Agent State
     class AgentState(TypedDict):
         messages: Annotated[Sequence[BaseMessage], add_messages]
+        route: str
+        started: float
 
     # Create Workflow Graph
     workflow = StateGraph(AgentState)
 
+    # Cheaper gemini-1.5-flash chain for the recent and small-talk routes
+    flash_chain = None
+
+    def get_flash_chain():
+        nonlocal flash_chain
+        if flash_chain is None:
+            flash_chain = chain_creator()
+        return flash_chain
+
+    def answered(state: AgentState, answer: str):
+        """Final update for a node that answered: record the route latency"""
+        router.record(state['route'], time.perf_counter() - state['started'])
+        return {"messages": [HumanMessage(content=answer)]}
+
     # Define Nodes
+    def router_agent(state: AgentState):
+        """Router Agent: Classify the question into a route"""
+        return {
+            "route": router.classify(state['messages'][-1].content),
+            "started": time.perf_counter()
+        }
+
+    def pick_route(state: AgentState):
+        return {
+            router.RECENT: "recent_agent",
+            router.STATS: "stats_agent",
+            router.SMALLTALK: "smalltalk_agent",
+        }.get(state['route'], "query_agent")
+
+    def stats_agent(state: AgentState):
+        """Stats Agent: Answer computable questions exactly from match stats"""
+        question = state['messages'][-1].content
+        with span("workflow.stats"):
+            stats = stats_fn() if stats_fn else None
+            answer = stats.answer(question) if stats is not None else None
+        if answer is None:
+            return {"messages": [], "route": router.RAG}
+        return answered(state, answer)
+
+    def recent_agent(state: AgentState):
+        """Recent Agent: Answer "last over" questions from the latest commentary"""
+        question = state['messages'][-1].content
+        entries = list(recent_fn() or [])[:RECENT_ENTRIES] if recent_fn else []
+        if not entries:
+            return {"messages": [], "route": router.RAG}
+        context = "Latest commentary (newest first):\n" + "\n".join(f"- {entry}" for entry in entries)
+        with span("workflow.recent"):
+            answer = get_flash_chain().invoke({"context": context, "question": question})
+        return answered(state, answer)
+
+    def smalltalk_agent(state: AgentState):
+        """Small-talk Agent: Reply with the flash model, no retrieval"""
+        question = state['messages'][-1].content
+        with span("workflow.smalltalk"):
+            answer = get_flash_chain().invoke({
+                "context": "No match data is needed for this message.",
+                "question": question
+            })
+        return answered(state, answer)
+
+    def answered_or_rag(state: AgentState):
+        # Direct-answer agents only add a message when they answered the question
+        return END if len(state['messages']) > 1 else "query_agent"
+
     def query_agent(state: AgentState):
         """Query Agent: Retrieve relevant cricket information"""
         messages = state['messages']
         last_message = messages[-1]
 
-        # Retrieve relevant documents
-        retrieved_docs = retriever.invoke(last_message.content)
+        # Retrieve relevant documents (from every match for season questions)
+        source = retriever
+        if state.get('route') == router.SEASON and season_retriever is not None:
+            source = season_retriever
+        with span("workflow.retrieve"):
+            retrieved_docs = source.invoke(last_message.content)
+
+        # Deduplicated, overlap-merged chunk text packed into the token budget
+        with span("workflow.assemble_context"):
+            context = assemble_context(
+                retrieved_docs, token_budget=context_tokens, header="Retrieved Documents:"
+            )
 
         return {
             "messages": [
-                HumanMessage(content=f"Retrieved Documents: {retrieved_docs}")
+                HumanMessage(content=context)
             ]
         }
 
@@ -102,29 +198,87 @@ def create_workflow(retriever):
             | StrOutputParser()
         )
 
-        # Prepare context (first message is retrieved documents)
-        context = messages[0].content
-        query = messages[-1].content
+        # Prepare context (first message is the user's question, last is the retrieved documents)
+        query = messages[0].content
+        context = messages[-1].content
 
         # Generate response
-        response = response_chain.invoke({
-            "context": context,
-            "user_query": query
-        })
+        with span("workflow.generate"):
+            response = response_chain.invoke({
+                "context": context,
+                "user_query": query
+            })
 
-        return {
-            "messages": [HumanMessage(content=response)]
-        }
+        return answered(state, response)
 
     # Add nodes to workflow
+    workflow.add_node("router_agent", router_agent)
+    workflow.add_node("recent_agent", recent_agent)
+    workflow.add_node("stats_agent", stats_agent)
+    workflow.add_node("smalltalk_agent", smalltalk_agent)
     workflow.add_node("query_agent", query_agent)
     workflow.add_node("response_agent", response_agent)
 
     # Define edges
-    workflow.add_edge(START, "query_agent")
+    workflow.add_edge(START, "router_agent")
+    workflow.add_conditional_edges(
+        "router_agent", pick_route,
+        ["recent_agent", "stats_agent", "smalltalk_agent", "query_agent"]
+    )
+    workflow.add_conditional_edges("recent_agent", answered_or_rag, ["query_agent", END])
+    workflow.add_conditional_edges("stats_agent", answered_or_rag, ["query_agent", END])
+    workflow.add_edge("smalltalk_agent", END)
     workflow.add_edge("query_agent", "response_agent")
     workflow.add_edge("response_agent", END)
 
     # Compile workflow
     app = workflow.compile()
-    return app
\ No newline at end of file
+    return app
+
+
+def create_cached_workflow(retriever, collection_name, stats_fn=None, recent_fn=None, version_fn=None,
+                           season_retriever=None):
+    """
+    Workflow for one match collection behind the shared semantic answer cache.
+    version_fn defaults to this process's data version for the collection;
+    pass the shared one when another process does the ingestion.
+    """
+    return CachedWorkflow(
+        create_workflow(retriever, stats_fn=stats_fn, recent_fn=recent_fn,
+                        season_retriever=season_retriever),
+        get_answer_cache(initialize_embeddings()),
+        match_id=collection_name,
+        version_fn=version_fn or (lambda: data_versions.get(collection_name, 0)),
+        stream_fn=stream_tokens,
+        # Recent, stats and season answers change with every ball
+        bypass_fn=lambda query: router.classify(query) in router.UNCACHED_ROUTES
+    )
+
+
+# Nodes whose LLM tokens are streamed, and nodes that answer in one piece
+STREAMED_NODES = {"response_agent", "recent_agent", "smalltalk_agent"}
+DIRECT_ANSWER_NODES = {"stats_agent"}
+
+
+def stream_tokens(app, query):
+    """Yield the answer as it is produced: LLM tokens, or a computed answer whole"""
+    inputs = {"messages": [HumanMessage(content=query)]}
+    for mode, payload in app.stream(inputs, stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") in STREAMED_NODES and chunk.content:
+                yield chunk.content
+        else:
+            for node, update in payload.items():
+                if node in DIRECT_ANSWER_NODES and update and update.get("messages"):
+                    yield update["messages"][-1].content
+
+
+def stream_answer(app, query):
+    """
+    Streaming counterpart of app.invoke for interactive callers; batch callers
+    keep using invoke and get the full answer at once.
+    """
+    if isinstance(app, CachedWorkflow):
+        return app.stream_answer(query)
+    return stream_tokens(app, query)